@@ -1,150 +1,22 @@
 
 
+import os
+import sys
+import time
 import streamlit as st
-import pandas as pd
-import graphviz
-from core import remove_epsilon, nfa_to_dfa, minimize_dfa
-from graph import draw_nfa_graph, draw_dfa_graph
-from latex import df_to_latex_matrix_phi, dfa_to_latex
-from utils import parse_list, df_to_excel_bytes
-
-# ---------- Graphviz ----------
-def draw_state_node(dot, state, is_start=False, is_final=False, is_dead=False, color="black"):
-    shape = "doublecircle" if is_final else "circle"
-    if is_start:
-        dot.node(state, state, shape=shape, color="blue", fillcolor="blue", style="filled", fontcolor="white", fontname="Arial Bold")
-    elif is_final:
-        dot.node(state, state, shape=shape, color="green", fillcolor="green", style="filled", fontcolor="black", fontname="Arial Bold")
-    elif is_dead:
-        dot.node(state, state, shape=shape, color="red", fillcolor="red", style="filled", fontcolor="white", fontname="Arial Bold")
-    else:
-        dot.node(state, state, shape=shape, color=color, fontcolor=color)
-
-def draw_nfa_graph(states, alphabet, nfa_no_e, start_state, final_states, color="black"):
-    dot = graphviz.Digraph()
-    dot.attr(rankdir="LR")
-    dot.node("", shape="none")
-    for s in states:
-        draw_state_node(dot, s, is_start=(s==start_state), is_final=(s in final_states), color=color)
-    dot.edge("", start_state, color=color)
-    
-    # Group self-loops for final states
-    self_loops = {}
-    for (src, a), dsts in nfa_no_e.items():
-        if src in final_states and dsts == {src}:
-            if src not in self_loops:
-                self_loops[src] = []
-            self_loops[src].append(a)
-        else:
-            for d in sorted(dsts):
-                dot.edge(src, d, label=a, color=color)
-    
-    # Draw combined self-loops for final states
-    for state, inputs in self_loops.items():
-        dot.edge(state, state, label=",".join(inputs), color=color)
-    
-    return dot
-
-def draw_dfa_graph(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, color="black"):
-    dot = graphviz.Digraph()
-    dot.attr(rankdir="LR")
-    dot.node("", shape="none")
-    def label_of(S):
-        # Accept frozenset or set of frozenset (minimized DFA)
-        if isinstance(S, (set, frozenset)):
-            # If S is a set with one frozenset inside, extract it
-            if len(S) == 1 and isinstance(next(iter(S)), frozenset):
-                S = next(iter(S))
-            return ", ".join(sorted(str(x) for x in S))
-        return str(S)
-    
-    dead_state = None
-    for S in dfa_states:
-        is_dead = ("q_D" in S and len(S) == 1)
-        if is_dead:
-            dead_state = S
-        draw_state_node(dot, label_of(S), is_start=(S==dfa_start), is_final=(S in dfa_finals), is_dead=is_dead, color=color)
-    
-    dot.edge("", label_of(dfa_start), color=color)
-    
-    # Handle dead state self-loop separately
-    if dead_state:
-        dead_inputs = [a for a in alphabet if a != "ε" and dfa_trans.get((dead_state, a)) == dead_state]
-        if dead_inputs:
-            dot.edge(label_of(dead_state), label_of(dead_state), label=",".join(dead_inputs), color=color)
-    
-    # Draw other transitions
-    for (src, a), dst in dfa_trans.items():
-        if src == dead_state and dst == dead_state:
-            continue  # Skip dead state self-loops, already handled
-        # If dst is a set with one frozenset, extract it
-        if isinstance(dst, set) and len(dst) == 1 and isinstance(next(iter(dst)), frozenset):
-            dst = next(iter(dst))
-        dot.edge(label_of(src), label_of(dst), label=a, color=color)
-    
-    return dot
-
-# ---------- LaTeX functions ----------
-def df_to_latex_matrix_phi(states, alphabet, transitions, start_state, final_states, caption="Table"):
-    latex = "\\begin{table}[H]\n"
-    latex += "    \\centering\n"
-    latex += "    \\begin{tabular}{|" + "c|"*(len(alphabet)+1) + "}\n"
-    latex += "    \\hline\n"
-    latex += "State & " + " & ".join(f"$\\epsilon$" if a=="ε" else a for a in alphabet) + " \\\\ \\hline\n"
-
-    for s in states:
-        row_label = s
-        if s == start_state:
-            row_label = "→" + row_label
-        if s in final_states:
-            row_label += "*"
-        row_entries = []
-        for a in alphabet:
-            nxt = transitions.get((s,a), set())
-            if nxt:
-                row_entries.append(",".join(sorted(nxt)) if len(nxt)>1 else next(iter(nxt)))
-            else:
-                row_entries.append(r"$\phi$")
-        latex += row_label + " & " + " & ".join(row_entries) + " \\\\ \\hline\n"
-
-    latex += "    \\end{tabular}\n"
-    latex += f"    \\caption{{{caption}}}\n"
-    latex += "\\end{table}"
-    return latex
-
-def dfa_to_latex(states, alphabet, transitions, start_state, final_states, caption="DFA Table"):
-    latex = "\\begin{table}[H]\n"
-    latex += "    \\centering\n"
-    latex += "    \\begin{tabular}{|" + "c|"*(len(alphabet)+1) + "}\n"
-    latex += "    \\hline\n"
-    header_symbols = [a for a in alphabet if a != "ε"]
-    latex += "State & " + " & ".join(header_symbols) + " \\\\ \\hline\n"
-
-    for S in states:
-        S_lbl = ", ".join(sorted(S)) if isinstance(S, (set, frozenset)) else str(S)
-        if S == start_state:
-            S_lbl = "→" + S_lbl
-        if S in final_states:
-            S_lbl += "*"
-        row_entries = []
-        for a in alphabet:
-            if a == "ε":
-                continue
-            nxt = transitions.get((S,a))
-            if nxt:
-                # If nxt is a set with one frozenset, extract it
-                if isinstance(nxt, set) and len(nxt) == 1 and isinstance(next(iter(nxt)), frozenset):
-                    nxt = next(iter(nxt))
-                dst = ", ".join(sorted(str(x) for x in nxt))
-                row_entries.append(dst)
-            else:
-                row_entries.append(r"$\phi$")
-        latex += S_lbl + " & " + " & ".join(row_entries) + " \\ \\hline\n"
-
-    latex += "    \\end{tabular}\n"
-    latex += f"    \\caption{{{caption}}}\n"
-    latex += "\\end{table}"
-    return latex
+from artifacts import ArtifactManager, progress
+from cache import PipelineCache, fingerprint, layout_fingerprint
+from automaton import Automaton
+from core import Budget, BudgetExceeded, IncrementalDFA, determinize, epsilon_free_automaton, minimize, transition_diff, trim_automaton
+from equivalence import are_equivalent, is_included
+from graph import LARGE_GRAPH_STATES, draw_automaton, render_svg
+from instrument import PipelineStats
+from latex import automaton_to_latex
+from lazy_dfa import LazyDFA
+from product import OPERATIONS, is_empty, product
+from loader import NFAFormatError, load_nfa_excel, load_nfa_json, validate_nfa
+from regexp import OTHER, Regex, thompson_nfa
+from utils import parse_list, nfa_columns, automaton_table, automaton_to_excel
 
 # ---------- Streamlit ----------
 st.set_page_config(page_title="NFA → DFA Dashboard", layout="wide")
@@ -154,37 +26,53 @@ st.title("ε-NFA / NFA → DFA Dashboard")
 st.sidebar.header("📥 Excel Upload")
 uploaded_file = st.sidebar.file_uploader("Drag and drop NFA Excel file", type=["xlsx"])
 
+st.sidebar.header("Regular Expression")
+regex_pattern = st.sidebar.text_input("Regex (used instead of the manual input)", "",
+                                      help="Literals, ., [a-z], [^...], \\d \\w \\s, ( ), |, * + ? and {m,n}. "
+                                           "Characters the pattern does not mention are shown as " + repr(OTHER))
+
 st.sidebar.header("Manual Input")
 manual_states = st.sidebar.text_input("States (comma separated)", "q0,q1")
 manual_alphabet = st.sidebar.text_input("Alphabet (comma separated)", "a,b")
 manual_start = st.sidebar.text_input("Start State", "q0")
 manual_final = st.sidebar.text_input("Final States (comma separated)", "q1")
 
+st.sidebar.header("Diagram Rendering")
+merge_edges = st.sidebar.checkbox("Merge parallel edges", value=True)
+layout_threshold = int(st.sidebar.number_input("Use sfdp layout above (states)", min_value=1, value=LARGE_GRAPH_STATES))
+max_graph_states = int(st.sidebar.number_input("Max states drawn", min_value=1, value=500))
+
+st.sidebar.header("Conversion")
+trim_states = st.sidebar.checkbox("Trim useless NFA states before determinization", value=False,
+                                  help="Drops states that are unreachable or can never reach a final state")
+# Deployment-wide caps on subset construction; the sidebar can only lower them
+MAX_DFA_STATES = int(os.environ.get("NFA_DFA_MAX_DFA_STATES", "100000"))
+MAX_MEMORY_MB = int(os.environ.get("NFA_DFA_MAX_MEMORY_MB", "512"))
+TIME_LIMIT = float(os.environ.get("NFA_DFA_TIME_LIMIT", "20"))
+budget = Budget(
+    max_states=int(st.sidebar.number_input("Max DFA states", min_value=1, max_value=MAX_DFA_STATES, value=MAX_DFA_STATES)),
+    max_bytes=int(st.sidebar.number_input("Max memory (MB)", min_value=1, max_value=MAX_MEMORY_MB, value=MAX_MEMORY_MB)) * 2**20,
+    seconds=float(st.sidebar.number_input("Time limit (s)", min_value=0.1, max_value=TIME_LIMIT, value=TIME_LIMIT)),
+)
+budget_options = f"{budget.max_states}:{budget.max_bytes}:{budget.seconds}"
+LIMIT_NAMES = {"max_states": "DFA state", "max_bytes": "memory", "deadline": "time"}
+
+st.sidebar.header("Compare")
+compare_file = st.sidebar.file_uploader("Compare with a second automaton (Excel or JSON)", type=["xlsx", "json"])
+
 # ---------- Parse Inputs ----------
+error_msg = None
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-    # Assume first column is 'State', rest are input symbols
-    nfa_states = [str(x).replace("→", "").replace("*", "") for x in df['State']]
-    alphabet = [str(col) for col in df.columns if col != "State"]
-    start_state = None
-    final_states = []
-    nfa_transitions = {}
-
-    for idx, row in df.iterrows():
-        state_raw = str(row['State'])
-        state = state_raw.replace("→", "").replace("*", "")
-        if "→" in state_raw:
-            start_state = state
-        if "*" in state_raw:
-            final_states.append(state)
-        for a in alphabet:
-            cell = str(row[a]).strip()
-            if cell and cell != "φ" and cell.lower() != "nan":
-                next_states = [s.strip() for s in cell.split(",") if s.strip()]
-                nfa_transitions[(state, a)] = set(next_states)
-    # Fallback if no start state marked
-    if not start_state:
-        start_state = nfa_states[0]
+    # States are validated while the sheet is parsed
+    try:
+        nfa_states, alphabet, nfa_transitions, start_state, final_states = load_nfa_excel(uploaded_file, validate=True)
+    except NFAFormatError as exc:
+        error_msg = str(exc)
+elif regex_pattern:
+    try:
+        nfa_states, alphabet, nfa_transitions, start_state, final_states = thompson_nfa(regex_pattern)
+    except ValueError as exc:
+        error_msg = str(exc)
 else:
     nfa_states = parse_list(manual_states)
     alphabet = parse_list(manual_alphabet)
@@ -193,149 +81,317 @@ else:
     st.sidebar.markdown("#### Transitions")
     nfa_transitions = {}
     for state in nfa_states:
-        for sym in alphabet + ["ε"]:  # Include epsilon
+        for sym in nfa_columns(alphabet):
             next_states = st.sidebar.text_input(f"δ({state}, {sym}) (comma separated)", "").strip()
             if next_states:
                 nfa_transitions[(state, sym)] = set(ns.strip() for ns in next_states.split(","))
-
-# ---------- Validation ----------
-error_msg = None
-if start_state not in nfa_states:
-    error_msg = f"❌ Start state `{start_state}` is not in states!"
-elif not set(final_states).issubset(set(nfa_states)):
-    error_msg = "❌ Some final states are not in the set of states!"
-elif any(dst not in nfa_states for dsts in nfa_transitions.values() for dst in dsts):
-    error_msg = "❌ Some transitions point to states not in the state set!"
+    # ---------- Validation ----------
+    error_msg = validate_nfa(nfa_states, start_state, final_states, nfa_transitions)
 if error_msg:
-    st.error(error_msg)
+    st.error(f"❌ {error_msg}")
     st.stop()
 
-# ---------- NFA → DFA ----------
-closures, nfa_no_e, nfa_finals = remove_epsilon(nfa_states, alphabet, nfa_transitions, start_state, final_states)
-dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(nfa_states, alphabet, nfa_no_e, start_state, nfa_finals)
-
-
-# ---------- Minimized DFA ----------
-min_states, min_alphabet, min_trans, min_start, min_finals = minimize_dfa(
-    dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals
-)
-
+# ---------- Pipeline cache ----------
+# One store for the whole server process: every session reads the results
+# (and rendered diagrams) of the others for the same NFA
+@st.cache_resource
+def get_pipeline_cache():
+    return PipelineCache(max_bytes=int(os.environ.get("NFA_DFA_CACHE_MB", "256")) * 2**20,
+                         directory=os.environ.get("NFA_DFA_CACHE_DIR", ".nfa_dfa_cache"))
+
+cache = get_pipeline_cache()
+# Canonical NFA hash plus the state/alphabet order the tables are laid out in
+cache_key = fingerprint(nfa_states, alphabet, nfa_transitions, start_state, final_states) + "-" + layout_fingerprint(nfa_states, alphabet)
+if trim_states:
+    # Trimming changes the DFA subsets, so everything downstream is cached apart
+    cache_key += "-trim"
+
+# JSON-lines stats: "-" for stderr, a path to append to, empty to disable
+STATS_LOG = os.environ.get("NFA_DFA_STATS_LOG", "-")
+stats_log = None if not STATS_LOG else sys.stderr if STATS_LOG == "-" else STATS_LOG
+perf = PipelineStats(run_id=cache_key[:12], source="upload" if uploaded_file else "regex" if regex_pattern else "manual")
+
+def staged(stage, fn, *args, store_if=None, **kwargs):
+    """
+    Pipeline-cache lookup that records the stage (timed, or served from cache) in perf.
+    A session asking for a stage another session is computing waits for that result.
+    Results for which store_if(result) is false are not cached.
+    """
+    computed = []
+    def compute():
+        computed.append(True)
+        return perf.call(stage, fn, *args, **kwargs)
+    value = cache.get_or_compute(cache_key, stage, compute, store_if)
+    if not computed:
+        perf.record(stage, cached=True)
+    return value
+
+@st.cache_resource
+def get_artifact_manager():
+    return ArtifactManager(get_pipeline_cache(), stats_log=stats_log)
+
+artifacts = get_artifact_manager()
+graph_options = f"{merge_edges}:{layout_threshold}:{max_graph_states}"
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def render_graph(name, aut, focus=""):
+    # Only the DOT source is built here; the browser lays it out
+    options = dict(merge_edges=merge_edges, layout_threshold=layout_threshold, max_states=max_graph_states, focus=focus or None)
+    def build():
+        dot = draw_automaton(aut, color="black", **options)
+        return dot.source, dot.engine
+    return staged(f"{name}_dot@{graph_options}:{focus}", build)
+
+def show_graph(title, name, file_name, aut):
+    st.subheader(title)
+    focus = st.text_input("Focus on state (label, empty for whole graph)", "", key=f"focus_{name}").strip()
+    source, engine = render_graph(name, aut, focus)
+    st.graphviz_chart(source)
+    # SVG export renders the same source server-side, in the background
+    return {
+        "name": f"{name}_svg@{graph_options}:{focus}",
+        "label": "Diagram (SVG)",
+        "build": lambda: render_svg(source, engine),
+        "file_name": file_name,
+        "mime": "image/svg+xml",
+        "timed": True,
+    }
+
+@st.fragment
+def artifact_panel(title, jobs):
+    """Download buttons for one automaton, filled in as background jobs finish."""
+    futures = {job["name"]: artifacts.peek(cache_key, job["name"]) for job in jobs}
+    if all(f is None for f in futures.values()):
+        if not st.button(f"Prepare {title} downloads", key=f"prepare_{title}"):
+            return
+    futures = {job["name"]: futures[job["name"]] or artifacts.request(cache_key, job["name"], job["build"]) for job in jobs}
+    done, total = progress(futures.values())
+    if done < total:
+        st.progress(done / total, text=f"Preparing {title} downloads… {done}/{total}")
+    columns = st.columns(total)
+    latex_code = None
+    for column, job in zip(columns, jobs):
+        future = futures[job["name"]]
+        with column:
+            if not future.done():
+                st.button(f"{job['label']} (preparing…)", disabled=True, key=f"wait_{job['name']}")
+            elif future.exception() is not None:
+                st.warning(f"{job['label']} failed: {future.exception()}")
+            else:
+                data = future.result()
+                if job.get("timed"):
+                    data, seconds = data
+                    st.caption(f"Rendered in {seconds:.2f}s")
+                if job.get("show"):
+                    latex_code = data
+                st.download_button(f"Download {title} {job['label']}", data=data, file_name=job["file_name"], mime=job["mime"], key=f"download_{job['name']}")
+    if latex_code is not None:
+        st.code(latex_code, language="latex")
+    if done < total:
+        time.sleep(0.5)
+        st.rerun(scope="fragment")
+
+# LaTeX tables longer than this are exported as longtables, which break across pages
+LONGTABLE_ROWS = 40
+
+def table_jobs(name, file_stem, aut, caption):
+    # Both exports stream rows straight from the automaton, not from the DataFrame
+    return [
+        {"name": f"{name}_excel", "label": "Table (Excel)", "build": lambda: automaton_to_excel(aut),
+         "file_name": f"{file_stem}.xlsx", "mime": EXCEL_MIME},
+        {"name": f"{name}_latex", "label": "Table (LaTeX)", "build": lambda: automaton_to_latex(aut, caption=caption, longtable=len(aut) > LONGTABLE_ROWS),
+         "file_name": f"{file_stem}.tex", "mime": "text/x-tex", "show": True},
+    ]
+
+def incremental_pipeline():
+    """Manual edits update the previous conversion instead of starting over."""
+    inc = st.session_state.get("incremental")
+    if inc is None or (inc.states, inc.alphabet, inc.start_state) != (nfa_states, alphabet, start_state):
+        inc = st.session_state["incremental"] = IncrementalDFA(nfa_states, alphabet, nfa_transitions, start_state, final_states, budget=budget)
+        return inc
+    inc.budget = budget
+    added, removed = transition_diff(inc.enfa, nfa_transitions)
+    finals = set(final_states)
+    if added or removed or finals != inc.final_states:
+        with perf.stage("incremental_update") as record:
+            inc.apply(added, removed, finals - inc.final_states, inc.final_states - finals)
+            record.update(inc.last_update)
+        update = inc.last_update
+        st.sidebar.caption(f"Incremental update: {update['closures']} closures, {update['rows']} rows, "
+                           f"{update['subsets']} DFA states recomputed")
+    return inc
+
+def lazy_view():
+    """Run words through the ε-NFA, determinizing only the subsets they reach."""
+    st.subheader("On-demand Simulation")
+    word = st.text_input("Input word (one symbol per character, or comma separated)", "", key="lazy_word")
+    symbols = parse_list(word) if "," in word else list(word.strip())
+    lazy = LazyDFA(nfa_states, alphabet, nfa_transitions, start_state, final_states)
+    result = lazy.run(symbols)
+    reached = ", ".join(sorted(lazy.subset_of(lazy.current))) or "∅"
+    if result.accepted:
+        st.success(f"Accepted; reached {{{reached}}}")
+    else:
+        st.error(f"Rejected; reached {{{reached}}}")
+    st.caption(f"{lazy.stats()['cached_states']} subsets determinized for this input")
+
+# Every stage below works on the compact Automaton; see automaton.py
+use_incremental = not (uploaded_file or regex_pattern or trim_states)
+if use_incremental:
+    # Manual edits without trimming update the previous conversion in place
+    try:
+        incremental = incremental_pipeline()
+    except BudgetExceeded:
+        # Rerun with the bounded construction, which keeps the partial DFA
+        st.session_state.pop("incremental", None)
+        use_incremental = False
+if not use_incremental:
+    # ---------- NFA → DFA ----------
+    enfa = Automaton.from_core(nfa_states, alphabet, nfa_transitions, start_state, final_states, deterministic=False)
+    nfa_free = staged("epsilon_free", epsilon_free_automaton, enfa)
+    nfa_finals = [nfa_free.names[i] for i in nfa_free.finals()]
+    if trim_states:
+        trimmed = staged("trim", trim_automaton, nfa_free)
+        st.sidebar.caption(f"Trimming removed {len(nfa_free) - len(trimmed)} of {len(nfa_free)} states and "
+                           f"{nfa_free.num_transitions - trimmed.num_transitions} of {nfa_free.num_transitions} transitions")
+        nfa_free = trimmed
+    # A deadline cut depends on the machine's load; a later run may finish, so it is not kept
+    dfa = staged(f"determinize@{budget_options}", determinize, nfa_free, budget=budget,
+                 store_if=lambda result: result.truncated != "deadline")
+
+    # ---------- Minimized DFA ----------
+    min_dfa = None if dfa.truncated else staged("minimize", minimize, dfa)
+else:
+    _, _, nfa_finals = staged("remove_epsilon", incremental.epsilon_free)
+    def incremental_dfa():
+        dfa_states, dfa_trans, dfa_start, dfa_finals = incremental.dfa()
+        return Automaton.from_core(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    dfa = staged(f"determinize@{budget_options}", incremental_dfa)
+    min_dfa = staged("minimize", lambda: Automaton.from_core(*incremental.minimize()))
+
+if dfa.truncated:
+    st.warning(f"⚠️ Determinization hit the {LIMIT_NAMES[dfa.truncated]} limit after {len(dfa)} DFA states. {len(dfa.unexplored)} of them "
+               "were not expanded; they are drawn dashed and their table entries are shown as ?.")
+    # A partial DFA depends on the limits (and, for the deadline, on how far it got),
+    # so its tables and diagrams are cached apart; the sizes identify how far it got
+    cache_key += f"-partial@{budget_options}:{len(dfa)}:{len(dfa.unexplored)}"
+
+# The NFA is drawn with its ε-moves, but with the finals reached through them
+nfa = Automaton.from_core(nfa_states, alphabet, nfa_transitions, start_state, nfa_finals, deterministic=False)
 
 # ----- NFA -----
-st.subheader("NFA State Diagram")
-nfa_dot = draw_nfa_graph(nfa_states, alphabet, nfa_transitions, start_state, nfa_finals, color="black")
-st.graphviz_chart(nfa_dot)
-st.download_button("Download NFA Diagram (SVG)", data=nfa_dot.pipe(format="svg"), file_name="nfa.svg")
+nfa_svg = show_graph("NFA State Diagram", "nfa", "nfa.svg", nfa)
 
 st.markdown("### NFA Transition Table")
-nfa_table_data = []
-for s in nfa_states:
-    row_label = s
-    if s == start_state:
-        row_label = "→" + row_label
-    if s in nfa_finals:
-        row_label += "*"
-    row_entries = {}
-    for a in alphabet + ["ε"]:
-        nxt = nfa_transitions.get((s,a), set())
-        row_entries[a] = ",".join(sorted(nxt)) if nxt else "φ"
-    nfa_table_data.append({"State": row_label, **row_entries})
-
-nfa_df = pd.DataFrame(nfa_table_data)
+nfa_df = staged("nfa_table", automaton_table, nfa)
 st.dataframe(nfa_df)
 
-# --- NFA Excel Download ---
-import io
-from io import BytesIO
-
-def df_to_excel_bytes(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False)
-    return output.getvalue()
-
-st.download_button(
-    label="Download NFA Table (Excel)",
-    data=df_to_excel_bytes(nfa_df),
-    file_name="nfa_table.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
-
-st.subheader("NFA Table LaTeX")
-st.code(df_to_latex_matrix_phi(nfa_states, alphabet + ["ε"], nfa_transitions, start_state, nfa_finals, caption="Original NFA Transition Table"), language="latex")
+artifact_panel("NFA", [nfa_svg] + table_jobs("nfa", "nfa_table", nfa, "Original NFA Transition Table"))
 
 # ----- DFA -----
-st.subheader("DFA State Diagram")
-dfa_dot = draw_dfa_graph(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, color="black")
-st.graphviz_chart(dfa_dot)
-st.download_button("Download DFA Diagram (SVG)", data=dfa_dot.pipe(format="svg"), file_name="dfa.svg")
+dfa_svg = show_graph("DFA State Diagram", "dfa", "dfa.svg", dfa)
 
 st.markdown("### DFA Transition Table")
-dfa_table_data = []
-for S in dfa_states:
-    S_lbl = "".join(sorted(S))
-    if S == dfa_start:
-        S_lbl = "→" + S_lbl
-    if S in dfa_finals:
-        S_lbl += "*"
-    row_entries = {}
-    for a in alphabet:
-        if a == "ε":
-            continue
-        nxt = dfa_trans.get((S,a))
-        row_entries[a] = "".join(sorted(nxt)) if nxt else "φ"
-    dfa_table_data.append({"State": S_lbl, **row_entries})
-
-dfa_df = pd.DataFrame(dfa_table_data)
+dfa_df = staged("dfa_table", automaton_table, dfa)
 st.dataframe(dfa_df)
 
-# --- DFA Excel Download ---
-st.download_button(
-    label="Download DFA Table (Excel)",
-    data=df_to_excel_bytes(dfa_df),
-    file_name="dfa_table.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
-
-st.subheader("DFA Table LaTeX")
-st.code(dfa_to_latex(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, caption="Original DFA Transition Table"), language="latex")
+artifact_panel("DFA", [dfa_svg] + table_jobs("dfa", "dfa_table", dfa, "Original DFA Transition Table"))
 
 # ----- Minimized DFA -----
 
-st.subheader("Minimized DFA State Diagram")
-min_dot = draw_dfa_graph(min_states, min_alphabet, min_trans, min_start, min_finals, color="black")
-st.graphviz_chart(min_dot)
-st.download_button("Download Minimized DFA Diagram (SVG)", data=min_dot.pipe(format="svg"), file_name="min_dfa.svg")
-
-st.markdown("### Minimized DFA Transition Table")
-min_table_data = []
-for S in min_states:
-    S_lbl = str(S)
-    if S == min_start:
-        S_lbl = "→" + S_lbl
-    if S in min_finals:
-        S_lbl += "*"
-    row_entries = {}
-    for a in min_alphabet:
-        nxt = min_trans.get((S,a))
-        if nxt:
-            # nxt is a set with one label string
-            dst_label = next(iter(nxt))
-            row_entries[a] = dst_label
+if min_dfa is None:
+    st.info("The minimized DFA needs the complete DFA. Raise the limits in the sidebar, or simulate inputs on demand below.")
+    lazy_view()
+else:
+    min_svg = show_graph("Minimized DFA State Diagram", "min", "min_dfa.svg", min_dfa)
+
+    st.markdown("### Minimized DFA Transition Table")
+    min_df = staged("min_table", automaton_table, min_dfa)
+    st.dataframe(min_df)
+
+    artifact_panel("Minimized DFA", [min_svg] + table_jobs("min", "minimized_dfa_table", min_dfa, "Minimized DFA Transition Table"))
+
+# ----- Regex matching -----
+if regex_pattern:
+    st.subheader("Match Test")
+    lines = st.text_area("Test strings (one per line)", "", key="regex_lines").splitlines()
+    if lines:
+        matcher = Regex(regex_pattern)
+        st.dataframe({"String": lines, "fullmatch": matcher.fullmatch_many(lines), "search": matcher.search_many(lines)})
+
+# ----- Language comparison -----
+def format_word(word):
+    if not word:
+        return "ε"
+    return "".join(word) if all(len(a) == 1 for a in word) else " ".join(word)
+
+def load_second():
+    if compare_file.name.lower().endswith(".json"):
+        second = load_nfa_json(compare_file)
+        error = validate_nfa(second[0], second[3], second[4], second[2])
+        if error:
+            raise NFAFormatError(error)
+        return second
+    return load_nfa_excel(compare_file, validate=True)
+
+if compare_file:
+    st.subheader("Language Comparison")
+    try:
+        second = load_second()
+    except NFAFormatError as exc:
+        st.error(f"❌ Second automaton: {exc}")
+    else:
+        first = (nfa_states, alphabet, nfa_transitions, start_state, final_states)
+        second_key = fingerprint(*second)
+        # As for determinize, a comparison cut short by the deadline is not kept
+        keep = lambda result: result.truncated != "deadline"
+        equal = staged(f"equivalence@{second_key}:{budget_options}", are_equivalent, first, second, budget=budget,
+                       store_if=keep)
+        if equal.holds is None:
+            st.warning(f"⚠️ Undecided: the comparison hit the {LIMIT_NAMES[equal.truncated]} limit after "
+                       f"{equal.explored} subset pairs. Raise the limits in the sidebar.")
+        elif equal.holds:
+            st.success(f"Both automata accept the same language ({equal.explored} subset pairs explored).")
         else:
-            row_entries[a] = "φ"
-    min_table_data.append({"State": S_lbl, **row_entries})
-
-min_df = pd.DataFrame(min_table_data)
-st.dataframe(min_df)
-
-# --- Minimized DFA Excel Download ---
-st.download_button(
-    label="Download Minimized DFA Table (Excel)",
-    data=df_to_excel_bytes(min_df),
-    file_name="minimized_dfa_table.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
-
-st.subheader("Minimized DFA Table LaTeX")
-st.code(dfa_to_latex(min_states, min_alphabet, min_trans, min_start, min_finals, caption="Minimized DFA Transition Table"), language="latex")
+            st.error(f"The languages differ: `{format_word(equal.counterexample)}` is accepted by the "
+                     f"{equal.accepted_by} automaton only (a shortest such word).")
+            for left_name, right_name, left, right in (("first", "second", first, second), ("second", "first", second, first)):
+                included = staged(f"inclusion:{left_name}@{second_key}:{budget_options}", is_included, left, right,
+                                  budget=budget, store_if=keep)
+                if included.holds is None:
+                    st.markdown(f"- L({left_name}) ⊆ L({right_name}): undecided ({LIMIT_NAMES[included.truncated]} limit)")
+                elif included.holds:
+                    st.markdown(f"- L({left_name}) ⊆ L({right_name})")
+                else:
+                    st.markdown(f"- L({left_name}) ⊄ L({right_name}): `{format_word(included.counterexample)}`")
+        operation = st.selectbox("Combine with the second automaton", ["none"] + list(OPERATIONS))
+        if operation != "none" and min_dfa is not None:
+            second_dfa = staged(f"determinize:second@{second_key}:{budget_options}",
+                                lambda: determinize(Automaton.from_core(*second, deterministic=False), budget=budget),
+                                store_if=lambda result: result.truncated != "deadline")
+            if second_dfa.truncated:
+                st.warning(f"⚠️ Determinizing the second automaton hit the {LIMIT_NAMES[second_dfa.truncated]} limit "
+                           f"after {len(second_dfa)} DFA states, so it cannot be combined. Raise the limits in the sidebar.")
+            else:
+                dfa_a = min_dfa.to_core()
+                dfa_b = staged(f"minimize:second@{second_key}", lambda: minimize(second_dfa).to_core())
+                empty = staged(f"is_empty:{operation}@{second_key}", is_empty, dfa_a, dfa_b, operation)
+                if empty.empty:
+                    st.info(f"The {operation.replace('_', ' ')} is empty ({empty.explored} state pairs explored).")
+                else:
+                    st.caption(f"Shortest word in the {operation.replace('_', ' ')}: `{format_word(empty.witness)}`")
+                    combined = staged(f"product:{operation}@{second_key}", product, dfa_a, dfa_b, operation, minimize=True)
+                    st.dataframe(automaton_table(Automaton.from_core(*combined)))
+
+# ----- Performance -----
+with st.expander("Performance"):
+    records = perf.records + artifacts.stats_for(cache_key)
+    st.caption(f"Run `{perf.run_id}`: {perf.total_seconds:.3f}s in pipeline stages "
+               f"({sum(1 for r in perf.records if r.get('cached'))} served from cache)")
+    st.dataframe([{k: v for k, v in r.items() if k != "ts"} for r in records])
+    shared = cache.metrics()
+    st.caption(f"Shared result store: {shared['entries']} entries, {shared['bytes'] / 2**20:.1f} of "
+               f"{shared['max_bytes'] / 2**20:.0f} MiB, hit rate {shared['hit_rate']:.0%}, "
+               f"{shared['saved_seconds']:.2f}s of compute saved, {shared['evictions']} evicted")
+if stats_log is not None:
+    perf.emit(stats_log)
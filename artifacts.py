@@ -0,0 +1,88 @@
+# artifacts.py
+"""
+Background generation of download artifacts (SVG, Excel, LaTeX).
+Jobs run on a small thread pool - SVG rendering is a Graphviz subprocess and
+the rest is short Python work - and finished results go into the pipeline
+cache, so each artifact is built at most once per automaton.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from instrument import PipelineStats
+
+
+class ArtifactManager:
+    def __init__(self, cache, max_workers=4, stats_log=None, max_stats=1024):
+        self.cache = cache
+        self.stats_log = stats_log
+        # (key, name) -> stage record of the build; the oldest go first past max_stats
+        self.stats = OrderedDict()
+        self.max_stats = max_stats
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact")
+        self._pending = {}  # (key, name) -> Future
+        self._lock = threading.Lock()
+
+    def request(self, key, name, build):
+        """
+        Future for artifact `name` of automaton `key`. A cached artifact comes
+        back as an already finished future; a build already in flight is
+        shared instead of being started twice.
+        """
+        missing = object()
+        value = self.cache.get(key, name, missing)
+        if value is not missing:
+            done = Future()
+            done.set_result(value)
+            return done
+        with self._lock:
+            future = self._pending.get((key, name))
+            if future is None:
+                future = self._pool.submit(self._run, key, name, build)
+                self._pending[(key, name)] = future
+            return future
+
+    def peek(self, key, name):
+        """Future for an artifact that is cached or being built, else None."""
+        with self._lock:
+            future = self._pending.get((key, name))
+        if future is not None:
+            return future
+        missing = object()
+        value = self.cache.get(key, name, missing, record=False)
+        if value is missing:
+            return None
+        done = Future()
+        done.set_result(value)
+        return done
+
+    def _run(self, key, name, build):
+        perf = PipelineStats(run_id=key[:12])
+        try:
+            value = perf.call(name, build)
+            return self.cache.put(key, name, value, perf.records[-1]["seconds"])
+        finally:
+            with self._lock:
+                self.stats[(key, name)] = perf.records[-1]
+                self.stats.move_to_end((key, name))
+                while len(self.stats) > self.max_stats:
+                    self.stats.popitem(last=False)
+            if self.stats_log is not None:
+                perf.emit(self.stats_log)
+            # Failed builds are forgotten too, so the next request retries
+            with self._lock:
+                self._pending.pop((key, name), None)
+
+    def stats_for(self, key):
+        """Build records of every artifact of automaton `key` built so far."""
+        with self._lock:
+            return [record for (k, _), record in self.stats.items() if k == key]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def progress(futures):
+    """(finished, total) over a collection of futures."""
+    futures = list(futures)
+    return sum(f.done() for f in futures), len(futures)
@@ -0,0 +1,205 @@
+# automaton.py
+"""
+Compact automaton representation shared by core, graph, latex and the dashboard.
+
+States are dense integer ids and symbols index a symbol table. Transitions
+live in flat array('i') rows instead of dicts keyed by (frozenset, str):
+    deterministic   targets[i * k + s] is the target id, -1 for none
+    otherwise       CSR: targets[offsets[i * k + s]:offsets[i * k + s + 1]]
+A state is either named (NFA states, minimized-DFA labels) or a subset of
+`member_names` stored as a bitmask (DFA states from subset construction);
+display labels are only built when asked for and then cached.
+"""
+from array import array
+
+DEAD_STATE = "q_D"
+
+
+class Automaton:
+    __slots__ = ("symbols", "num_states", "start", "accept", "targets", "offsets",
+                 "names", "members", "member_names", "unexplored", "truncated", "_symbol_ids", "_labels")
+
+    def __init__(self, symbols, num_states, start, accept, targets, offsets=None,
+                 names=None, members=None, member_names=None):
+        self.symbols = list(symbols)
+        self.num_states = num_states
+        self.start = start
+        self.accept = accept if isinstance(accept, bytearray) else bytearray(accept)
+        self.targets = targets
+        self.offsets = offsets
+        self.names = names
+        self.members = members
+        self.member_names = member_names
+        # Set by a budgeted determinize: state ids never expanded and the limit hit
+        self.unexplored = frozenset()
+        self.truncated = None
+        self._symbol_ids = {a: k for k, a in enumerate(self.symbols)}
+        self._labels = {}
+
+    def __len__(self):
+        return self.num_states
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "_labels"}
+
+    def __setstate__(self, state):
+        self.unexplored = frozenset()
+        self.truncated = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._labels = {}
+
+    @property
+    def deterministic(self):
+        return self.offsets is None
+
+    @property
+    def alphabet(self):
+        return [a for a in self.symbols if a != "ε"]
+
+    def symbol_id(self, symbol):
+        return self._symbol_ids.get(symbol, -1)
+
+    # ---------- States ----------
+    def is_final(self, i):
+        return bool(self.accept[i])
+
+    def finals(self):
+        return [i for i in range(self.num_states) if self.accept[i]]
+
+    def is_unexplored(self, i):
+        return i in self.unexplored
+
+    def member_set(self, i):
+        mask = self.members[i]
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.member_names[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def state(self, i):
+        """The state as the tuple API sees it: a name, or a frozenset of NFA states."""
+        if self.members is not None:
+            return frozenset(self.member_set(i))
+        return self.names[i]
+
+    def label(self, i, sep=", "):
+        """Display label; subsets are their sorted members joined with `sep`."""
+        key = (i, sep)
+        label = self._labels.get(key)
+        if label is None:
+            if self.members is not None:
+                label = sep.join(sorted(self.member_set(i)))
+            else:
+                label = str(self.names[i])
+            self._labels[key] = label
+        return label
+
+    def is_dead(self, i):
+        """The explicit dead state added by subset construction."""
+        if self.members is None:
+            return False
+        mask = self.members[i]
+        return mask & (mask - 1) == 0 and mask != 0 and self.member_names[mask.bit_length() - 1] == DEAD_STATE
+
+    # ---------- Transitions ----------
+    def successors(self, i, k):
+        """Target ids of state i on symbol id k."""
+        cell = i * len(self.symbols) + k
+        if self.offsets is None:
+            j = self.targets[cell]
+            return (j,) if j >= 0 else ()
+        return tuple(self.targets[self.offsets[cell]:self.offsets[cell + 1]])
+
+    def target(self, i, k):
+        """Deterministic target of state i on symbol id k, or -1."""
+        if self.offsets is None:
+            return self.targets[i * len(self.symbols) + k]
+        succ = self.successors(i, k)
+        return succ[0] if len(succ) == 1 else -1
+
+    def edges(self):
+        """(source, symbol id, target) triples, state by state."""
+        width = len(self.symbols)
+        for i in range(self.num_states):
+            for k in range(width):
+                for j in self.successors(i, k):
+                    yield i, k, j
+
+    @property
+    def num_transitions(self):
+        if self.offsets is None:
+            return sum(1 for j in self.targets if j >= 0)
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the transition and accept arrays."""
+        size = len(self.accept)
+        for arr in (self.targets, self.offsets):
+            if arr is not None:
+                size += arr.itemsize * len(arr)
+        return size
+
+    # ---------- Conversion ----------
+    @classmethod
+    def from_core(cls, states, alphabet, transitions, start_state, final_states, deterministic=None):
+        """
+        Build from the (states, alphabet, transitions, start, finals) tuple.
+        Values that are sets become nondeterministic rows (pass
+        deterministic=False for an NFA that may have none); frozenset states
+        become member bitmasks over the sorted union of their members.
+        """
+        states = list(states)
+        ids = {s: i for i, s in enumerate(states)}
+        symbols = list(alphabet)
+        for (_, a) in transitions:
+            if a not in symbols:
+                symbols.append(a)
+        sym_ids = {a: k for k, a in enumerate(symbols)}
+        width = len(symbols)
+        if deterministic is None:
+            deterministic = all(not isinstance(dst, (set, frozenset)) or (isinstance(dst, frozenset) and dst in ids)
+                                for dst in transitions.values())
+        if deterministic:
+            targets = array("i", [-1]) * (len(states) * width)
+            offsets = None
+            for (src, a), dst in transitions.items():
+                if dst in ids:
+                    targets[ids[src] * width + sym_ids[a]] = ids[dst]
+        else:
+            cells = {}
+            for (src, a), dsts in transitions.items():
+                if not isinstance(dsts, (set, frozenset)) or (isinstance(dsts, frozenset) and dsts in ids):
+                    dsts = (dsts,)
+                cells[ids[src] * width + sym_ids[a]] = sorted(ids[d] for d in dsts if d in ids)
+            offsets = array("i", [0])
+            targets = array("i")
+            for cell in range(len(states) * width):
+                targets.extend(cells.get(cell, ()))
+                offsets.append(len(targets))
+        finals = set(final_states)
+        accept = bytearray(1 if s in finals else 0 for s in states)
+        start = ids.get(start_state, -1)
+        if states and all(isinstance(s, frozenset) for s in states):
+            member_names = sorted({x for s in states for x in s}, key=str)
+            bit = {x: 1 << b for b, x in enumerate(member_names)}
+            members = [sum(bit[x] for x in s) for s in states]
+            return cls(symbols, len(states), start, accept, targets, offsets, members=members, member_names=member_names)
+        return cls(symbols, len(states), start, accept, targets, offsets, names=states)
+
+    def to_core(self):
+        """The (states, alphabet, transitions, start, finals) tuple the core functions use."""
+        states = [self.state(i) for i in range(self.num_states)]
+        transitions = {}
+        for i, k, j in self.edges():
+            key = (states[i], self.symbols[k])
+            if self.deterministic:
+                transitions[key] = states[j]
+            else:
+                transitions.setdefault(key, set()).add(states[j])
+        finals = {states[i] for i in self.finals()}
+        start = states[self.start] if self.start >= 0 else None
+        return states, self.alphabet, transitions, start, finals
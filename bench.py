@@ -0,0 +1,286 @@
+# bench.py
+"""
+Benchmarks for the conversion pipeline stages on synthetic automata.
+
+    python bench.py -o results.json
+    python bench.py --family nth_from_end --sizes 10,12,14 --baseline results.json
+
+Each stage is timed (best of --repeat runs) and then run once more under
+tracemalloc for its peak allocation. Results are written as JSON; with
+--baseline the run is compared against an earlier file and the exit code
+is 1 if any stage got slower than --threshold times the baseline.
+
+    python bench.py --match
+
+times the regex DFA matcher (regexp.Regex) against Python's `re` instead.
+
+    python bench.py --imports
+
+times a cold import of each module in a fresh interpreter and fails if a
+module in LIGHT_MODULES pulls in one of HEAVY_PACKAGES.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from core import epsilon_closure_of, remove_epsilon, nfa_to_dfa, minimize_dfa
+from generators import FAMILIES
+from regexp import Regex
+
+# Must import without any heavy package; the exporters load them on first use
+LIGHT_MODULES = ["core", "automaton", "equivalence", "product", "lazy_dfa", "regexp", "generators", "serialize",
+                 "instrument", "cache", "artifacts", "latex", "graph", "utils", "loader", "cli", "parallel"]
+HEAVY_PACKAGES = ["numpy", "pandas", "graphviz", "xlsxwriter", "openpyxl"]
+
+DEFAULT_SIZES = {
+    "random": [50, 100, 200, 400],
+    "regex": [25, 50, 100, 200],
+    "nth_from_end": [10, 12, 14, 16],
+    "epsilon_chain": [100, 200, 400, 800],
+}
+
+
+def pipeline_stages(nfa):
+    """(name, callable) per stage; each stage feeds the next through `out`."""
+    states, alphabet, transitions, start_state, final_states = nfa
+    out = {}
+
+    def closures():
+        return [epsilon_closure_of(s, transitions) for s in states]
+
+    def epsilon_free():
+        out["eps"] = remove_epsilon(states, alphabet, transitions, start_state, final_states)
+        return out["eps"]
+
+    def determinize():
+        _, nfa_no_e, nfa_finals = out["eps"]
+        out["dfa"] = nfa_to_dfa(states, alphabet, nfa_no_e, start_state, nfa_finals)
+        return out["dfa"]
+
+    def minimize():
+        dfa_states, dfa_trans, dfa_start, dfa_finals = out["dfa"]
+        out["min"] = minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+        return out["min"]
+
+    stages = [("epsilon_closure", closures), ("remove_epsilon", epsilon_free),
+              ("nfa_to_dfa", determinize), ("minimize_dfa", minimize)]
+    return stages, out
+
+
+def measure(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_case(family, size, seed=0, repeat=3):
+    nfa = FAMILIES[family](size, seed=seed)
+    stages, out = pipeline_stages(nfa)
+    result = {"family": family, "size": size, "seed": seed,
+              "nfa_states": len(nfa[0]), "nfa_transitions": sum(len(d) for d in nfa[2].values()),
+              "stages": {}}
+    for name, fn in stages:
+        seconds, peak = measure(fn, repeat)
+        result["stages"][name] = {"seconds": seconds, "peak_bytes": peak}
+    result["dfa_states"] = len(out["dfa"][0])
+    result["min_states"] = len(out["min"][0])
+    return result
+
+
+def match_cases(text_size=1_000_000, lines=100_000, seed=0):
+    """(name, pattern, DFA call, `re` call) pairs over seeded inputs."""
+    rng = random.Random(seed)
+    letters = "abcdefghij klmnopqrstuvwxyz"
+    text = "".join(rng.choice(letters) for _ in range(text_size))
+    words = ["".join(rng.choice(letters) for _ in range(rng.randint(5, 40))) for _ in range(lines)]
+    numbers = [str(rng.randint(0, 10**9)) + rng.choice(["", "", ".5", "e3", "x"]) for _ in range(lines)]
+    cases = []
+
+    def case(name, pattern, dfa_call, re_call):
+        regex, compiled = Regex(pattern), re.compile(pattern)
+        cases.append((name, pattern, lambda: dfa_call(regex), lambda: re_call(compiled)))
+
+    # Nothing to find, so both scan the whole text
+    case("search_text", r"\w+@\w+\.(com|org)", lambda r: r.search(text), lambda c: bool(c.search(text)))
+    # Exponential backtracking for `re`, linear for the DFA
+    pathological = "a" * 30
+    case("pathological", r"(a|aa)*c", lambda r: r.search(pathological), lambda c: bool(c.search(pathological)))
+    case("search_many", r"(ab|cd)[^ ]*z", lambda r: r.search_many(words), lambda c: [bool(c.search(w)) for w in words])
+    case("fullmatch_many", r"\d+(\.\d+)?(e\d+)?", lambda r: r.fullmatch_many(numbers),
+         lambda c: [bool(c.fullmatch(w)) for w in numbers])
+    return cases
+
+
+def run_match_suite(repeat=3, log=print):
+    results = []
+    for name, pattern, dfa_call, re_call in match_cases():
+        dfa_seconds, _ = measure(dfa_call, repeat)
+        re_seconds, _ = measure(re_call, repeat)
+        if list(dfa_call()) != list(re_call()) if name.endswith("_many") else dfa_call() != re_call():
+            raise AssertionError(f"{name}: the DFA matcher and re disagree on {pattern!r}")
+        result = {"case": name, "pattern": pattern, "dfa_seconds": dfa_seconds, "re_seconds": re_seconds}
+        results.append(result)
+        if log:
+            log(f"{name:>16} {pattern:>24}  dfa {dfa_seconds * 1000:9.2f}ms  re {re_seconds * 1000:9.2f}ms  "
+                f"x{re_seconds / dfa_seconds:.1f}")
+    return results
+
+
+def import_time(module, repeat=3):
+    """Best cold import time of `module` in a fresh interpreter, and the heavy packages it loaded."""
+    code = (f"import sys, time; t0 = time.perf_counter(); import {module}; seconds = time.perf_counter() - t0; "
+            f"print(seconds, *[p for p in {HEAVY_PACKAGES!r} if p in sys.modules])")
+    best = float("inf")
+    heavy = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(out[0]))
+        heavy = out[1:]
+    return {"module": module, "seconds": best, "heavy": heavy}
+
+
+def run_import_suite(modules=None, repeat=3, log=print):
+    results = []
+    for module in modules or LIGHT_MODULES + ["compiled", "NFA_DFA"]:
+        try:
+            result = import_time(module, repeat)
+        except subprocess.CalledProcessError as exc:
+            # e.g. the dashboard without streamlit installed
+            if log:
+                log(f"{module:>12}  failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+        result["regressed"] = module in LIGHT_MODULES and bool(result["heavy"])
+        results.append(result)
+        if log:
+            flag = "  HEAVY" if result["regressed"] else ""
+            log(f"{module:>12}  {result['seconds'] * 1000:8.1f}ms  {' '.join(result['heavy']) or '-'}{flag}")
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(families, sizes=None, seed=0, repeat=3, max_seconds=60.0, log=print):
+    results = []
+    for family in families:
+        for size in sizes or DEFAULT_SIZES[family]:
+            result = run_case(family, size, seed, repeat)
+            results.append(result)
+            if log:
+                log(format_result(result))
+            # Larger sizes of an exponential family would only take longer
+            if sum(s["seconds"] for s in result["stages"].values()) > max_seconds:
+                if log:
+                    log(f"  skipping larger {family} sizes (over {max_seconds:.0f}s)")
+                break
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def format_result(result):
+    stages = "  ".join(f"{name} {s['seconds'] * 1000:9.2f}ms/{s['peak_bytes'] / 2**20:7.1f}MiB"
+                       for name, s in result["stages"].items())
+    return (f"{result['family']:>14} {result['size']:>6}  nfa {result['nfa_states']:>6}  "
+            f"dfa {result['dfa_states']:>7}  min {result['min_states']:>7}  {stages}")
+
+
+def compare(current, baseline, threshold=1.2):
+    """Rows of (family, size, stage, baseline s, current s, ratio, regressed)."""
+    previous = {(r["family"], r["size"], r["seed"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        old = previous.get((r["family"], r["size"], r["seed"]))
+        if old is None:
+            continue
+        for stage, s in r["stages"].items():
+            if stage not in old["stages"]:
+                continue
+            before = old["stages"][stage]["seconds"]
+            ratio = s["seconds"] / before if before else float("inf")
+            # Sub-millisecond stages are all noise
+            regressed = ratio > threshold and s["seconds"] - before > 1e-3
+            rows.append((r["family"], r["size"], stage, before, s["seconds"], ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the NFA → DFA pipeline stages on synthetic automata.")
+    parser.add_argument("--family", action="append", choices=sorted(FAMILIES), help="generator family (repeatable; default: all)")
+    parser.add_argument("--sizes", help="comma separated sizes (default: per-family presets)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, best is kept")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="stop growing a family once a case takes this long")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio counted as a regression")
+    parser.add_argument("--match", action="store_true", help="benchmark the regex matcher against re instead")
+    parser.add_argument("--imports", action="store_true", help="time cold imports of the modules instead")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        results = run_import_suite(repeat=max(1, args.repeat))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"imports": results}, f, indent=2)
+        return 1 if any(r["regressed"] for r in results) else 0
+
+    if args.match:
+        results = run_match_suite(max(1, args.repeat))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"match": results}, f, indent=2)
+        return 0
+
+    families = args.family or sorted(FAMILIES)
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()] if args.sizes else None
+    report = run_suite(families, sizes, args.seed, max(1, args.repeat), args.max_seconds)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print(f"\ncompared with {args.baseline} (commit {baseline['meta'].get('commit')})")
+        for family, size, stage, before, after, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{family:>14} {size:>6} {stage:>16}  {before * 1000:9.2f}ms → {after * 1000:9.2f}ms  x{ratio:.2f}{flag}")
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
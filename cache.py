@@ -0,0 +1,231 @@
+# cache.py
+"""
+Fingerprint-keyed cache for conversion pipeline results.
+Stage outputs are stored under a canonical hash of the NFA with a bounded,
+size-aware LRU in memory and optional pickle persistence on disk.
+
+One PipelineCache is shared by every session of a server process, so it
+is thread-safe, and get_or_compute() is single-flight: while one thread
+computes a stage, others asking for the same (key, stage) wait for its
+result instead of computing it again. metrics() reports the hit rate and
+the compute time the hits saved.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def fingerprint(states, alphabet, transitions, start_state, final_states):
+    """Canonical SHA-256 of an NFA: independent of set/dict ordering."""
+    canonical = {
+        "states": sorted(str(s) for s in states),
+        "alphabet": sorted(str(a) for a in alphabet),
+        "transitions": sorted(
+            [str(src), str(a), sorted(str(d) for d in dsts)]
+            for (src, a), dsts in transitions.items() if dsts
+        ),
+        "start": str(start_state),
+        "finals": sorted(str(f) for f in final_states),
+    }
+    payload = json.dumps(canonical, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def layout_fingerprint(states, alphabet):
+    """Short hash of state/alphabet order, for outputs whose row/column order matters."""
+    payload = json.dumps([list(map(str, states)), list(map(str, alphabet))], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class _Flight:
+    """A computation in progress that other threads can wait on."""
+    __slots__ = ("done", "value", "error", "seconds")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.seconds = 0.0
+
+
+class PipelineCache:
+    def __init__(self, max_bytes=256 * 2**20, directory=None, max_disk_bytes=1024 * 2**20):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # (key, stage) -> (value, size, compute seconds)
+        self._bytes = 0
+        self._flights = {}  # (key, stage) -> _Flight
+        self._counts = dict.fromkeys(("hits", "disk_hits", "misses", "shared", "computed", "evictions"), 0)
+        self._compute_seconds = 0.0
+        self._saved_seconds = 0.0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def _path(self, key, stage):
+        return os.path.join(self.directory, f"{key}-{re.sub(r'[^A-Za-z0-9_.@-]', '_', stage)}.pkl")
+
+    def get(self, key, stage, default=None, record=True):
+        """Cached value or `default`; record=False keeps the lookup out of metrics()."""
+        with self._lock:
+            entry = self._entries.get((key, stage))
+            if entry is not None:
+                self._entries.move_to_end((key, stage))
+                if record:
+                    self._counts["hits"] += 1
+                    self._saved_seconds += entry[2]
+                return entry[0]
+        if self.directory:
+            try:
+                with open(self._path(key, stage), "rb") as f:
+                    blob = f.read()
+                value = pickle.loads(blob)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                # The compute time is not stored on disk, so none is credited
+                self._store(key, stage, value, len(blob), 0.0)
+                if record:
+                    with self._lock:
+                        self._counts["disk_hits"] += 1
+                return value
+        if record:
+            with self._lock:
+                self._counts["misses"] += 1
+        return default
+
+    def put(self, key, stage, value, seconds=None):
+        """Store `value`; `seconds` is what computing it took, credited on later hits."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if seconds is not None:
+            with self._lock:
+                self._counts["computed"] += 1
+                self._compute_seconds += seconds
+        self._store(key, stage, value, len(blob), seconds or 0.0)
+        if self.directory:
+            tmp = self._path(key, stage) + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, self._path(key, stage))
+                self._trim_disk()
+            except OSError:
+                pass
+        return value
+
+    def get_or_compute(self, key, stage, compute, store_if=None):
+        """
+        Cached value, or compute() stored. Concurrent callers for the same
+        (key, stage) share one call; if it raises, they all get the error.
+        A value for which store_if(value) is false is shared with the
+        callers waiting for it but not stored.
+        """
+        missing = object()
+        value = self.get(key, stage, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            flight = self._flights.get((key, stage))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(key, stage)] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                # Counted once: the lookup above was a miss only until the result was shared
+                self._counts["misses"] -= 1
+                self._counts["shared"] += 1
+                self._saved_seconds += flight.seconds
+            return flight.value
+        try:
+            # The previous leader may have finished since our lookup
+            value = self.get(key, stage, missing, record=False)
+            if value is not missing:
+                with self._lock:
+                    self._counts["misses"] -= 1
+                    self._counts["shared"] += 1
+            else:
+                t0 = time.perf_counter()
+                value = compute()
+                flight.seconds = time.perf_counter() - t0
+                if store_if is None or store_if(value):
+                    self.put(key, stage, value, flight.seconds)
+            flight.value = value
+            return value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop((key, stage), None)
+            flight.done.set()
+
+    def _store(self, key, stage, value, size, seconds):
+        with self._lock:
+            old = self._entries.pop((key, stage), None)
+            if old is not None:
+                self._bytes -= old[1]
+            # Values larger than the whole budget are returned but not kept
+            if size > self.max_bytes:
+                return
+            self._entries[(key, stage)] = (value, size, seconds)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._counts["evictions"] += 1
+
+    def metrics(self):
+        """
+        Counters since start-up. Each lookup lands in one of hits, disk_hits,
+        misses or shared (served by another caller's computation); hit_rate
+        counts all but misses and saved_seconds is the compute time those
+        would have cost.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            lookups = counts["hits"] + counts["disk_hits"] + counts["misses"] + counts["shared"]
+            served = counts["hits"] + counts["disk_hits"] + counts["shared"]
+            return {**counts, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "in_flight": len(self._flights), "hit_rate": served / lookups if lookups else 0.0,
+                    "compute_seconds": self._compute_seconds, "saved_seconds": self._saved_seconds}
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_atime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,156 @@
+# cli.py
+"""
+Headless batch conversion of NFA workbooks / JSON definitions.
+
+    python cli.py examples/ "more/*.xlsx" -o out --jobs 8
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core import remove_epsilon, nfa_to_dfa, minimize_dfa
+from instrument import PipelineStats
+from loader import load_nfa
+
+NFA_EXTENSIONS = (".xlsx", ".xlsm", ".json")
+
+
+def collect_inputs(patterns):
+    """Expand directories and glob patterns into (path, output stem) pairs."""
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                for name in sorted(files):
+                    if name.lower().endswith(NFA_EXTENSIONS) and not name.startswith("~$"):
+                        path = os.path.join(root, name)
+                        found.append((path, os.path.splitext(os.path.relpath(path, pattern))[0]))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+            for path in matches:
+                found.append((path, os.path.splitext(os.path.basename(path))[0]))
+    # Same stem from different places: keep outputs apart
+    seen = {}
+    unique = []
+    for path, stem in found:
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        unique.append((path, stem if count == 0 else f"{stem}_{count}"))
+    return unique
+
+
+def convert_file(path, out_dir, svg=True, excel=True, latex=True, max_graph_states=None, trim=False, longtable=False):
+    perf = PipelineStats(path=path)
+    t_start = time.perf_counter()
+    def result(**fields):
+        # Stages of a composite step (excel:nfa_table, ...) add up under its prefix
+        timings = {}
+        for r in perf.records:
+            key = r["stage"].split(":")[0]
+            timings[key] = timings.get(key, 0.0) + r.get("seconds", 0.0)
+        return {"path": path, "seconds": time.perf_counter() - t_start, "timings": timings, "stats": perf, **fields}
+    def write(name, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(data)
+    try:
+        states, alphabet, transitions, start_state, final_states = perf.call("load", load_nfa, path, validate=True)
+        closures, nfa_no_e, nfa_finals = perf.call("remove_epsilon", remove_epsilon, states, alphabet, transitions, start_state, final_states)
+        dfa_states, dfa_trans, dfa_start, dfa_finals = perf.call("nfa_to_dfa", nfa_to_dfa, states, alphabet, nfa_no_e, start_state, nfa_finals, trim=trim)
+        minimized = perf.call("minimize_dfa", minimize_dfa, dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, trim=trim)
+        min_states, min_alphabet, min_trans, min_start, min_finals = minimized
+        os.makedirs(out_dir, exist_ok=True)
+        nfa = (states, alphabet, transitions, start_state, nfa_finals)
+        dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+        if excel:
+            from utils import nfa_table_rows, dfa_table_rows, min_dfa_table_rows, rows_to_excel
+            for name, rows, automaton in (("nfa_table", nfa_table_rows, nfa), ("dfa_table", dfa_table_rows, dfa), ("minimized_dfa_table", min_dfa_table_rows, minimized)):
+                # Rows go straight from the automaton into the workbook file
+                path_out = os.path.join(out_dir, name + ".xlsx")
+                with perf.stage(f"excel:{name}") as record:
+                    rows_to_excel(rows(*automaton), path_out)
+                    record["bytes"] = os.path.getsize(path_out)
+        if latex:
+            from latex import iter_nfa_latex, iter_dfa_latex, write_latex
+            from utils import nfa_columns
+            parts = [
+                ("latex:nfa", iter_nfa_latex(states, nfa_columns(alphabet), transitions, start_state, nfa_finals, caption="Original NFA Transition Table", longtable=longtable)),
+                ("latex:dfa", iter_dfa_latex(*dfa, caption="Original DFA Transition Table", longtable=longtable)),
+                ("latex:min_dfa", iter_dfa_latex(*minimized, caption="Minimized DFA Transition Table", longtable=longtable)),
+            ]
+            with open(os.path.join(out_dir, "tables.tex"), "w", encoding="utf-8") as f:
+                for stage, chunks in parts:
+                    with perf.stage(stage) as record:
+                        start = f.tell()
+                        write_latex(chunks, f)
+                        f.write("\n\n" if stage != "latex:min_dfa" else "\n")
+                        record["bytes"] = f.tell() - start
+        if svg:
+            from graph import LARGE_GRAPH_STATES, draw_nfa_graph, draw_dfa_graph, render_svg
+            options = dict(merge_edges=True, layout_threshold=LARGE_GRAPH_STATES, max_states=max_graph_states)
+            for name, draw, automaton in (("nfa", draw_nfa_graph, nfa), ("dfa", draw_dfa_graph, dfa), ("min_dfa", draw_dfa_graph, minimized)):
+                dot = perf.call(f"svg:{name}:dot", draw, *automaton, **options)
+                svg_bytes, _ = perf.call(f"svg:{name}", render_svg, dot)
+                write(name + ".svg", svg_bytes)
+        return result(ok=True, dfa_states=len(dfa_states), min_states=len(min_states),
+                      trimmed_states=perf.get("nfa_to_dfa").get("trimmed_states"))
+    except Exception as exc:
+        return result(ok=False, error=f"{type(exc).__name__}: {exc}", traceback=traceback.format_exc())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert NFA workbooks (.xlsx) or JSON definitions to DFA / minimized DFA outputs.")
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="nfa_dfa_out", help="output directory (default: nfa_dfa_out)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-svg", action="store_true", help="skip Graphviz SVG rendering")
+    parser.add_argument("--no-excel", action="store_true", help="skip Excel table export")
+    parser.add_argument("--no-latex", action="store_true", help="skip LaTeX table export")
+    parser.add_argument("--longtable", action="store_true", help="write LaTeX tables as longtables that break across pages")
+    parser.add_argument("--max-graph-states", type=int, default=None, help="draw at most this many states per diagram")
+    parser.add_argument("--trim", action="store_true", help="drop useless NFA states before determinization")
+    parser.add_argument("--stats-log", help="append per-stage stats as JSON lines to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print tracebacks for failures")
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No NFA definitions found.", file=sys.stderr)
+        return 2
+    options = dict(svg=not args.no_svg, excel=not args.no_excel, latex=not args.no_latex, max_graph_states=args.max_graph_states, trim=args.trim, longtable=args.longtable)
+    results = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max(1, args.jobs)) as pool:
+        futures = [pool.submit(convert_file, path, os.path.join(args.output, stem), **options) for path, stem in inputs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if args.stats_log:
+                result["stats"].emit(args.stats_log)
+            if result["ok"]:
+                stages = ", ".join(f"{k} {v:.3f}s" for k, v in result["timings"].items())
+                if result["trimmed_states"] is not None:
+                    stages += f", {result['trimmed_states']} NFA states trimmed"
+                print(f"ok    {result['path']}  {result['seconds']:.3f}s  "
+                      f"({result['dfa_states']} DFA / {result['min_states']} min states; {stages})")
+            else:
+                print(f"FAIL  {result['path']}  {result['error']}", file=sys.stderr)
+                if args.verbose:
+                    print(result["traceback"], file=sys.stderr)
+    failures = [r for r in results if not r["ok"]]
+    print(f"\n{len(results) - len(failures)}/{len(results)} converted in {time.perf_counter() - t0:.3f}s")
+    if failures:
+        print(f"{len(failures)} failed:", file=sys.stderr)
+        for r in sorted(failures, key=lambda r: r["path"]):
+            print(f"  {r['path']}: {r['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# compiled.py
+"""
+Dense NumPy transition-matrix backend for fast DFA simulation.
+compile_dfa() turns the output of core.nfa_to_dfa / core.minimize_dfa into
+an int32 matrix so large batches of strings can be run in lockstep.
+"""
+import numpy as np
+
+
+class CompiledDFA:
+    """
+    table[state, column] is the next state id. Besides one column per
+    symbol there is a padding column (identity, used past the end of shorter
+    strings) and an unknown-symbol column that goes to the sink row.
+    """
+    def __init__(self, states, symbols, table, start, accept):
+        self.states = states
+        self.symbols = symbols
+        self.columns = {a: k for k, a in enumerate(symbols)}
+        self.pad = len(symbols)
+        self.unknown = len(symbols) + 1
+        self.sink = len(states)
+        self.table = table
+        self.start = start
+        self.accept = accept
+        self._char_lut = None
+
+    def __repr__(self):
+        return f"CompiledDFA(states={len(self.states)}, symbols={len(self.symbols)})"
+
+    def encode(self, strings):
+        """Symbol codes as an (n, max_len) int32 matrix padded with the pad column."""
+        strings = list(strings)
+        if all(len(a) == 1 for a in self.symbols) and all(isinstance(w, str) for w in strings):
+            return self._encode_chars(strings)
+        width = max((len(w) for w in strings), default=0)
+        codes = np.full((len(strings), width), self.pad, dtype=np.int32)
+        for row, w in enumerate(strings):
+            codes[row, :len(w)] = [self.columns.get(a, self.unknown) for a in w]
+        return codes
+
+    def _encode_chars(self, strings):
+        width = max((len(w) for w in strings), default=0)
+        if width == 0:
+            return np.full((len(strings), 0), self.pad, dtype=np.int32)
+        # Fixed-width UTF-32 view: one code point per cell, 0 past the end
+        points = np.array(strings, dtype=f"<U{width}").view(np.uint32).reshape(len(strings), width)
+        lut = self._char_lut
+        if lut is None:
+            size = max((ord(a) for a in self.symbols), default=0) + 1
+            lut = np.full(size, self.unknown, dtype=np.int32)
+            for a, k in self.columns.items():
+                lut[ord(a)] = k
+            self._char_lut = lut
+        codes = np.full(points.shape, self.unknown, dtype=np.int32)
+        known = points < len(lut)
+        codes[known] = lut[points[known]]
+        # NUL is the padding value; it is only a real symbol if it is inside a string
+        lengths = np.fromiter((len(w) for w in strings), dtype=np.int64, count=len(strings))
+        codes[np.arange(width)[None, :] >= lengths[:, None]] = self.pad
+        return codes
+
+    def run_batch(self, strings):
+        """Final state id of every string."""
+        codes = self.encode(strings)
+        current = np.full(codes.shape[0], self.start, dtype=np.int32)
+        table = self.table
+        for j in range(codes.shape[1]):
+            current = table[current, codes[:, j]]
+        return current
+
+    def accepts_batch(self, strings, batch_size=100000):
+        strings = list(strings)
+        result = np.zeros(len(strings), dtype=bool)
+        for lo in range(0, len(strings), batch_size):
+            chunk = strings[lo:lo + batch_size]
+            result[lo:lo + len(chunk)] = self.accept[self.run_batch(chunk)]
+        return result
+
+    def accepts(self, string):
+        return bool(self.accepts_batch([string])[0])
+
+
+def compile_dfa(states, alphabet, transitions, start_state, final_states):
+    """
+    Works for both frozenset-labelled DFAs (nfa_to_dfa) and string-labelled
+    minimized DFAs (minimize_dfa). Missing transitions and targets outside
+    the state list go to an extra sink row.
+    """
+    states = list(states)
+    symbols = [a for a in alphabet if a != "ε"]
+    ids = {s: i for i, s in enumerate(states)}
+    columns = {a: k for k, a in enumerate(symbols)}
+    sink = len(states)
+    table = np.full((sink + 1, len(symbols) + 2), sink, dtype=np.int32)
+    # Padding column keeps every state where it is
+    table[:, len(symbols)] = np.arange(sink + 1, dtype=np.int32)
+    for (src, a), dst in transitions.items():
+        i = ids.get(src)
+        k = columns.get(a)
+        if i is None or k is None:
+            continue
+        table[i, k] = ids.get(dst, sink)
+    accept = np.zeros(sink + 1, dtype=bool)
+    for s in final_states:
+        if s in ids:
+            accept[ids[s]] = True
+    start = ids.get(start_state, sink)
+    return CompiledDFA(states, symbols, table, start, accept)
@@ -3,10 +3,51 @@
 """
 Core logic for NFA→DFA conversion and minimization.
 """
+import time
+from array import array
+
+from automaton import Automaton, DEAD_STATE
 
 def parse_list(raw: str):
     return [x.strip() for x in raw.split(",") if x.strip()]
 
+# ---------- Bitset helpers ----------
+def intern_states(states, transitions=None):
+    """Map every state name to a dense integer id (bit position)."""
+    index = {}
+    for s in states:
+        index.setdefault(s, len(index))
+    for (src, _), dsts in (transitions or {}).items():
+        index.setdefault(src, len(index))
+        for d in dsts:
+            index.setdefault(d, len(index))
+    return index
+
+
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def states_to_mask(states, index):
+    mask = 0
+    for s in states:
+        mask |= 1 << index[s]
+    return mask
+
+
+def successor_masks(index, alphabet, transitions):
+    """Per-symbol table: succ[a][i] is the bitmask of δ(state i, a)."""
+    succ = {a: [0] * len(index) for a in alphabet}
+    for (src, a), dsts in transitions.items():
+        row = succ.get(a)
+        if row is not None:
+            row[index[src]] |= states_to_mask(dsts, index)
+    return succ
+
+
 # ---------- NFA → DFA functions ----------
 def epsilon_closure_of(state, enfa):
     stack = [state]
@@ -20,65 +61,420 @@ def epsilon_closure_of(state, enfa):
     return closure
 
 
-def remove_epsilon(states, alphabet, enfa, start_state, final_states):
-    closures = {s: epsilon_closure_of(s, enfa) for s in states}
+def epsilon_closure_masks(index, enfa):
+    """
+    ε-closures of all states in one pass.
+    The ε-graph is condensed into strongly connected components (iterative
+    Tarjan); components are emitted in reverse topological order, so each
+    closure is its members plus the already finished closures it points to.
+    Returns (comp, closure, dag): comp[i] is the component of state i,
+    closure[c] the bitmask shared by every member of component c and dag[c]
+    the components directly ε-reachable from c (all numbered below c).
+    """
+    eps = [[] for _ in range(len(index))]
+    for (src, a), dsts in enfa.items():
+        if a == "ε":
+            eps[index[src]].extend(index[d] for d in dsts)
+    return condense_epsilon(eps)
+
+
+def condense_epsilon(eps):
+    """epsilon_closure_masks over adjacency lists: eps[i] lists the ε-successors of i."""
+    n = len(eps)
+    order = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    comp = [-1] * n
+    closure = []
+    dag = []
+    stack = []
+    counter = 0
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            v, pos = work[-1]
+            if pos < len(eps[v]):
+                work[-1] = (v, pos + 1)
+                w = eps[v][pos]
+                if order[w] == -1:
+                    order[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w]:
+                    low[v] = min(low[v], order[w])
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                low[u] = min(low[u], low[v])
+            if low[v] != order[v]:
+                continue
+            c = len(closure)
+            members = []
+            while True:
+                w = stack.pop()
+                on_stack[w] = False
+                comp[w] = c
+                members.append(w)
+                if w == v:
+                    break
+            mask = 0
+            succ_comps = set()
+            for w in members:
+                mask |= 1 << w
+                for x in eps[w]:
+                    if comp[x] != c:
+                        succ_comps.add(comp[x])
+            for d in succ_comps:
+                mask |= closure[d]
+            closure.append(mask)
+            dag.append(sorted(succ_comps))
+    return comp, closure, dag
+
+
+def epsilon_free_masks(index, alphabet, enfa, comp, closure, dag):
+    """
+    Per-symbol ε-free successor masks, one per ε-component.
+    Since closure distributes over union, a component's row is the closed
+    step of its own members joined with the rows of the components below it.
+    """
+    return close_rows(successor_masks(index, alphabet, enfa), alphabet, comp, closure, dag)
+
+
+def close_rows(succ, alphabet, comp, closure, dag):
+    """epsilon_free_masks over per-symbol successor masks (see successor_masks)."""
+    rows = {}
+    for a in alphabet:
+        step = [0] * len(closure)
+        for i, c in enumerate(comp):
+            step[c] |= succ[a][i]
+        row = []
+        for c in range(len(closure)):
+            # Closure of all reachable states
+            closure_dests = 0
+            for d in iter_bits(step[c]):
+                closure_dests |= closure[comp[d]]
+            for d in dag[c]:
+                closure_dests |= row[d]
+            row.append(closure_dests)
+        rows[a] = row
+    return rows
+
+
+def remove_epsilon(states, alphabet, enfa, start_state, final_states, stats=None):
+    index = intern_states(states, enfa)
+    names = list(index)
+    comp, closure, dag = epsilon_closure_masks(index, enfa)
+    rows = epsilon_free_masks(index, alphabet, enfa, comp, closure, dag)
+    final_mask = states_to_mask((f for f in final_states if f in index), index)
+    # Members of an ε-component share one closure and one row per symbol
+    closure_sets = [frozenset(names[i] for i in iter_bits(m)) for m in closure]
+    row_sets = {}
+    closures = {}
     nfa_no_e = {}
     nfa_finals = set()
     for s in states:
-        if any(f in closures[s] for f in final_states):
+        c = comp[index[s]]
+        closures[s] = closure_sets[c]
+        if closure[c] & final_mask:
             nfa_finals.add(s)
         for a in alphabet:
-            dests = set()
-            for t in closures[s]:
-                dests.update(enfa.get((t, a), set()))
-            # Closure of all reachable states
-            closure_dests = set()
-            for d in dests:
-                closure_dests.update(closures[d])
-            if closure_dests:
-                nfa_no_e[(s, a)] = closure_dests
+            mask = rows[a][c]
+            if mask:
+                dests = row_sets.get((c, a))
+                if dests is None:
+                    dests = row_sets[(c, a)] = frozenset(names[i] for i in iter_bits(mask))
+                nfa_no_e[(s, a)] = dests
+    if stats is not None:
+        stats.update(closures=len(closures), epsilon_components=len(closure), transitions=len(nfa_no_e))
     return closures, nfa_no_e, nfa_finals
 
 
-def nfa_to_dfa(states, alphabet, nfa_no_e, start_state, final_states):
-    dfa_start = frozenset([start_state])
-    dfa_states = [dfa_start]
-    unmarked = [dfa_start]
-    dfa_trans = {}
-    dfa_finals = set()
-    dead_state = frozenset(["q_D"])
-    has_dead_state = False
-    # Only use non-epsilon symbols for DFA transitions
-    dfa_alphabet = [a for a in alphabet if a != "ε"]
+# ---------- Trimming ----------
+def useful_states(adjacency, start, finals, backward=True):
+    """
+    Flags (bytearray) of the states reachable from `start` by a forward BFS
+    over `adjacency` (lists of integer ids) and, if `backward`, that also
+    reach one of `finals` by a BFS over the reversed edges.
+    The start state is always kept.
+    """
+    n = len(adjacency)
+    forward = bytearray(n)
+    forward[start] = 1
+    queue = [start]
+    for i in queue:
+        for j in adjacency[i]:
+            if not forward[j]:
+                forward[j] = 1
+                queue.append(j)
+    if not backward:
+        return forward
+    reverse = [[] for _ in range(n)]
+    for i in queue:
+        for j in adjacency[i]:
+            reverse[j].append(i)
+    keep = bytearray(n)
+    queue = [f for f in finals if forward[f]]
+    for f in queue:
+        keep[f] = 1
+    for j in queue:
+        for i in reverse[j]:
+            if not keep[i]:
+                keep[i] = 1
+                queue.append(i)
+    keep[start] = 1
+    return keep
+
+
+def trim_nfa(states, transitions, start_state, final_states, stats=None):
+    """
+    Drop the states that are unreachable from the start or can never reach a
+    final state, with the transitions touching them.
+    Returns (states, transitions, final_states); ε-moves are followed too.
+    """
+    states = list(states)
+    index = intern_states(states + [start_state], transitions)
+    adjacency = [[] for _ in index]
+    for (src, _), dsts in transitions.items():
+        adjacency[index[src]].extend(index[d] for d in dsts)
+    keep = useful_states(adjacency, index[start_state], [index[f] for f in final_states if f in index])
+    kept_states = [s for s in states if keep[index[s]]]
+    kept = {}
+    removed = 0
+    for (src, a), dsts in transitions.items():
+        if not keep[index[src]]:
+            removed += len(dsts)
+            continue
+        live = [d for d in dsts if keep[index[d]]]
+        removed += len(dsts) - len(live)
+        if len(live) == len(dsts):
+            kept[(src, a)] = dsts
+        elif live:
+            kept[(src, a)] = type(dsts)(live) if isinstance(dsts, (set, frozenset)) else set(live)
+    finals = {f for f in final_states if f in index and keep[index[f]]}
+    if stats is not None:
+        stats.update(trimmed_states=len(states) - len(kept_states), trimmed_transitions=removed)
+    return kept_states, kept, finals
+
+
+def trim_dfa(states, alphabet, transitions, start_state, final_states, stats=None):
+    """
+    Drop the DFA states that are unreachable from the start.
+    States that cannot reach a final state are kept: removing them would
+    leave the DFA partial, and minimization merges them into one block anyway.
+    Returns (states, transitions, final_states).
+    """
+    states = list(states)
+    index = {s: i for i, s in enumerate(states)}
+    index.setdefault(start_state, len(index))
+    adjacency = [[] for _ in index]
+    for (src, a), dst in transitions.items():
+        if src in index and dst in index:
+            adjacency[index[src]].append(index[dst])
+    keep = useful_states(adjacency, index[start_state], (), backward=False)
+    kept_states = [s for s in states if keep[index[s]]]
+    kept = {(src, a): dst for (src, a), dst in transitions.items() if src in index and keep[index[src]]}
+    finals = {f for f in final_states if f in index and keep[index[f]]}
+    if stats is not None:
+        stats.update(trimmed_states=len(states) - len(kept_states), trimmed_transitions=len(transitions) - len(kept))
+    return kept_states, kept, finals
+
+
+# ---------- Integer-indexed subset construction ----------
+class BudgetExceeded(Exception):
+    """A construction that cannot return a partial result ran out of budget."""
+
+
+class Budget:
+    """
+    Limits for subset construction: DFA states discovered, an estimate of
+    the bytes held, and wall-clock seconds. None leaves a limit off.
+    Call start() before each construction; `reason` names the limit hit.
+    max_states is checked as states are discovered, so a partial DFA has at
+    most max_states states; the one exception is the start state, which is
+    always expanded and may discover up to |Σ| more.
+    """
+    def __init__(self, max_states=None, max_bytes=None, seconds=None):
+        self.max_states = max_states
+        self.max_bytes = max_bytes
+        self.seconds = seconds
+        self.deadline = None
+        self.reason = None
+
+    def start(self):
+        self.deadline = None if self.seconds is None else time.perf_counter() + self.seconds
+        self.reason = None
+        return self
+
+    def exceeded(self, num_states, nbytes):
+        if self.max_states is not None and num_states > self.max_states:
+            self.reason = "max_states"
+        elif self.max_bytes is not None and nbytes >= self.max_bytes:
+            self.reason = "max_bytes"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason is not None
+
+
+def subset_bytes(num_nfa_states, width):
+    """Rough CPython size of one explored subset: mask, id entry and row."""
+    return 160 + num_nfa_states // 8 + 36 * width
+
+
+def subset_construction(succ, alphabet, start_mask, stats=None, budget=None):
+    """
+    Explore the subsets reachable from start_mask.
+    Returns (masks, rows, order): masks[i] is the subset of DFA state i,
+    rows[i][k] the DFA id reached on alphabet[k] (-1 for the empty set) and
+    order the sequence in which DFA states were processed.
+    With a budget, exploration stops once a limit is hit; the subsets
+    discovered but not processed yet keep rows[i] = None.
+    """
+    masks = [start_mask]
+    ids = {start_mask: 0}
+    rows = [None]
+    order = []
+    unmarked = [0]
+    tables = [succ[a] for a in alphabet]
+    peak = 0
+    if budget is not None:
+        budget.start()
+        per_state = subset_bytes(len(tables[0]) if tables else 0, len(tables))
     while unmarked:
-        S = unmarked.pop()
-        for a in dfa_alphabet:
-            dest = set()
-            for s in S:
-                dest.update(nfa_no_e.get((s, a), set()))
-            dest_frozen = frozenset(dest)
+        # The start subset is always processed
+        if budget is not None and order and budget.exceeded(len(masks), len(masks) * per_state):
+            break
+        if len(unmarked) > peak:
+            peak = len(unmarked)
+        i = unmarked.pop()
+        order.append(i)
+        S = masks[i]
+        first_new = len(masks)
+        row = []
+        for table in tables:
+            dest = 0
+            m = S
+            while m:
+                low = m & -m
+                dest |= table[low.bit_length() - 1]
+                m ^= low
             if dest:
-                if dest_frozen not in dfa_states:
-                    dfa_states.append(dest_frozen)
-                    unmarked.append(dest_frozen)
-                dfa_trans[(S, a)] = dest_frozen
+                j = ids.get(dest)
+                if j is None:
+                    j = len(masks)
+                    ids[dest] = j
+                    masks.append(dest)
+                    rows.append(None)
+                    unmarked.append(j)
+                row.append(j)
             else:
+                row.append(-1)
+        if budget is not None and len(order) > 1 and budget.exceeded(len(masks), len(masks) * per_state) \
+                and budget.reason == "max_states":
+            # Expanding i discovered too many states: undo it, i stays unexplored
+            for dest in masks[first_new:]:
+                del ids[dest]
+            del unmarked[len(unmarked) - (len(masks) - first_new):]
+            del masks[first_new:], rows[first_new:]
+            order.pop()
+            unmarked.append(i)
+            break
+        rows[i] = row
+    if stats is not None:
+        stats.update(subsets=len(masks), worklist_peak=peak)
+        if unmarked:
+            stats.update(truncated=budget.reason, unexplored=len(unmarked))
+    return masks, rows, order
+
+
+def subsets_to_dfa(names, alphabet, masks, rows, order, final_mask):
+    """Adapter from the integer engine to the frozenset-based DFA contract."""
+    subsets = [frozenset(names[i] for i in iter_bits(m)) for m in masks]
+    dead_state = frozenset(["q_D"])
+    dfa_trans = {}
+    has_dead_state = False
+    for i in order:
+        S = subsets[i]
+        for a, j in zip(alphabet, rows[i]):
+            if j < 0:
                 dfa_trans[(S, a)] = dead_state
                 has_dead_state = True
+            else:
+                dfa_trans[(S, a)] = subsets[j]
+    dfa_states = subsets
+    dfa_finals = {subsets[i] for i, m in enumerate(masks) if m & final_mask}
     # Add dead state only if needed
     if has_dead_state:
         dfa_states.append(dead_state)
-        for a in dfa_alphabet:
+        for a in alphabet:
             dfa_trans[(dead_state, a)] = dead_state
-    for S in dfa_states:
-        if any(s in final_states for s in S):
-            dfa_finals.add(S)
-    return dfa_states, dfa_trans, dfa_start, dfa_finals
+        if any(names[i] == "q_D" for i in iter_bits(final_mask)):
+            dfa_finals.add(dead_state)
+    return dfa_states, dfa_trans, subsets[0], dfa_finals
+
+
+class PartialStates(list):
+    """The dfa_states of a PartialDFA; keeps `unexplored` once the tuple is unpacked."""
+    def __init__(self, states, unexplored):
+        super().__init__(states)
+        self.unexplored = unexplored
+
+
+class PartialDFA(tuple):
+    """
+    nfa_to_dfa result cut short by a Budget. It unpacks like the usual
+    (dfa_states, dfa_trans, dfa_start, dfa_finals); the subsets in
+    `unexplored` are states without computed transitions and `reason` is
+    the limit that was hit. dfa_states is a PartialStates, so
+    minimize_dfa can refuse it.
+    """
+    def __new__(cls, dfa, unexplored, reason):
+        dfa = (PartialStates(dfa[0], unexplored),) + tuple(dfa[1:])
+        self = super().__new__(cls, dfa)
+        self.unexplored = unexplored
+        self.reason = reason
+        return self
+
+    def __getnewargs__(self):
+        return tuple(self), self.unexplored, self.reason
+
+
+def nfa_to_dfa(states, alphabet, nfa_no_e, start_state, final_states, workers=None, trim=False, budget=None, stats=None):
+    if trim:
+        # Useless NFA states only make the subsets bigger
+        states, nfa_no_e, final_states = trim_nfa(states, nfa_no_e, start_state, final_states, stats)
+    # Budgets are enforced by the serial engine only
+    if workers and budget is None:
+        # Process-pool exploration, same result as the serial engine
+        from parallel import parallel_nfa_to_dfa
+        dfa = parallel_nfa_to_dfa(states, alphabet, nfa_no_e, start_state, final_states, workers)
+        if stats is not None:
+            stats.update(dfa_states=len(dfa[0]), workers=workers)
+        return dfa
+    # Only use non-epsilon symbols for DFA transitions
+    dfa_alphabet = [a for a in alphabet if a != "ε"]
+    index = intern_states(list(states) + [start_state], nfa_no_e)
+    names = list(index)
+    succ = successor_masks(index, dfa_alphabet, nfa_no_e)
+    final_mask = states_to_mask((f for f in final_states if f in index), index)
+    masks, rows, order = subset_construction(succ, dfa_alphabet, 1 << index[start_state], stats, budget)
+    dfa = subsets_to_dfa(names, dfa_alphabet, masks, rows, order, final_mask)
+    if len(order) < len(masks):
+        dfa = PartialDFA(dfa, [dfa[0][i] for i, row in enumerate(rows) if row is None], budget.reason)
+    if stats is not None:
+        stats.update(dfa_states=len(dfa[0]))
+    return dfa
 
 # ---------- DFA Minimization ----------
-def minimize_dfa(states, alphabet, transitions, start_state, final_states):
-    alphabet = [a for a in alphabet if a != "ε"]
-    states = list(states)
+def initial_partition(states, final_states):
     finals = set(final_states)
     non_finals = set(states) - finals
     partitions = []
@@ -86,14 +482,21 @@ def minimize_dfa(states, alphabet, transitions, start_state, final_states):
         partitions.append(finals)
     if non_finals:
         partitions.append(non_finals)
+    return partitions
+
+
+def moore_partition(states, alphabet, transitions, final_states, stats=None):
+    partitions = initial_partition(states, final_states)
     def get_partition(state, partitions):
         for idx, group in enumerate(partitions):
             if state in group:
                 return idx
         return None
     changed = True
+    rounds = 0
     while changed:
         changed = False
+        rounds += 1
         new_partitions = []
         for group in partitions:
             splitter = {}
@@ -106,23 +509,124 @@ def minimize_dfa(states, alphabet, transitions, start_state, final_states):
             else:
                 new_partitions.append(group)
         partitions = new_partitions
+    if stats is not None:
+        stats.update(refinement_rounds=rounds)
+    return partitions
+
+
+def hopcroft_partition(states, alphabet, transitions, final_states, stats=None):
+    """
+    Hopcroft partition refinement in O(n·|Σ|·log n).
+    Missing transitions (and targets outside the state set) go to a virtual
+    sink kept in its own block, matching how Moore treats them as a distinct
+    partition.
+    """
+    groups = initial_partition(states, final_states)
+    names = [s for group in groups for s in group]
+    index = {s: i for i, s in enumerate(names)}
+    sink = len(names)
+    rows = [[index.get(transitions.get((s, a), None), sink) for s in names] + [sink] for a in alphabet]
+    blocks = [{index[s] for s in group} for group in groups] + [{sink}]
+    blocks = refine_partition(rows, blocks, stats)
+    return [{names[i] for i in members} for members in blocks if sink not in members]
+
+
+def refine_partition(rows, blocks, stats=None):
+    """
+    Hopcroft refinement over integer states: rows[k][i] is the target of
+    state i on symbol k and `blocks` the initial partition (a list of sets
+    covering every state). Returns the coarsest stable refinement.
+    """
+    n = len(rows[0]) if rows else sum(len(b) for b in blocks)
+    inverse = []
+    for row in rows:
+        preds = [[] for _ in range(n)]
+        for i, j in enumerate(row):
+            preds[j].append(i)
+        inverse.append(preds)
+    blocks = [set(b) for b in blocks if b]
+    block_of = [0] * n
+    for b, members in enumerate(blocks):
+        for i in members:
+            block_of[i] = b
+    # Every initial block but the largest is enough to start from
+    largest = max(range(len(blocks)), key=lambda b: len(blocks[b]), default=0)
+    waiting = [(b, k) for b in range(len(blocks)) if b != largest for k in range(len(rows))]
+    in_waiting = set(waiting)
+    rounds = splits = 0
+    while waiting:
+        rounds += 1
+        splitter = waiting.pop()
+        in_waiting.discard(splitter)
+        b, k = splitter
+        preds = inverse[k]
+        touched = {}
+        for j in blocks[b]:
+            for i in preds[j]:
+                touched.setdefault(block_of[i], set()).add(i)
+        for y, hit in touched.items():
+            Y = blocks[y]
+            if len(hit) == len(Y):
+                continue
+            Y -= hit
+            # The new block takes the smaller half so relabelling stays cheap
+            if len(hit) > len(Y):
+                blocks[y], hit = hit, Y
+            nid = len(blocks)
+            splits += 1
+            blocks.append(hit)
+            for i in hit:
+                block_of[i] = nid
+            for c in range(len(rows)):
+                if (nid, c) not in in_waiting:
+                    in_waiting.add((nid, c))
+                    waiting.append((nid, c))
+    if stats is not None:
+        stats.update(refinement_rounds=rounds, splits=splits)
+    return blocks
+
+
+def minimize_dfa(states, alphabet, transitions, start_state, final_states, algorithm="hopcroft", trim=False, stats=None):
+    if getattr(states, "unexplored", None):
+        # Unexplored states have no rows; treating them as dead would give the wrong language
+        raise ValueError(f"cannot minimize a partial DFA ({len(states.unexplored)} states were not expanded)")
+    alphabet = [a for a in alphabet if a != "ε"]
+    if trim:
+        states, transitions, final_states = trim_dfa(states, alphabet, transitions, start_state, final_states, stats)
+    states = list(states)
+    finals = set(final_states)
+    if algorithm == "hopcroft":
+        partitions = hopcroft_partition(states, alphabet, transitions, finals, stats)
+    elif algorithm == "moore":
+        partitions = moore_partition(states, alphabet, transitions, finals, stats)
+    else:
+        raise ValueError(f"Unknown minimization algorithm: {algorithm}")
+    if stats is not None:
+        stats.update(blocks=len(partitions))
+    return label_partitions(partitions, alphabet, transitions, start_state, finals)
+
+
+def state_to_label(s):
+    if isinstance(s, frozenset):
+        return "".join(sorted(s))
+    return str(s)
+
+
+def label_partitions(partitions, alphabet, transitions, start_state, final_states, label=state_to_label):
+    """Build the minimized DFA tuple from a partition of the DFA states."""
     group_name_map = {}
     state_map = {}
-    def state_to_label(s):
-        if isinstance(s, frozenset):
-            return "".join(sorted(s))
-        return str(s)
     for group in partitions:
         if len(group) == 1:
-            group_label = state_to_label(next(iter(group)))
+            group_label = label(next(iter(group)))
         else:
-            group_label = "{" + ",".join(sorted(state_to_label(s) for s in group)) + "}"
+            group_label = "{" + ",".join(sorted(label(s) for s in group)) + "}"
         for s in group:
             state_map[s] = group_label
         group_name_map[group_label] = group
     min_states = set(group_name_map.keys())
     min_start = state_map[start_state]
-    min_finals = set(state_map[s] for s in finals if s in state_map)
+    min_finals = set(state_map[s] for s in final_states if s in state_map)
     min_trans = {}
     for s in min_states:
         group = group_name_map[s]
@@ -132,3 +636,658 @@ def minimize_dfa(states, alphabet, transitions, start_state, final_states):
             if dst is not None:
                 min_trans[(s, a)] = state_map.get(dst, dst)
     return min_states, alphabet, min_trans, min_start, min_finals
+
+
+# ---------- Incremental re-determinization ----------
+def transition_diff(old, new):
+    """(added, removed) NFA transition entries turning `old` into `new`."""
+    added = {}
+    removed = {}
+    for key in set(old) | set(new):
+        before = set(old.get(key, ()))
+        after = set(new.get(key, ()))
+        if after - before:
+            added[key] = after - before
+        if before - after:
+            removed[key] = before - after
+    return added, removed
+
+
+class IncrementalDFA:
+    """
+    remove_epsilon → nfa_to_dfa → minimize_dfa kept up to date under small
+    edits of the NFA (see apply). Only the ε-closures and ε-free rows that
+    can see a changed entry are recomputed, only DFA subsets containing a
+    changed row are re-stepped, and minimization reruns Hopcroft on a
+    quotient where every state that cannot reach a change is collapsed
+    into its previous block.
+
+    Results equal a full recomputation as automata; surviving DFA states
+    keep their position and newly discovered subsets are appended.
+    With a Budget, exploring past it raises BudgetExceeded; the object is
+    left half-updated and has to be discarded.
+    """
+    def __init__(self, states, alphabet, enfa, start_state, final_states, budget=None):
+        self.budget = budget
+        self.states = list(states)
+        self.alphabet = list(alphabet)
+        self.start_state = start_state
+        self.last_update = {}
+        self._build(enfa, final_states)
+
+    # ----- full build -----
+    def _build(self, enfa, final_states):
+        self.enfa = {key: set(dsts) for key, dsts in enfa.items() if dsts}
+        self.final_states = set(final_states)
+        listed = intern_states(self.states)
+        self._listed = len(listed)
+        self._index = index = intern_states(list(listed) + [self.start_state], self.enfa)
+        self._names = names = list(index)
+        n = len(names)
+        self._eps = [set() for _ in range(n)]
+        self._eps_rev = [set() for _ in range(n)]
+        self._succ = {a: [0] * n for a in self.alphabet}
+        self._pred = {a: [set() for _ in range(n)] for a in self.alphabet}
+        for (src, a), dsts in self.enfa.items():
+            i = index[src]
+            if a == "ε":
+                for d in dsts:
+                    self._eps[i].add(index[d])
+                    self._eps_rev[index[d]].add(i)
+            if a in self._succ:
+                self._succ[a][i] = states_to_mask(dsts, index)
+                for d in dsts:
+                    self._pred[a][index[d]].add(i)
+        comp, closure, dag = epsilon_closure_masks(index, self.enfa)
+        rows = epsilon_free_masks(index, self.alphabet, self.enfa, comp, closure, dag)
+        self._closure = [closure[comp[i]] for i in range(n)]
+        # Rows of states outside the state list never reach the DFA (as in remove_epsilon)
+        self._row = {a: [rows[a][comp[i]] if i < self._listed else 0 for i in range(n)] for a in self.alphabet}
+        self._final_mask = states_to_mask((f for f in self.final_states if f in index), index)
+        self._efinal = [i < self._listed and bool(self._closure[i] & self._final_mask) for i in range(n)]
+        self._efinal_cache = None
+
+        self.closures = {}
+        self.nfa_no_e = {}
+        self.nfa_finals = set()
+        self._closure_sets = [None] * n
+        for s in self.states:
+            i = index[s]
+            self.closures[s] = self._closure_set(i)
+            if self._efinal[i]:
+                self.nfa_finals.add(s)
+            for a in self.alphabet:
+                if self._row[a][i]:
+                    self.nfa_no_e[(s, a)] = self._mask_set(self._row[a][i])
+
+        self.dfa_alphabet = [a for a in self.alphabet if a != "ε"]
+        self._masks = []
+        self._ids = {}
+        self._rows = []
+        self._subsets = []
+        self._final = []
+        self._preds = {-1: {}}
+        self._dead_refs = 0
+        self.dfa_trans = {}
+        self.dfa_finals = set()
+        self._labels = {}
+        new = self._explore([self._add_subset(1 << index[self.start_state])])
+        self._dead_final = any(names[i] == "q_D" for i in iter_bits(self._final_mask))
+        self._has_dead = False
+        self._sync_dead()
+        self._block_of = {}
+        self._minimize(set(new) | {-1})
+        self.last_update = {"rebuild": True, "closures": n, "rows": n * len(self.alphabet),
+                            "subsets": len(self._masks), "removed_subsets": 0}
+
+    def _closure_set(self, i):
+        sets = self._closure_sets[i]
+        if sets is None or sets[0] != self._closure[i]:
+            sets = self._closure_sets[i] = (self._closure[i], self._mask_set(self._closure[i]))
+        return sets[1]
+
+    def _mask_set(self, mask):
+        return frozenset(self._names[i] for i in iter_bits(mask))
+
+    # ----- subset bookkeeping -----
+    def _add_subset(self, mask):
+        j = len(self._masks)
+        self._ids[mask] = j
+        self._masks.append(mask)
+        self._rows.append(None)
+        self._preds[j] = {}
+        subset = frozenset(self._names[i] for i in iter_bits(mask))
+        self._subsets.append(subset)
+        final = bool(mask & self._efinal_mask())
+        self._final.append(final)
+        if final:
+            self.dfa_finals.add(subset)
+        return j
+
+    def _efinal_mask(self):
+        mask = self._efinal_cache
+        if mask is None:
+            mask = 0
+            for i, f in enumerate(self._efinal):
+                if f:
+                    mask |= 1 << i
+            self._efinal_cache = mask
+        return mask
+
+    def _step(self, S, a):
+        row = self._row[a]
+        dest = 0
+        while S:
+            low = S & -S
+            dest |= row[low.bit_length() - 1]
+            S ^= low
+        return dest
+
+    def _target(self, dest, unmarked):
+        if not dest:
+            return -1
+        j = self._ids.get(dest)
+        if j is None:
+            j = self._add_subset(dest)
+            unmarked.append(j)
+        return j
+
+    def _set_cell(self, i, k, j):
+        """Point DFA state i on dfa_alphabet[k] at j (-1: dead state)."""
+        old = self._rows[i][k]
+        if old == j:
+            return False
+        if old is not None:
+            refs = self._preds[old]
+            refs[i] -= 1
+            if not refs[i]:
+                del refs[i]
+            if old == -1:
+                self._dead_refs -= 1
+        self._rows[i][k] = j
+        self._preds[j][i] = self._preds[j].get(i, 0) + 1
+        if j == -1:
+            self._dead_refs += 1
+        a = self.dfa_alphabet[k]
+        self.dfa_trans[(self._subsets[i], a)] = self._subsets[j] if j >= 0 else frozenset(["q_D"])
+        return True
+
+    def _explore(self, unmarked):
+        """Step every subset in `unmarked` (and whatever they discover); returns them."""
+        found = []
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+            per_state = subset_bytes(len(self._names), len(self.dfa_alphabet))
+        while unmarked:
+            if budget is not None and found and budget.exceeded(len(self._masks), len(self._masks) * per_state):
+                raise BudgetExceeded(budget.reason)
+            i = unmarked.pop()
+            found.append(i)
+            self._rows[i] = [None] * len(self.dfa_alphabet)
+            for k, a in enumerate(self.dfa_alphabet):
+                self._set_cell(i, k, self._target(self._step(self._masks[i], a), unmarked))
+        return found
+
+    def _sync_dead(self):
+        """Add or drop the dead state to match whether any cell still uses it."""
+        dead = frozenset(["q_D"])
+        needed = self._dead_refs > 0
+        if needed and not self._has_dead:
+            for a in self.dfa_alphabet:
+                self.dfa_trans[(dead, a)] = dead
+        elif self._has_dead and not needed:
+            for a in self.dfa_alphabet:
+                del self.dfa_trans[(dead, a)]
+        if needed and self._dead_final:
+            self.dfa_finals.add(dead)
+        else:
+            self.dfa_finals.discard(dead)
+        self._has_dead = needed
+
+    # ----- edits -----
+    def apply(self, added=None, removed=None, finals_added=(), finals_removed=()):
+        """
+        Apply an edit: `added` / `removed` map (state, symbol) to sets of
+        target states ("ε" for ε-edges; removals are applied first) and
+        finals_added / finals_removed change the accepting NFA states.
+        Edits that introduce unknown states fall back to a full rebuild.
+        """
+        added = added or {}
+        removed = removed or {}
+        index = self._index
+        mentioned = set(finals_added) | set(finals_removed)
+        for (src, _), dsts in list(added.items()) + list(removed.items()):
+            mentioned.add(src)
+            mentioned.update(dsts)
+        if any(s not in index for s in mentioned):
+            enfa = {key: set(dsts) for key, dsts in self.enfa.items()}
+            for key, dsts in removed.items():
+                enfa[key] = enfa.get(key, set()) - set(dsts)
+            for key, dsts in added.items():
+                enfa[key] = enfa.get(key, set()) | set(dsts)
+            self._build(enfa, (self.final_states - set(finals_removed)) | set(finals_added))
+            return self.last_update
+
+        # 1. NFA adjacency
+        eps_changed = set()
+        sym_changed = {a: set() for a in self.alphabet}
+        for key in set(added) | set(removed):
+            src, a = key
+            before = self.enfa.get(key, set())
+            after = (before - set(removed.get(key, ()))) | set(added.get(key, ()))
+            if after == before:
+                continue
+            if after:
+                self.enfa[key] = after
+            else:
+                self.enfa.pop(key, None)
+            i = index[src]
+            if a == "ε":
+                for d in before - after:
+                    self._eps[i].discard(index[d])
+                    self._eps_rev[index[d]].discard(i)
+                for d in after - before:
+                    self._eps[i].add(index[d])
+                    self._eps_rev[index[d]].add(i)
+                eps_changed.add(i)
+            if a in self._succ:
+                pred = self._pred[a]
+                for d in before - after:
+                    pred[index[d]].discard(i)
+                for d in after - before:
+                    pred[index[d]].add(i)
+                self._succ[a][i] = states_to_mask(after, index)
+                sym_changed[a].add(i)
+
+        # 2. ε-closures of states that can ε-reach a changed ε-edge
+        affected = self._eps_ancestors(eps_changed)
+        new_closures = {s: self._recompute_closure(s, affected) for s in affected}
+        changed_closures = {s for s, m in new_closures.items() if m != self._closure[s]}
+        for s in changed_closures:
+            self._closure[s] = new_closures[s]
+
+        # 3. ε-free rows whose closure or closed step can see a change
+        changed_rows = {}
+        for a in self.alphabet:
+            sources = set(sym_changed[a])
+            for q in changed_closures:
+                sources |= self._pred[a][q]
+            rows = self._row[a]
+            changed = set()
+            for s in self._eps_ancestors(sources) | changed_closures:
+                if s >= self._listed:
+                    continue
+                mask = 0
+                for p in iter_bits(self._closure[s]):
+                    for q in iter_bits(self._succ[a][p]):
+                        mask |= self._closure[q]
+                if mask != rows[s]:
+                    rows[s] = mask
+                    changed.add(s)
+            changed_rows[a] = changed
+
+        # 4. Accepting states
+        finals = (self.final_states - set(finals_removed)) | set(finals_added)
+        check = changed_closures
+        if finals != self.final_states:
+            self.final_states = finals
+            self._final_mask = states_to_mask((f for f in finals if f in index), index)
+            check = range(self._listed)
+        flipped_nfa = set()
+        for s in check:
+            if s < self._listed and self._efinal[s] != bool(self._closure[s] & self._final_mask):
+                self._efinal[s] = not self._efinal[s]
+                flipped_nfa.add(s)
+        if flipped_nfa:
+            self._efinal_cache = None
+
+        # ε-free outputs
+        for s in changed_closures:
+            if s < self._listed:
+                self.closures[self._names[s]] = self._closure_set(s)
+        for a, changed in changed_rows.items():
+            for s in changed:
+                if self._row[a][s]:
+                    self.nfa_no_e[(self._names[s], a)] = self._mask_set(self._row[a][s])
+                else:
+                    self.nfa_no_e.pop((self._names[s], a), None)
+        for s in flipped_nfa:
+            if self._efinal[s]:
+                self.nfa_finals.add(self._names[s])
+            else:
+                self.nfa_finals.discard(self._names[s])
+
+        # 5. DFA subsets containing a changed row / a flipped final
+        dirty = [(k, self._ids_mask(changed_rows[a])) for k, a in enumerate(self.dfa_alphabet)]
+        dirty = [(k, m) for k, m in dirty if m]
+        any_dirty = 0
+        for _, m in dirty:
+            any_dirty |= m
+        flip_mask = self._ids_mask(flipped_nfa)
+        touched = set()
+        unmarked = []
+        dead_was = (self._has_dead, self._has_dead and self._dead_final)
+        for i in range(len(self._masks)):
+            S = self._masks[i]
+            if S & flip_mask:
+                final = bool(S & self._efinal_mask())
+                if final != self._final[i]:
+                    self._final[i] = final
+                    (self.dfa_finals.add if final else self.dfa_finals.discard)(self._subsets[i])
+                    touched.add(i)
+            if not S & any_dirty:
+                continue
+            for k, m in dirty:
+                if S & m and self._set_cell(i, k, self._target(self._step(S, self.dfa_alphabet[k]), unmarked)):
+                    touched.add(i)
+        new = self._explore(unmarked)
+        removed_count = self._collect() if touched else 0
+        self._sync_dead()
+        touched = {self._remap.get(i, -2) for i in touched} if removed_count else touched
+        new = [self._remap.get(i, -2) for i in new] if removed_count else new
+        frontier = (touched | set(new)) - {-2}
+        if dead_was != (self._has_dead, self._has_dead and self._dead_final):
+            frontier.add(-1)
+
+        # 6. Re-minimize what can reach a change
+        quotient = self._minimize(frontier)
+        self.last_update = {"rebuild": False, "closures": len(changed_closures),
+                            "rows": sum(len(c) for c in changed_rows.values()),
+                            "subsets": len(frontier), "removed_subsets": removed_count,
+                            "quotient_states": quotient}
+        return self.last_update
+
+    def _ids_mask(self, ids):
+        mask = 0
+        for i in ids:
+            mask |= 1 << i
+        return mask
+
+    def _eps_ancestors(self, sources):
+        seen = set(sources)
+        stack = list(sources)
+        while stack:
+            for p in self._eps_rev[stack.pop()]:
+                if p not in seen:
+                    seen.add(p)
+                    stack.append(p)
+        return seen
+
+    def _recompute_closure(self, s, affected):
+        # Closures outside `affected` cannot see the change and are reused
+        mask = 1 << s
+        seen = {s}
+        stack = [s]
+        while stack:
+            for w in self._eps[stack.pop()]:
+                if w in seen:
+                    continue
+                seen.add(w)
+                if w in affected:
+                    mask |= 1 << w
+                    stack.append(w)
+                else:
+                    mask |= self._closure[w]
+        return mask
+
+    def _collect(self):
+        """Drop subsets no longer reachable from the start; returns how many."""
+        self._remap = {}
+        reach = [False] * len(self._masks)
+        reach[0] = True
+        stack = [0]
+        while stack:
+            for j in self._rows[stack.pop()]:
+                if j >= 0 and not reach[j]:
+                    reach[j] = True
+                    stack.append(j)
+        if all(reach):
+            return 0
+        keep = [i for i, r in enumerate(reach) if r]
+        remap = {old: new for new, old in enumerate(keep)}
+        remap[-1] = -1
+        for i, r in enumerate(reach):
+            if not r:
+                S = self._subsets[i]
+                for a in self.dfa_alphabet:
+                    del self.dfa_trans[(S, a)]
+                self.dfa_finals.discard(S)
+                del self._ids[self._masks[i]]
+                self._labels.pop(S, None)
+                self._dead_refs -= self._rows[i].count(-1)
+        self._masks = [self._masks[i] for i in keep]
+        self._subsets = [self._subsets[i] for i in keep]
+        self._final = [self._final[i] for i in keep]
+        self._rows = [[remap[j] for j in self._rows[i]] for i in keep]
+        self._ids = {m: i for i, m in enumerate(self._masks)}
+        self._preds = {j: {} for j in range(-1, len(keep))}
+        for i, row in enumerate(self._rows):
+            for j in row:
+                self._preds[j][i] = self._preds[j].get(i, 0) + 1
+        self._block_of = {remap[i]: b for i, b in self._block_of.items() if i in remap}
+        self._remap = remap
+        return len(reach) - len(keep)
+
+    def _minimize(self, frontier):
+        """
+        Hopcroft on the quotient that keeps states able to reach `frontier`
+        as they are and merges the rest by their previous block. Returns the
+        quotient size.
+        """
+        nodes = list(range(len(self._masks))) + ([-1] if self._has_dead else [])
+        near = set()
+        stack = [i for i in frontier if i in self._preds and (i >= 0 or self._has_dead)]
+        near.update(stack)
+        while stack:
+            for p in self._preds[stack.pop()]:
+                if p not in near:
+                    near.add(p)
+                    stack.append(p)
+        def qnode(i):
+            return ("s", i) if i in near or i not in self._block_of else ("b", self._block_of[i])
+        members = {}
+        for i in nodes:
+            members.setdefault(qnode(i), []).append(i)
+        qtrans = {}
+        qfinals = set()
+        for q, group in members.items():
+            rep = group[0]
+            row = self._rows[rep] if rep >= 0 else [-1] * len(self.dfa_alphabet)
+            for a, j in zip(self.dfa_alphabet, row):
+                qtrans[(q, a)] = qnode(j)
+            if (self._final[rep] if rep >= 0 else self._dead_final):
+                qfinals.add(q)
+        blocks = hopcroft_partition(list(members), self.dfa_alphabet, qtrans, qfinals)
+        dead = frozenset(["q_D"])
+        partitions = []
+        self._block_of = {}
+        for b, block in enumerate(blocks):
+            group = set()
+            for q in block:
+                for i in members[q]:
+                    self._block_of[i] = b
+                    group.add(self._subsets[i] if i >= 0 else dead)
+            partitions.append(group)
+        self.minimized = label_partitions(partitions, self.dfa_alphabet, self.dfa_trans,
+                                          self._subsets[0], self.dfa_finals, self._label)
+        return len(members)
+
+    def _label(self, S):
+        label = self._labels.get(S)
+        if label is None:
+            label = self._labels[S] = state_to_label(S)
+        return label
+
+    # ----- results -----
+    def epsilon_free(self):
+        """(closures, nfa_no_e, nfa_finals) as remove_epsilon returns them."""
+        return dict(self.closures), dict(self.nfa_no_e), set(self.nfa_finals)
+
+    def dfa(self):
+        """(dfa_states, dfa_trans, dfa_start, dfa_finals) as nfa_to_dfa returns them."""
+        states = list(self._subsets) + ([frozenset(["q_D"])] if self._has_dead else [])
+        return states, dict(self.dfa_trans), self._subsets[0], set(self.dfa_finals)
+
+    def minimize(self):
+        """The minimize_dfa tuple for the current DFA."""
+        min_states, alphabet, min_trans, min_start, min_finals = self.minimized
+        return set(min_states), list(alphabet), dict(min_trans), min_start, set(min_finals)
+
+
+# ---------- Automaton pipeline ----------
+def _successor_masks_of(aut, alphabet):
+    succ = {}
+    for a in alphabet:
+        k = aut.symbol_id(a)
+        row = [0] * aut.num_states
+        if k >= 0:
+            for i in range(aut.num_states):
+                for j in aut.successors(i, k):
+                    row[i] |= 1 << j
+        succ[a] = row
+    return succ
+
+
+def _state_names(aut):
+    return list(aut.names) if aut.names is not None else [aut.label(i) for i in range(aut.num_states)]
+
+
+def epsilon_free_automaton(nfa, stats=None):
+    """remove_epsilon for an Automaton: same states, ε-free rows, finals reached through ε."""
+    n = nfa.num_states
+    k_eps = nfa.symbol_id("ε")
+    eps = [list(nfa.successors(i, k_eps)) if k_eps >= 0 else [] for i in range(n)]
+    comp, closure, dag = condense_epsilon(eps)
+    alphabet = nfa.alphabet
+    rows = close_rows(_successor_masks_of(nfa, alphabet), alphabet, comp, closure, dag)
+    final_mask = 0
+    for i in nfa.finals():
+        final_mask |= 1 << i
+    offsets = array("i", [0])
+    targets = array("i")
+    for i in range(n):
+        c = comp[i]
+        for a in alphabet:
+            targets.extend(iter_bits(rows[a][c]))
+            offsets.append(len(targets))
+    accept = bytearray(1 if closure[comp[i]] & final_mask else 0 for i in range(n))
+    if stats is not None:
+        stats.update(closures=n, epsilon_components=len(closure), transitions=len(targets))
+    return Automaton(alphabet, n, nfa.start, accept, targets, offsets, names=_state_names(nfa))
+
+
+def trim_automaton(aut, stats=None):
+    """
+    trim_nfa / trim_dfa for an Automaton: NFAs lose the states that are
+    unreachable or cannot reach a final state, DFAs only the unreachable ones.
+    Kept states are renumbered in their original order.
+    """
+    n = aut.num_states
+    adjacency = [[] for _ in range(n)]
+    for i, _, j in aut.edges():
+        adjacency[i].append(j)
+    keep = useful_states(adjacency, aut.start, aut.finals(), backward=not aut.deterministic)
+    new_id = [-1] * n
+    kept = [i for i in range(n) if keep[i]]
+    for new, i in enumerate(kept):
+        new_id[i] = new
+    width = len(aut.symbols)
+    targets = array("i")
+    offsets = None if aut.deterministic else array("i", [0])
+    edges = 0
+    for i in kept:
+        for k in range(width):
+            succ = [new_id[j] for j in aut.successors(i, k) if keep[j]]
+            edges += len(succ)
+            if offsets is None:
+                targets.append(succ[0] if succ else -1)
+            else:
+                targets.extend(succ)
+                offsets.append(len(targets))
+    if stats is not None:
+        stats.update(trimmed_states=n - len(kept), trimmed_transitions=sum(map(len, adjacency)) - edges)
+    return Automaton(aut.symbols, len(kept), new_id[aut.start], bytearray(aut.accept[i] for i in kept), targets, offsets,
+                     names=[aut.names[i] for i in kept] if aut.names is not None else None,
+                     members=[aut.members[i] for i in kept] if aut.members is not None else None,
+                     member_names=aut.member_names)
+
+
+def determinize(nfa, trim=False, budget=None, stats=None):
+    """
+    nfa_to_dfa for an Automaton; ε-moves, if any, are removed first.
+    If a budget cuts the construction short, the result has `truncated`
+    set and its `unexplored` states have no transitions.
+    """
+    if nfa.symbol_id("ε") >= 0:
+        nfa = epsilon_free_automaton(nfa)
+    if trim:
+        nfa = trim_automaton(nfa, stats)
+    alphabet = nfa.alphabet
+    masks, rows, order = subset_construction(_successor_masks_of(nfa, alphabet), alphabet, 1 << nfa.start, stats, budget)
+    member_names = _state_names(nfa)
+    n = len(masks)
+    width = len(alphabet)
+    final_mask = 0
+    for i in nfa.finals():
+        final_mask |= 1 << i
+    accept = bytearray(1 if m & final_mask else 0 for m in masks)
+    members = list(masks)
+    # Empty moves go to an explicit dead state, as in nfa_to_dfa
+    has_dead = any(j < 0 for row in rows if row is not None for j in row)
+    dead = n if has_dead else -1
+    targets = array("i")
+    for row in rows:
+        targets.extend([-1] * width if row is None else [dead if j < 0 else j for j in row])
+    if has_dead:
+        n += 1
+        targets.extend([dead] * width)
+        members.append(1 << len(member_names))
+        member_names = member_names + [DEAD_STATE]
+        accept.append(1 if any(member_names[i] == DEAD_STATE for i in iter_bits(final_mask)) else 0)
+    if stats is not None:
+        stats.update(dfa_states=n)
+    dfa = Automaton(alphabet, n, 0, accept, targets, members=members, member_names=member_names)
+    if len(order) < len(masks):
+        dfa.unexplored = frozenset(i for i, row in enumerate(rows) if row is None)
+        dfa.truncated = budget.reason
+    return dfa
+
+
+def minimize(dfa, trim=False, stats=None):
+    """minimize_dfa (Hopcroft) for a deterministic Automaton; states are named by their labels."""
+    if dfa.truncated:
+        raise ValueError("cannot minimize a truncated DFA")
+    if trim:
+        dfa = trim_automaton(dfa, stats)
+    n = dfa.num_states
+    alphabet = dfa.alphabet
+    sink = n
+    rows = []
+    for a in alphabet:
+        k = dfa.symbol_id(a)
+        row = [dfa.target(i, k) for i in range(n)]
+        rows.append([sink if j < 0 else j for j in row] + [sink])
+    finals = {i for i in range(n) if dfa.accept[i]}
+    blocks = refine_partition(rows, [finals, set(range(n)) - finals, {sink}], stats)
+    # Block order follows the first DFA state in each, so the start block comes first
+    blocks = sorted((b for b in blocks if sink not in b), key=min)
+    block_of = [0] * n
+    names = []
+    for b, group in enumerate(blocks):
+        for i in group:
+            block_of[i] = b
+        if len(group) == 1:
+            names.append(dfa.label(next(iter(group)), ""))
+        else:
+            names.append("{" + ",".join(sorted(dfa.label(i, "") for i in group)) + "}")
+    targets = array("i")
+    for group in blocks:
+        rep = min(group)
+        for row in rows:
+            j = row[rep]
+            targets.append(-1 if j == sink else block_of[j])
+    accept = bytearray(1 if min(group) in finals else 0 for group in blocks)
+    if stats is not None:
+        stats.update(blocks=len(blocks))
+    return Automaton(alphabet, len(blocks), block_of[dfa.start], accept, targets, names=names)
@@ -0,0 +1,160 @@
+# equivalence.py
+"""
+Language inclusion and equivalence of two ε-NFAs without building either DFA.
+
+Both checks explore subsets on the fly from the ε-free rows (as LazyDFA
+does) and stop at the first difference:
+    is_included      antichain search over pairs (state of A, subset of B);
+                     a pair is dropped when one with a smaller B-subset
+                     and the same A-state was already seen
+    are_equivalent   Hopcroft–Karp: pairs of subsets merged in a union-find,
+                     so a pair already equal up to the relation is skipped
+Both search breadth first, so the counterexample returned is a shortest
+word accepted by exactly one side. With a core.Budget the search gives up
+once it has queued max_states pairs (or holds about max_bytes, or runs out
+of time); the result is then undecided: holds is None and `truncated`
+names the limit, as for a truncated DFA.
+"""
+from collections import namedtuple
+
+from core import intern_states, states_to_mask, iter_bits, epsilon_closure_masks, epsilon_free_masks, subset_bytes
+
+Comparison = namedtuple("Comparison", ["holds", "counterexample", "accepted_by", "explored", "truncated"],
+                        defaults=[None])
+
+
+def _epsilon_free(nfa, alphabet):
+    """(tables, start mask, final mask) with tables[k][i] = δ'(state i, alphabet[k])."""
+    states, _, enfa, start_state, final_states = nfa
+    index = intern_states(list(states) + [start_state], enfa)
+    comp, closure, dag = epsilon_closure_masks(index, enfa)
+    rows = epsilon_free_masks(index, alphabet, enfa, comp, closure, dag)
+    tables = [[rows[a][comp[i]] for i in range(len(index))] for a in alphabet]
+    final_mask = states_to_mask((f for f in final_states if f in index), index)
+    accepting = 0
+    for i, c in enumerate(comp):
+        if closure[c] & final_mask:
+            accepting |= 1 << i
+    return tables, 1 << index[start_state], accepting
+
+
+def _step(table, mask):
+    dest = 0
+    while mask:
+        low = mask & -mask
+        dest |= table[low.bit_length() - 1]
+        mask ^= low
+    return dest
+
+
+def _common_alphabet(nfa_a, nfa_b):
+    alphabet = []
+    for a in list(nfa_a[1]) + list(nfa_b[1]):
+        if a != "ε" and a not in alphabet:
+            alphabet.append(a)
+    return alphabet
+
+
+def _word(parent, key):
+    word = []
+    while parent[key] is not None:
+        key, a = parent[key]
+        word.append(a)
+    return word[::-1]
+
+
+def is_included(nfa_a, nfa_b, stats=None, budget=None):
+    """
+    L(A) ⊆ L(B). On failure the counterexample is a shortest word in
+    L(A) \\ L(B). Automata are (states, alphabet, transitions, start, finals).
+    """
+    alphabet = _common_alphabet(nfa_a, nfa_b)
+    tables_a, start_a, final_a = _epsilon_free(nfa_a, alphabet)
+    tables_b, start_b, final_b = _epsilon_free(nfa_b, alphabet)
+    start = (start_a.bit_length() - 1, start_b)
+    parent = {start: None}
+    # Per A-state, the ⊆-minimal B-subsets seen so far
+    antichain = {start[0]: [start_b]}
+    queue = [start]
+    result = None
+    if budget is not None:
+        budget.start()
+        # A queued pair holds two subsets, a parent entry and a queue slot
+        per_pair = subset_bytes(len(nfa_a[0]) + len(nfa_b[0]), 1)
+    for p, Q in queue:
+        if budget is not None and budget.exceeded(len(queue), len(queue) * per_pair):
+            result = Comparison(None, None, None, len(queue), budget.reason)
+            break
+        if final_a >> p & 1 and not Q & final_b:
+            result = Comparison(False, _word(parent, (p, Q)), "first", len(queue))
+            break
+        for k, a in enumerate(alphabet):
+            Q2 = _step(tables_b[k], Q)
+            for p2 in iter_bits(tables_a[k][p]):
+                chain = antichain.setdefault(p2, [])
+                if any(R & ~Q2 == 0 for R in chain):
+                    continue
+                chain[:] = [R for R in chain if Q2 & ~R]
+                chain.append(Q2)
+                parent[(p2, Q2)] = ((p, Q), a)
+                queue.append((p2, Q2))
+    if result is None:
+        result = Comparison(True, None, None, len(queue))
+    if stats is not None:
+        stats.update(pairs=result.explored, antichain=sum(len(c) for c in antichain.values()))
+        if result.truncated:
+            stats.update(truncated=result.truncated)
+    return result
+
+
+def are_equivalent(nfa_a, nfa_b, stats=None, budget=None):
+    """
+    L(A) = L(B). On failure the counterexample is a shortest word accepted
+    by one automaton only; accepted_by says which ("first" or "second").
+    """
+    alphabet = _common_alphabet(nfa_a, nfa_b)
+    tables_a, start_a, final_a = _epsilon_free(nfa_a, alphabet)
+    tables_b, start_b, final_b = _epsilon_free(nfa_b, alphabet)
+    uf = {}
+
+    def find(x):
+        root = x
+        while uf.get(root, root) != root:
+            root = uf[root]
+        while x != root:
+            uf[x], x = root, uf.get(x, x)
+        return root
+
+    start = (start_a, start_b)
+    parent = {start: None}
+    uf[(0, start_a)] = (1, start_b)
+    queue = [start]
+    result = None
+    if budget is not None:
+        budget.start()
+        # A queued pair holds two subsets, a parent entry and a queue slot
+        per_pair = subset_bytes(len(nfa_a[0]) + len(nfa_b[0]), 1)
+    for S, T in queue:
+        if budget is not None and budget.exceeded(len(queue), len(queue) * per_pair):
+            result = Comparison(None, None, None, len(queue), budget.reason)
+            break
+        in_a = bool(S & final_a)
+        if in_a != bool(T & final_b):
+            result = Comparison(False, _word(parent, (S, T)), "first" if in_a else "second", len(queue))
+            break
+        for k, a in enumerate(alphabet):
+            S2 = _step(tables_a[k], S)
+            T2 = _step(tables_b[k], T)
+            x, y = find((0, S2)), find((1, T2))
+            if x == y:
+                continue
+            uf[x] = y
+            parent.setdefault((S2, T2), ((S, T), a))
+            queue.append((S2, T2))
+    if result is None:
+        result = Comparison(True, None, None, len(queue))
+    if stats is not None:
+        stats.update(pairs=result.explored, classes=len({find(x) for x in list(uf)}))
+        if result.truncated:
+            stats.update(truncated=result.truncated)
+    return result
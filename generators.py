@@ -0,0 +1,94 @@
+# generators.py
+"""
+Seeded synthetic NFAs for benchmarks: random NFAs, Thompson ε-NFAs built
+from regexes, and worst-case families. Every generator returns the usual
+(states, alphabet, transitions, start_state, final_states) tuple.
+"""
+import math
+import random
+
+from regexp import thompson_nfa
+
+
+# ---------- Random NFAs ----------
+def random_nfa(n, alphabet=("a", "b"), density=0.1, epsilon_density=0.02, final_ratio=0.3, seed=0):
+    """
+    n states; each (state, symbol) pair gets every state as a target with
+    probability `density` (ε-edges with `epsilon_density`).
+    """
+    rng = random.Random(seed)
+    states = [f"q{i}" for i in range(n)]
+    transitions = {}
+    for s in states:
+        for a in list(alphabet) + ["ε"]:
+            targets = {states[i] for i in _bernoulli_positions(rng, n, epsilon_density if a == "ε" else density)}
+            if targets:
+                transitions[(s, a)] = targets
+    finals = [s for s in states if rng.random() < final_ratio]
+    return states, list(alphabet), transitions, states[0] if states else None, finals
+
+
+def _bernoulli_positions(rng, n, p):
+    """Indices below n kept with probability p, by geometric skips (O(kept), not O(n))."""
+    if p <= 0:
+        return
+    if p >= 1:
+        yield from range(n)
+        return
+    log_q = math.log(1.0 - p)
+    i = -1
+    while True:
+        i += int(math.log(1.0 - rng.random()) / log_q) + 1
+        if i >= n:
+            return
+        yield i
+
+
+# ---------- Regexes ----------
+def random_regex(size, alphabet=("a", "b"), seed=0):
+    """Random regex with about `size` literals."""
+    rng = random.Random(seed)
+
+    def build(n):
+        if n <= 1:
+            expr = rng.choice(alphabet)
+        else:
+            left = rng.randint(1, n - 1)
+            op = "|" if rng.random() < 0.3 else ""
+            expr = f"({build(left)}{op}{build(n - left)})"
+        r = rng.random()
+        if r < 0.15:
+            expr += "*"
+        elif r < 0.2:
+            expr += "?"
+        return expr
+
+    return build(size)
+
+
+# ---------- Worst-case families ----------
+def nth_from_end_nfa(n):
+    """NFA for "the n-th symbol from the end is a"; its DFA has 2^n states."""
+    states = [f"q{i}" for i in range(n + 1)]
+    trans = {("q0", "a"): {"q0", "q1"}, ("q0", "b"): {"q0"}}
+    for i in range(1, n):
+        trans[(f"q{i}", "a")] = {f"q{i + 1}"}
+        trans[(f"q{i}", "b")] = {f"q{i + 1}"}
+    return states, ["a", "b"], trans, "q0", [f"q{n}"]
+
+
+def epsilon_chain_nfa(n):
+    """ε-chain q0 → … → qn with an a-loop on every state: n+1 closures of length up to n+1."""
+    states = [f"q{i}" for i in range(n + 1)]
+    trans = {(f"q{i}", "ε"): {f"q{i + 1}"} for i in range(n)}
+    for s in states:
+        trans[(s, "a")] = {s}
+    return states, ["a"], trans, "q0", [f"q{n}"]
+
+
+FAMILIES = {
+    "random": lambda n, seed=0: random_nfa(n, density=min(0.5, 2.0 / max(n, 1)), epsilon_density=min(0.2, 0.5 / max(n, 1)), seed=seed),
+    "regex": lambda n, seed=0: thompson_nfa(random_regex(n, seed=seed)),
+    "nth_from_end": lambda n, seed=0: nth_from_end_nfa(n),
+    "epsilon_chain": lambda n, seed=0: epsilon_chain_nfa(n),
+}
@@ -2,62 +2,241 @@
 """
 Graphviz drawing functions for NFA/DFA diagrams.
 """
-import graphviz
+import time
 
-def draw_state_node(dot, state, is_start=False, is_final=False, is_dead=False, color="black"):
+# graphviz is imported where a graph is built, so importing this module stays cheap
+
+def draw_state_node(dot, state, is_start=False, is_final=False, is_dead=False, color="black", is_unexplored=False):
     shape = "doublecircle" if is_final else "circle"
-    if is_start:
-        dot.node(state, shape=shape, color=color, style="bold")
+    if is_unexplored:
+        # Left unexpanded by a budgeted determinization
+        dot.node(state, state, shape=shape, color="gray", fontcolor="gray", style="dashed")
+    elif is_start:
+        dot.node(state, state, shape=shape, color="blue", fillcolor="blue", style="filled", fontcolor="white", fontname="Arial Bold")
     elif is_final:
-        dot.node(state, shape=shape, color=color, peripheries="2")
+        dot.node(state, state, shape=shape, color="green", fillcolor="green", style="filled", fontcolor="black", fontname="Arial Bold")
     elif is_dead:
-        dot.node(state, shape=shape, color="gray", style="dashed")
+        dot.node(state, state, shape=shape, color="red", fillcolor="red", style="filled", fontcolor="white", fontname="Arial Bold")
     else:
-        dot.node(state, shape=shape, color=color)
+        dot.node(state, state, shape=shape, color=color, fontcolor=color)
+
+# Above this many states the layout switches from dot to sfdp
+LARGE_GRAPH_STATES = 200
 
-def draw_nfa_graph(states, alphabet, nfa_no_e, start_state, final_states, color="black"):
+def _new_digraph(num_states, layout_threshold):
+    import graphviz
     dot = graphviz.Digraph()
-    dot.attr(rankdir="LR")
+    if layout_threshold is not None and num_states > layout_threshold:
+        # Force-directed layout scales far better than dot's layered ranking
+        dot.engine = "sfdp"
+        dot.attr(layout="sfdp", overlap="prism", splines="false", outputorder="edgesfirst")
+    else:
+        dot.attr(rankdir="LR")
     dot.node("", shape="none")
-    for s in states:
-        draw_state_node(dot, s, is_start=(s==start_state), is_final=(s in final_states))
-    dot.edge("", start_state, color=color)
+    return dot
+
+def select_states(labels, adjacency, start, max_states=None, focus=None, radius=1, key=None):
+    """
+    Labels to draw: the neighbourhood (both directions, `radius` hops) of
+    `focus`, or the first `max_states` found by BFS from the start.
+    Returns the kept labels in BFS order and the number left out.
+    Neighbours are visited in sorted order (by `key` if given).
+    """
+    if focus is None and (max_states is None or len(labels) <= max_states):
+        return list(labels), 0
+    if focus is not None:
+        reverse = {}
+        for src, dsts in adjacency.items():
+            for d in dsts:
+                reverse.setdefault(d, set()).add(src)
+        kept = [focus]
+        seen = {focus}
+        frontier = [focus]
+        for _ in range(radius):
+            nxt = []
+            for lbl in frontier:
+                for other in sorted(adjacency.get(lbl, ()), key=key) + sorted(reverse.get(lbl, ()), key=key):
+                    if other not in seen:
+                        seen.add(other)
+                        kept.append(other)
+                        nxt.append(other)
+            frontier = nxt
+    else:
+        kept = [start]
+        seen = {start}
+        i = 0
+        while i < len(kept) and len(kept) < max_states:
+            for other in sorted(adjacency.get(kept[i], ()), key=key):
+                if other not in seen and len(kept) < max_states:
+                    seen.add(other)
+                    kept.append(other)
+            i += 1
+    label_set = set(labels)
+    kept = [lbl for lbl in kept if lbl in label_set]
+    return kept, len(label_set) - len(kept)
+
+def _emit_edges(dot, edges, kept, merge_edges, color):
+    """edges: list of (src label, dst label, symbol) in drawing order."""
+    kept = set(kept)
+    if merge_edges:
+        merged = {}
+        for src, dst, a in edges:
+            if src in kept and dst in kept:
+                merged.setdefault((src, dst), []).append(a)
+        for (src, dst), symbols in merged.items():
+            dot.edge(src, dst, label=",".join(symbols), color=color)
+    else:
+        for src, dst, a in edges:
+            if src in kept and dst in kept:
+                dot.edge(src, dst, label=a, color=color)
+
+def _emit_summary(dot, hidden, color):
+    if hidden:
+        dot.node("…", f"… {hidden} more states", shape="note", color="gray", fontcolor=color)
+
+def draw_nfa_graph(states, alphabet, nfa_no_e, start_state, final_states, color="black",
+                   merge_edges=False, layout_threshold=None, max_states=None, focus=None, radius=1):
+    adjacency = {}
+    for (src, a), dsts in nfa_no_e.items():
+        adjacency.setdefault(src, set()).update(dsts)
+    kept, hidden = select_states(list(states), adjacency, start_state, max_states, focus, radius)
+    kept_set = set(kept)
+    dot = _new_digraph(len(kept), layout_threshold)
+    for s in kept:
+        draw_state_node(dot, s, is_start=(s==start_state), is_final=(s in final_states), color=color)
+    if start_state in kept_set:
+        dot.edge("", start_state, color=color)
+    _emit_summary(dot, hidden, color)
+    
+    # Group self-loops for final states
     self_loops = {}
+    edges = []
     for (src, a), dsts in nfa_no_e.items():
-        if src in final_states and src in dsts:
-            self_loops.setdefault(src, []).append(a)
+        if src in final_states and dsts == {src}:
+            if src not in self_loops:
+                self_loops[src] = []
+            self_loops[src].append(a)
         else:
-            for dst in dsts:
-                dot.edge(src, dst, label=a, color=color)
+            for d in sorted(dsts):
+                edges.append((src, d, a))
+    _emit_edges(dot, edges, kept, merge_edges, color)
+    
+    # Draw combined self-loops for final states
     for state, inputs in self_loops.items():
-        dot.edge(state, state, label=",".join(inputs), color=color)
+        if state in kept_set:
+            dot.edge(state, state, label=",".join(inputs), color=color)
+    
     return dot
 
-def draw_dfa_graph(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, color="black"):
-    dot = graphviz.Digraph()
-    dot.attr(rankdir="LR")
-    dot.node("", shape="none")
+def draw_dfa_graph(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, color="black",
+                   merge_edges=False, layout_threshold=None, max_states=None, focus=None, radius=1):
+    labels = {}
     def label_of(S):
-        if isinstance(S, frozenset):
-            return "".join(sorted(S))
-        return str(S)
+        # Labels are computed once per state; sets (set of frozenset) are not hashable
+        try:
+            return labels[S]
+        except (KeyError, TypeError):
+            pass
+        lbl = S
+        # Accept frozenset or set of frozenset (minimized DFA)
+        if isinstance(S, (set, frozenset)):
+            # If S is a set with one frozenset inside, extract it
+            if len(S) == 1 and isinstance(next(iter(S)), frozenset):
+                S = next(iter(S))
+            lbl_text = ", ".join(sorted(str(x) for x in S))
+        else:
+            lbl_text = str(S)
+        if isinstance(lbl, (frozenset, str)):
+            labels[lbl] = lbl_text
+        return lbl_text
+    
     dead_state = None
+    state_labels = []
     for S in dfa_states:
-        lbl = label_of(S)
-        is_start = (S == dfa_start)
-        is_final = (S in dfa_finals)
-        is_dead = (lbl == "q_D")
-        if is_dead:
+        if ("q_D" in S and len(S) == 1):
             dead_state = S
-        draw_state_node(dot, lbl, is_start=is_start, is_final=is_final, is_dead=is_dead, color=color)
-    dot.edge("", label_of(dfa_start), color=color)
-    if dead_state:
-        lbl = label_of(dead_state)
-        dot.edge(lbl, lbl, label=",".join(alphabet), color="gray")
+        state_labels.append(label_of(S))
+    dead_label = label_of(dead_state) if dead_state else None
+    
+    # Draw other transitions
+    edges = []
+    adjacency = {}
     for (src, a), dst in dfa_trans.items():
-        src_lbl = label_of(src)
-        dst_lbl = label_of(dst)
-        if src_lbl == "q_D" and dst_lbl == "q_D":
-            continue
-        dot.edge(src_lbl, dst_lbl, label=a, color=color)
+        if src == dead_state and dst == dead_state:
+            continue  # Skip dead state self-loops, handled separately
+        # If dst is a set with one frozenset, extract it
+        if isinstance(dst, set) and len(dst) == 1 and isinstance(next(iter(dst)), frozenset):
+            dst = next(iter(dst))
+        src_lbl, dst_lbl = label_of(src), label_of(dst)
+        edges.append((src_lbl, dst_lbl, a))
+        adjacency.setdefault(src_lbl, set()).add(dst_lbl)
+    
+    start_lbl = label_of(dfa_start)
+    kept, hidden = select_states(state_labels, adjacency, start_lbl, max_states, focus, radius)
+    kept_set = set(kept)
+    dot = _new_digraph(len(kept), layout_threshold)
+    for S, lbl in zip(dfa_states, state_labels):
+        if lbl in kept_set:
+            draw_state_node(dot, lbl, is_start=(S==dfa_start), is_final=(S in dfa_finals), is_dead=(S is dead_state), color=color)
+    
+    if start_lbl in kept_set:
+        dot.edge("", start_lbl, color=color)
+    _emit_summary(dot, hidden, color)
+    
+    # Handle dead state self-loop separately
+    if dead_state and dead_label in kept_set:
+        dead_inputs = [a for a in alphabet if a != "ε" and dfa_trans.get((dead_state, a)) == dead_state]
+        if dead_inputs:
+            dot.edge(dead_label, dead_label, label=",".join(dead_inputs), color=color)
+    
+    _emit_edges(dot, edges, kept, merge_edges, color)
+    return dot
+
+def render_svg(dot, engine=None):
+    """
+    Lay out and render to SVG; returns (svg bytes, seconds spent).
+    `dot` is a graph or its DOT source (laid out with `engine`).
+    """
+    if isinstance(dot, str):
+        import graphviz
+        dot = graphviz.Source(dot, engine=engine)
+    t0 = time.perf_counter()
+    svg = dot.pipe(format="svg")
+    return svg, time.perf_counter() - t0
+
+def draw_automaton(aut, color="black", merge_edges=False, layout_threshold=None, max_states=None, focus=None, radius=1):
+    """draw_nfa_graph / draw_dfa_graph for an Automaton; only drawn states get labels."""
+    adjacency = {}
+    for i, _, j in aut.edges():
+        adjacency.setdefault(i, set()).add(j)
+    focus_id = None
+    if focus is not None:
+        focus_id = next((i for i in range(len(aut)) if aut.label(i) == focus), -1)
+    kept, hidden = select_states(range(len(aut)), adjacency, aut.start, max_states, focus_id, radius, key=aut.label)
+    kept_set = set(kept)
+    dot = _new_digraph(len(kept), layout_threshold)
+    for i in kept:
+        draw_state_node(dot, aut.label(i), is_start=(i == aut.start), is_final=aut.is_final(i),
+                        is_dead=aut.deterministic and aut.is_dead(i), color=color, is_unexplored=aut.is_unexplored(i))
+    if aut.start in kept_set:
+        dot.edge("", aut.label(aut.start), color=color)
+    _emit_summary(dot, hidden, color)
+
+    edges = []
+    loops = {}
+    for i in kept:
+        for k, a in enumerate(aut.symbols):
+            dsts = aut.successors(i, k)
+            if not dsts:
+                continue
+            # Final-state self-loops (NFA) and dead-state loops (DFA) are drawn combined
+            if dsts == (i,) and (aut.is_dead(i) if aut.deterministic else aut.is_final(i)):
+                loops.setdefault(i, []).append(a)
+                continue
+            for j in sorted(dsts, key=aut.label):
+                if j in kept_set:
+                    edges.append((aut.label(i), aut.label(j), a))
+    _emit_edges(dot, edges, [aut.label(i) for i in kept], merge_edges, color)
+    for i, inputs in loops.items():
+        dot.edge(aut.label(i), aut.label(i), label=",".join(inputs), color=color)
     return dot
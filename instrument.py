@@ -0,0 +1,118 @@
+# instrument.py
+"""
+Optional per-stage instrumentation for the conversion pipeline.
+
+A PipelineStats collects one record per stage: wall time plus whatever the
+stage reports through its `stats=` argument (subsets discovered, worklist
+high-water mark, refinement rounds, ...) and the size of the bytes/text it
+produced. Records can be read as dicts or written out as JSON lines.
+"""
+import inspect
+import json
+import sys
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+
+# Weak keys: the dashboard passes fresh closures (holding automata) every rerun
+_accepts_stats = weakref.WeakKeyDictionary()
+
+
+def accepts_stats(fn):
+    """True if fn takes a `stats=` keyword (core functions do)."""
+    try:
+        return _accepts_stats[fn]
+    except (KeyError, TypeError):
+        pass
+    try:
+        result = "stats" in inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        result = False
+    try:
+        _accepts_stats[fn] = result
+    except TypeError:
+        pass
+    return result
+
+
+def output_bytes(result):
+    """Size of an exporter's output: bytes, text (UTF-8) or render_svg's (svg, seconds)."""
+    if isinstance(result, tuple) and result and isinstance(result[0], (bytes, bytearray, str)):
+        result = result[0]
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return None
+
+
+class PipelineStats:
+    def __init__(self, run_id=None, **context):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.context = context
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Time a block; the yielded dict is the stage record and may be filled in."""
+        record = {"stage": name, "ts": round(time.time(), 3), **fields}
+        self.records.append(record)
+        t0 = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record["error"] = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - t0
+
+    def call(self, name, fn, *args, **kwargs):
+        """Run fn under stage(name), passing the record as `stats=` when fn accepts it."""
+        with self.stage(name) as record:
+            if accepts_stats(fn):
+                kwargs["stats"] = record
+            result = fn(*args, **kwargs)
+            size = output_bytes(result)
+            if size is not None:
+                record["bytes"] = size
+        return result
+
+    def record(self, name, **fields):
+        """Add a record for a stage that was not timed here (e.g. served from cache)."""
+        record = {"stage": name, "ts": round(time.time(), 3), **fields}
+        self.records.append(record)
+        return record
+
+    def get(self, name):
+        for record in reversed(self.records):
+            if record["stage"] == name:
+                return record
+        return None
+
+    @property
+    def total_seconds(self):
+        return sum(r.get("seconds", 0.0) for r in self.records)
+
+    def to_dict(self):
+        return {"run_id": self.run_id, **self.context, "total_seconds": self.total_seconds,
+                "stages": [dict(r) for r in self.records]}
+
+    def to_json_lines(self):
+        """One JSON object per stage, tagged with the run id and context."""
+        lines = []
+        for r in self.records:
+            lines.append(json.dumps({"run_id": self.run_id, **self.context, **r}, ensure_ascii=False, default=str))
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def emit(self, target=None):
+        """Append the JSON lines to a path or stream (default stderr)."""
+        text = self.to_json_lines()
+        if target is None:
+            target = sys.stderr
+        if hasattr(target, "write"):
+            target.write(text)
+            target.flush()
+        else:
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(text)
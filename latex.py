@@ -1,48 +1,143 @@
 # nfa_dfa_latex.py
 """
 LaTeX table generation functions for NFA/DFA tables.
+
+The iter_* functions yield the table a line at a time, so large tables can
+be written straight to a file (write_latex) instead of being built as one
+string; the *_latex functions join them. With longtable=True the table is
+a longtable, which LaTeX breaks across pages, instead of a [H] float.
 """
 
-def df_to_latex_matrix_phi(states, alphabet, transitions, start_state, final_states, caption="Table"):
-    latex = "\\begin{table}[H]\n"
-    latex += "    \\centering\n"
-    latex += "    \\begin{tabular}{|" + "c|"*(len(alphabet)+1) + "}\n"
-    latex += "    \\hline\n"
-    latex += "State & " + " & ".join(f"$\\epsilon$" if a=="ε" else a for a in alphabet) + " \\ \\hline\n"
-    for s in states:
-        row = s
-        if s == start_state:
-            row = f"$\\rightarrow$ {row}"
-        if s in final_states:
-            row = f"*{row}"
-        row += " & "
-        row += " & ".join(",".join(sorted(transitions.get((s, a), set()))) if (s, a) in transitions else "" for a in alphabet)
-        row += " \\ \\hline\n"
-        latex += row
-    latex += "    \\end{tabular}\n"
-    latex += f"    \\caption{{{caption}}}\n"
-    latex += "\\end{table}"
-    return latex
-
-def dfa_to_latex(states, alphabet, transitions, start_state, final_states, caption="DFA Table"):
-    latex = "\\begin{table}[H]\n"
-    latex += "    \\centering\n"
-    latex += "    \\begin{tabular}{|" + "c|"*(len(alphabet)+1) + "}\n"
-    latex += "    \\hline\n"
+def iter_latex_table(num_columns, header, rows, caption="Table", longtable=False):
+    """header: the symbol headings; rows: (label, entries) pairs."""
+    head = "State & " + " & ".join(header) + " \\\\ \\hline\n"
+    spec = "|" + "c|"*num_columns
+    if longtable:
+        yield f"\\begin{{longtable}}{{{spec}}}\n"
+        yield f"    \\caption{{{caption}}} \\\\\n"
+        yield "    \\hline\n"
+        yield head
+        yield "\\endfirsthead\n"
+        yield "    \\hline\n"
+        yield head
+        yield "\\endhead\n"
+    else:
+        yield "\\begin{table}[H]\n"
+        yield "    \\centering\n"
+        yield f"    \\begin{{tabular}}{{{spec}}}\n"
+        yield "    \\hline\n"
+        yield head
+    for label, entries in rows:
+        yield label + " & " + " & ".join(entries) + " \\\\ \\hline\n"
+    if longtable:
+        yield "\\end{longtable}"
+    else:
+        yield "    \\end{tabular}\n"
+        yield f"    \\caption{{{caption}}}\n"
+        yield "\\end{table}"
+
+def write_latex(chunks, target):
+    """Write yielded LaTeX to a path or text stream."""
+    if hasattr(target, "write"):
+        for chunk in chunks:
+            target.write(chunk)
+    else:
+        with open(target, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+def iter_nfa_latex(states, alphabet, transitions, start_state, final_states, caption="Table", longtable=False):
+    def rows():
+        for s in states:
+            row_label = s
+            if s == start_state:
+                row_label = "→" + row_label
+            if s in final_states:
+                row_label += "*"
+            row_entries = []
+            for a in alphabet:
+                nxt = transitions.get((s,a), set())
+                if nxt:
+                    row_entries.append(",".join(sorted(nxt)) if len(nxt)>1 else next(iter(nxt)))
+                else:
+                    row_entries.append(r"$\phi$")
+            yield row_label, row_entries
+    header = [f"$\\epsilon$" if a=="ε" else a for a in alphabet]
+    return iter_latex_table(len(alphabet)+1, header, rows(), caption, longtable)
+
+def df_to_latex_matrix_phi(states, alphabet, transitions, start_state, final_states, caption="Table", longtable=False):
+    return "".join(iter_nfa_latex(states, alphabet, transitions, start_state, final_states, caption, longtable))
+
+def iter_dfa_latex(states, alphabet, transitions, start_state, final_states, caption="DFA Table", longtable=False):
+    labels = {}
+    def label(S):
+        # Subsets are sorted once and reused for every row that reaches them
+        lbl = labels.get(S)
+        if lbl is None:
+            lbl = labels[S] = ", ".join(sorted(str(x) for x in S))
+        return lbl
+    def rows():
+        for S in states:
+            S_lbl = label(S) if isinstance(S, (set, frozenset)) else str(S)
+            if S == start_state:
+                S_lbl = "→" + S_lbl
+            if S in final_states:
+                S_lbl += "*"
+            row_entries = []
+            for a in alphabet:
+                if a == "ε":
+                    continue
+                nxt = transitions.get((S,a))
+                if nxt:
+                    # If nxt is a set with one frozenset, extract it
+                    if isinstance(nxt, set) and len(nxt) == 1 and isinstance(next(iter(nxt)), frozenset):
+                        nxt = next(iter(nxt))
+                    # Minimized DFA targets are plain label strings
+                    if isinstance(nxt, str):
+                        dst = nxt
+                    elif isinstance(nxt, frozenset):
+                        dst = label(nxt)
+                    else:
+                        dst = ", ".join(sorted(str(x) for x in nxt))
+                    row_entries.append(dst)
+                else:
+                    row_entries.append(r"$\phi$")
+            yield S_lbl, row_entries
     header_symbols = [a for a in alphabet if a != "ε"]
-    latex += "State & " + " & ".join(header_symbols) + " \\ \\hline\n"
-    for S in states:
-        S_lbl = "".join(sorted(S)) if isinstance(S, frozenset) else str(S)
-        row = S_lbl
-        if S == start_state:
-            row = f"$\\rightarrow$ {row}"
-        if S in final_states:
-            row = f"*{row}"
-        row += " & "
-        row += " & ".join("".join(sorted(transitions.get((S, a), set()))) if (S, a) in transitions and isinstance(transitions.get((S, a)), set) else str(transitions.get((S, a), "")) for a in header_symbols)
-        row += " \\ \\hline\n"
-        latex += row
-    latex += "    \\end{tabular}\n"
-    latex += f"    \\caption{{{caption}}}\n"
-    latex += "\\end{table}"
-    return latex
+    return iter_latex_table(len(alphabet)+1, header_symbols, rows(), caption, longtable)
+
+def dfa_to_latex(states, alphabet, transitions, start_state, final_states, caption="DFA Table", longtable=False):
+    return "".join(iter_dfa_latex(states, alphabet, transitions, start_state, final_states, caption, longtable))
+
+def iter_automaton_latex(aut, caption="Table", longtable=False):
+    """iter_nfa_latex (NFA, with an ε column) or iter_dfa_latex for an Automaton."""
+    if aut.deterministic:
+        columns = aut.alphabet
+        header = columns
+    else:
+        columns = aut.alphabet + ["ε"]
+        header = [f"$\\epsilon$" if a == "ε" else a for a in columns]
+    symbol_ids = [aut.symbol_id(a) for a in columns]
+    def rows():
+        for i in range(len(aut)):
+            row_label = aut.label(i)
+            if i == aut.start:
+                row_label = "→" + row_label
+            if aut.is_final(i):
+                row_label += "*"
+            row_entries = []
+            for k in symbol_ids:
+                dsts = aut.successors(i, k) if k >= 0 else ()
+                if aut.is_unexplored(i):
+                    row_entries.append("?")
+                elif len(dsts) == 1:
+                    row_entries.append(aut.label(dsts[0]))
+                elif dsts:
+                    row_entries.append(",".join(sorted(aut.label(j) for j in dsts)))
+                else:
+                    row_entries.append(r"$\phi$")
+            yield row_label, row_entries
+    return iter_latex_table(len(columns)+1, header, rows(), caption, longtable)
+
+def automaton_to_latex(aut, caption="Table", longtable=False):
+    return "".join(iter_automaton_latex(aut, caption, longtable))
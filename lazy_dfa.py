@@ -0,0 +1,156 @@
+# lazy_dfa.py
+"""
+On-the-fly DFA simulation of an ε-NFA.
+Subset states are determinized only when the input reaches them and their
+transition rows are kept in a bounded LRU cache, so large inputs can be run
+without building the full DFA table.
+"""
+from collections import OrderedDict, namedtuple
+
+from core import intern_states, states_to_mask, iter_bits, epsilon_closure_masks, epsilon_free_masks
+
+MatchResult = namedtuple("MatchResult", ["accepted", "offsets", "length"])
+
+
+class LazyDFA:
+    def __init__(self, states, alphabet, enfa, start_state, final_states, cache_size=4096):
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+        self.alphabet = [a for a in alphabet if a != "ε"]
+        index = intern_states(list(states) + [start_state], enfa)
+        self.names = list(index)
+        comp, closure, dag = epsilon_closure_masks(index, enfa)
+        rows = epsilon_free_masks(index, self.alphabet, enfa, comp, closure, dag)
+        # ε-free NFA: δ'(q, a) per state, finals are states whose closure meets F
+        self.succ = {a: [rows[a][comp[i]] for i in range(len(index))] for a in self.alphabet}
+        final_mask = states_to_mask((f for f in final_states if f in index), index)
+        self.final_mask = 0
+        for i, c in enumerate(comp):
+            if closure[c] & final_mask:
+                self.final_mask |= 1 << i
+        self.start = 1 << index[start_state]
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reset()
+
+    # ---------- Determinization on demand ----------
+    def step(self, mask, a):
+        row = self._cache.get(mask)
+        if row is None:
+            row = self._cache[mask] = {}
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._cache.move_to_end(mask)
+        nxt = row.get(a)
+        if nxt is not None:
+            self.hits += 1
+            return nxt
+        self.misses += 1
+        table = self.succ.get(a)
+        nxt = 0
+        if table is not None:
+            for i in iter_bits(mask):
+                nxt |= table[i]
+        row[a] = nxt
+        return nxt
+
+    def subset_of(self, mask):
+        return frozenset(self.names[i] for i in iter_bits(mask))
+
+    # ---------- Incremental feeding ----------
+    def reset(self):
+        self.current = self.start
+        self.offset = 0
+
+    @property
+    def accepted(self):
+        return bool(self.current & self.final_mask)
+
+    def feed(self, symbols):
+        """Consume symbols and return the offsets (prefix lengths) that were accepted."""
+        offsets = []
+        current = self.current
+        offset = self.offset
+        final_mask = self.final_mask
+        for a in symbols:
+            offset += 1
+            if current:
+                current = self.step(current, a)
+                if current & final_mask:
+                    offsets.append(offset)
+        self.current = current
+        self.offset = offset
+        return offsets
+
+    # ---------- Whole-stream helpers ----------
+    def iter_matches(self, source, chunk_size=65536):
+        """Yield every accepted prefix length of source, reading it chunk by chunk."""
+        self.reset()
+        if self.accepted:
+            yield 0
+        for chunk in iter_chunks(source, chunk_size):
+            yield from self.feed(chunk)
+            if not self.current:
+                # Dead subset: nothing later can be accepted
+                break
+
+    def run(self, source, chunk_size=65536):
+        self.reset()
+        offsets = [0] if self.accepted else []
+        for chunk in iter_chunks(source, chunk_size):
+            if self.current:
+                offsets.extend(self.feed(chunk))
+            else:
+                # Dead subset: only the input length is still needed
+                self.offset += len(chunk)
+        return MatchResult(self.accepted, offsets, self.offset)
+
+    def accepts(self, source, chunk_size=65536):
+        return self.run(source, chunk_size).accepted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached_states": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def iter_chunks(source, chunk_size=65536):
+    """
+    Split an input into chunks of symbols.
+    str/bytes inputs and file-like objects are read one character per symbol
+    (bytes are decoded as latin-1); any other iterable is taken as a sequence
+    of symbols, which is how multi-character symbols are passed.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = source.decode("latin-1")
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_size):
+            yield source[i:i + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, (bytes, bytearray)):
+                chunk = chunk.decode("latin-1")
+            yield chunk
+    else:
+        chunk = []
+        for a in source:
+            chunk.append(a)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,209 @@
+# loader.py
+"""
+Loading NFA definitions from Excel workbooks and JSON files.
+"""
+import json
+import os
+
+
+class NFAFormatError(ValueError):
+    pass
+
+
+def _check_states(nfa_states, start_state, final_states, unknown_targets):
+    state_set = set(nfa_states)
+    if start_state not in state_set:
+        raise NFAFormatError(f"Start state `{start_state}` is not in states!")
+    if not set(final_states).issubset(state_set):
+        raise NFAFormatError("Some final states are not in the set of states!")
+    if unknown_targets:
+        raise NFAFormatError("Some transitions point to states not in the state set!")
+
+
+def parse_nfa_dataframe(df, validate=False):
+    """
+    Parse a transition-table sheet: a `State` column (start state marked with
+    →, finals with *) and one column per input symbol holding comma separated
+    next states (φ or empty for none). Cells are split with vectorized pandas
+    string operations; with validate=True unknown target states are detected
+    in the same pass and reported as NFAFormatError. A state given on more
+    than one row takes, per symbol, the cell of its last row that has one.
+    """
+    import numpy as np
+    import pandas as pd
+    if "State" not in df.columns:
+        raise NFAFormatError("Sheet has no 'State' column")
+    df = df.reset_index(drop=True)
+    raw = df["State"].astype(str)
+    states = raw.str.replace("→", "", regex=False).str.replace("*", "", regex=False)
+    nfa_states = states.tolist()
+    alphabet = [str(col) for col in df.columns if col != "State"]
+    starts = states[raw.str.contains("→", regex=False)]
+    # Last marked row wins, as in a row-by-row scan; fallback to the first state
+    start_state = starts.iloc[-1] if len(starts) else (nfa_states[0] if nfa_states else None)
+    final_states = states[raw.str.contains("*", regex=False)].tolist()
+    # One long Series of every non-empty cell, row-major like a row-by-row scan
+    body = df[[c for c in df.columns if c != "State"]]
+    cells = pd.Series(body.to_numpy(dtype=object).ravel()).astype(str).str.strip()
+    keep = cells.notna() & (cells != "") & (cells != "φ") & (cells.str.lower() != "nan")
+    positions = np.flatnonzero(keep.to_numpy())
+    parts = cells[keep].str.split(",").explode().str.strip()
+    parts = parts[parts.notna() & (parts != "")]
+    unknown_targets = validate and not parts.isin(set(nfa_states)).all()
+    width = len(alphabet)
+    keys = [(nfa_states[r], alphabet[c]) for r, c in zip(*(x.tolist() for x in np.divmod(positions, width)))]
+    # A state listed on several rows keeps the last non-empty cell per symbol, like a row-by-row scan
+    owner = dict(zip(keys, positions.tolist()))
+    nfa_transitions = {key: set() for key in owner}
+    rows, cols = np.divmod(parts.index.to_numpy(), width)
+    for pos, r, c, dst in zip(parts.index.tolist(), rows.tolist(), cols.tolist(), parts.tolist()):
+        key = (nfa_states[r], alphabet[c])
+        if owner[key] == pos:
+            nfa_transitions[key].add(dst)
+    if validate:
+        _check_states(nfa_states, start_state, final_states, unknown_targets)
+    return nfa_states, alphabet, nfa_transitions, start_state, final_states
+
+
+def stream_nfa_excel(source, validate=False):
+    """
+    Same sheet layout as parse_nfa_dataframe, read row by row with openpyxl's
+    read-only mode so huge workbooks never load fully into memory.
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header or "State" not in [str(h) for h in header]:
+            raise NFAFormatError("Sheet has no 'State' column")
+        header = [str(h) for h in header]
+        state_col = header.index("State")
+        columns = [(k, h) for k, h in enumerate(header) if k != state_col]
+        alphabet = [h for _, h in columns]
+        nfa_states = []
+        start_state = None
+        final_states = []
+        targets = set()
+        nfa_transitions = {}
+        for values in rows:
+            state_raw = str(values[state_col]) if state_col < len(values) else "None"
+            state = state_raw.replace("→", "").replace("*", "")
+            nfa_states.append(state)
+            if "→" in state_raw:
+                start_state = state
+            if "*" in state_raw:
+                final_states.append(state)
+            for k, a in columns:
+                value = values[k] if k < len(values) else None
+                if value is None:
+                    continue
+                cell = str(value).strip()
+                if cell and cell != "φ" and cell.lower() != "nan":
+                    next_states = {s.strip() for s in cell.split(",") if s.strip()}
+                    nfa_transitions[(state, a)] = next_states
+                    targets |= next_states
+    finally:
+        wb.close()
+    if not start_state and nfa_states:
+        start_state = nfa_states[0]
+    if validate:
+        _check_states(nfa_states, start_state, final_states, bool(targets - set(nfa_states)))
+    return nfa_states, alphabet, nfa_transitions, start_state, final_states
+
+
+# Workbooks above this size are streamed instead of loaded into a DataFrame
+STREAMING_THRESHOLD = 50 * 2**20
+
+
+def _source_size(source):
+    if hasattr(source, "size"):
+        return source.size
+    if hasattr(source, "seek") and hasattr(source, "tell"):
+        pos = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(pos)
+        return size
+    try:
+        return os.path.getsize(source)
+    except (OSError, TypeError):
+        return 0
+
+
+def load_nfa_excel(source, validate=False, streaming=None):
+    if streaming is None:
+        streaming = _source_size(source) > STREAMING_THRESHOLD
+    if streaming:
+        return stream_nfa_excel(source, validate)
+    import pandas as pd
+    return parse_nfa_dataframe(pd.read_excel(source, dtype=str), validate)
+
+
+def load_nfa_json(source):
+    """
+    JSON layout:
+    {"states": [...], "alphabet": [...], "start": "q0", "finals": [...],
+     "transitions": {"q0": {"a": ["q0", "q1"], "ε": ["q2"]}, ...}}
+    Text that is not JSON, or JSON in another layout, raises NFAFormatError.
+    """
+    try:
+        if hasattr(source, "read"):
+            data = json.load(source)
+        else:
+            with open(source, encoding="utf-8") as f:
+                data = json.load(f)
+    except ValueError as exc:
+        # json.JSONDecodeError, or UnicodeDecodeError for a binary file
+        raise NFAFormatError(f"Not a JSON file: {exc}") from exc
+    if not isinstance(data, dict):
+        raise NFAFormatError("The JSON file must hold an object with a 'states' list")
+    try:
+        return _parse_nfa_json(data)
+    except KeyError as exc:
+        raise NFAFormatError(f"The JSON file has no {exc} entry") from exc
+    except (TypeError, AttributeError) as exc:
+        raise NFAFormatError(f"The JSON file does not follow the NFA layout: {exc}") from exc
+
+
+def _parse_nfa_json(data):
+    nfa_states = [str(s) for s in data["states"]]
+    alphabet = [str(a) for a in data.get("alphabet", [])]
+    nfa_transitions = {}
+    for state, row in data.get("transitions", {}).items():
+        for a, dsts in row.items():
+            if isinstance(dsts, str):
+                dsts = [d.strip() for d in dsts.split(",") if d.strip()]
+            if dsts:
+                nfa_transitions[(str(state), str(a))] = set(map(str, dsts))
+                if a != "ε" and str(a) not in alphabet:
+                    alphabet.append(str(a))
+    start_state = str(data.get("start", nfa_states[0] if nfa_states else ""))
+    final_states = [str(f) for f in data.get("finals", [])]
+    return nfa_states, alphabet, nfa_transitions, start_state, final_states
+
+
+def load_nfa(path, validate=False):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".json":
+        nfa = load_nfa_json(path)
+        if validate:
+            states, _, transitions, start_state, final_states = nfa
+            error_msg = validate_nfa(states, start_state, final_states, transitions)
+            if error_msg:
+                raise NFAFormatError(error_msg)
+        return nfa
+    if ext in (".xlsx", ".xlsm", ".xls"):
+        return load_nfa_excel(path, validate)
+    raise ValueError(f"Unsupported NFA file type: {path}")
+
+
+def validate_nfa(states, start_state, final_states, transitions):
+    """Return an error message for an inconsistent NFA, or None."""
+    state_set = set(states)
+    if start_state not in state_set:
+        return f"Start state `{start_state}` is not in states!"
+    if not set(final_states).issubset(state_set):
+        return "Some final states are not in the set of states!"
+    if any(dst not in state_set for dsts in transitions.values() for dst in dsts):
+        return "Some transitions point to states not in the state set!"
+    return None
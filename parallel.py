@@ -0,0 +1,140 @@
+# parallel.py
+"""
+Multiprocess subset construction for very large NFAs.
+The frontier of unexplored subsets is sharded across a process pool level
+by level; newly found subsets are merged into one hash index in the parent
+and the final numbering replays the serial engine, so the result is
+identical to core.nfa_to_dfa.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import intern_states, successor_masks, states_to_mask, subsets_to_dfa
+from generators import nth_from_end_nfa
+
+_tables = None
+
+
+def _init_worker(tables):
+    global _tables
+    _tables = tables
+
+
+def _expand_with(tables, masks):
+    rows = []
+    for S in masks:
+        row = []
+        for table in tables:
+            dest = 0
+            m = S
+            while m:
+                low = m & -m
+                dest |= table[low.bit_length() - 1]
+                m ^= low
+            row.append(dest)
+        rows.append(row)
+    return rows
+
+
+def _expand(masks):
+    return _expand_with(_tables, masks)
+
+
+def explore_parallel(succ, alphabet, start_mask, workers=None, min_shard=64):
+    """
+    Breadth-first exploration of the reachable subsets.
+    Returns {subset mask: [successor mask per symbol]}; frontiers smaller
+    than workers * min_shard are expanded in-process to skip the IPC cost.
+    """
+    tables = [succ[a] for a in alphabet]
+    workers = workers or os.cpu_count() or 1
+    successors = {}
+    frontier = [start_mask]
+    seen = {start_mask}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tables,)) as pool:
+        while frontier:
+            if workers == 1 or len(frontier) < workers * min_shard:
+                rows = _expand_with(tables, frontier)
+            else:
+                size = -(-len(frontier) // (workers * 4))
+                shards = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+                rows = [row for shard_rows in pool.map(_expand, shards) for row in shard_rows]
+            next_frontier = []
+            for S, row in zip(frontier, rows):
+                successors[S] = row
+                for dest in row:
+                    if dest and dest not in seen:
+                        seen.add(dest)
+                        next_frontier.append(dest)
+            frontier = next_frontier
+    return successors
+
+
+def number_subsets(successors, start_mask):
+    """Replay core.subset_construction's worklist order over precomputed successors."""
+    masks = [start_mask]
+    ids = {start_mask: 0}
+    rows = [None]
+    order = []
+    unmarked = [0]
+    while unmarked:
+        i = unmarked.pop()
+        order.append(i)
+        row = []
+        for dest in successors[masks[i]]:
+            if dest:
+                j = ids.get(dest)
+                if j is None:
+                    j = len(masks)
+                    ids[dest] = j
+                    masks.append(dest)
+                    rows.append(None)
+                    unmarked.append(j)
+                row.append(j)
+            else:
+                row.append(-1)
+        rows[i] = row
+    return masks, rows, order
+
+
+def parallel_nfa_to_dfa(states, alphabet, nfa_no_e, start_state, final_states, workers=None):
+    dfa_alphabet = [a for a in alphabet if a != "ε"]
+    index = intern_states(list(states) + [start_state], nfa_no_e)
+    names = list(index)
+    succ = successor_masks(index, dfa_alphabet, nfa_no_e)
+    final_mask = states_to_mask((f for f in final_states if f in index), index)
+    start_mask = 1 << index[start_state]
+    successors = explore_parallel(succ, dfa_alphabet, start_mask, workers)
+    masks, rows, order = number_subsets(successors, start_mask)
+    return subsets_to_dfa(names, dfa_alphabet, masks, rows, order, final_mask)
+
+
+# ---------- Scaling benchmark ----------
+def benchmark_workers(n=16, worker_counts=(1, 2, 4, 8)):
+    from core import nfa_to_dfa
+    nfa = nth_from_end_nfa(n)
+    t0 = time.perf_counter()
+    expected = nfa_to_dfa(*nfa)
+    results = [{"workers": "serial", "seconds": time.perf_counter() - t0, "dfa_states": len(expected[0])}]
+    for workers in worker_counts:
+        t0 = time.perf_counter()
+        dfa = parallel_nfa_to_dfa(*nfa, workers=workers)
+        elapsed = time.perf_counter() - t0
+        if dfa != expected:
+            raise AssertionError(f"parallel result with {workers} workers differs from the serial engine")
+        results.append({"workers": workers, "seconds": elapsed, "dfa_states": len(dfa[0])})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the parallel subset construction.")
+    parser.add_argument("-n", type=int, default=16, help="n-th-from-end family size (2^n DFA states)")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated worker counts")
+    args = parser.parse_args()
+    counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    serial = None
+    for row in benchmark_workers(args.n, counts):
+        serial = serial or row["seconds"]
+        print(f"{str(row['workers']):>8}  {row['dfa_states']:>8} states  {row['seconds']:8.3f}s  x{serial / row['seconds']:.2f}")
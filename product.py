@@ -0,0 +1,236 @@
+# product.py
+"""
+Union, intersection, difference and complement of DFAs by product construction.
+
+Operands are DFA tuples (states, alphabet, transitions, start, finals) as
+returned by minimize_dfa, or nfa_to_dfa with the alphabet put back. Each
+operand is indexed once into integer rows; a product state is the pair
+(i, j) packed into one int, i * (states of B + 1) + j, and only pairs
+reachable from the start pair are explored. Missing transitions go to an
+implicit dead state, so the operands need not be complete.
+
+A pair from which no accepting pair can be reached is spotted as soon as
+it is discovered (each component knows whether it can still reach a final
+and a non-final state) and all such pairs share one dead state, ∅.
+minimize=True runs minimize_dfa over the result as well. is_empty() runs
+the same search but stops at the first accepting pair.
+"""
+from collections import namedtuple
+
+from core import minimize_dfa, state_to_label
+
+OPERATIONS = {
+    "union": lambda x, y: x or y,
+    "intersection": lambda x, y: x and y,
+    "difference": lambda x, y: x and not y,
+    "symmetric_difference": lambda x, y: x != y,
+}
+DEAD = "∅"
+
+Emptiness = namedtuple("Emptiness", ["empty", "witness", "explored"])
+
+
+class _Indexed:
+    """A DFA as integer rows over a shared alphabet; id len(states) is the dead state."""
+    def __init__(self, dfa, alphabet):
+        states, _, transitions, start_state, final_states = dfa
+        self.states = list(states)
+        ids = {s: i for i, s in enumerate(self.states)}
+        dead = len(self.states)
+        columns = {a: k for k, a in enumerate(alphabet)}
+        self.rows = [[dead] * len(alphabet) for _ in range(dead + 1)]
+        for (src, a), dst in transitions.items():
+            i, k = ids.get(src), columns.get(a)
+            if i is not None and k is not None:
+                self.rows[i][k] = ids.get(dst, dead)
+        self.start = ids.get(start_state, dead)
+        self.final = bytearray(dead + 1)
+        for f in final_states:
+            if f in ids:
+                self.final[ids[f]] = 1
+        # outcomes[i]: the acceptance values (True / False) still reachable from i
+        to_final = self._reaches([i for i in range(dead + 1) if self.final[i]])
+        to_other = self._reaches([i for i in range(dead + 1) if not self.final[i]])
+        self.outcomes = [(True,) * to_final[i] + (False,) * to_other[i] for i in range(dead + 1)]
+
+    def _reaches(self, targets):
+        """Flags of the states with a path into `targets`, by a backward BFS."""
+        reverse = [[] for _ in self.rows]
+        for i, row in enumerate(self.rows):
+            for j in row:
+                reverse[j].append(i)
+        seen = bytearray(len(self.rows))
+        for t in targets:
+            seen[t] = 1
+        queue = list(targets)
+        for j in queue:
+            for i in reverse[j]:
+                if not seen[i]:
+                    seen[i] = 1
+                    queue.append(i)
+        return seen
+
+    def label(self, i):
+        return state_to_label(self.states[i]) if i < len(self.states) else DEAD
+
+
+def _alphabet(*dfas):
+    alphabet = []
+    for dfa in dfas:
+        for a in dfa[1]:
+            if a != "ε" and a not in alphabet:
+                alphabet.append(a)
+    return alphabet
+
+
+def _operation(operation):
+    if callable(operation):
+        return operation
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    return OPERATIONS[operation]
+
+
+def _search(a, b, accept, alphabet, stop_at_accepting=False):
+    """
+    BFS over the reachable pairs. Returns (pairs, rows, parent): pairs[p] is
+    the packed pair of product state p (None for the shared dead state),
+    rows[p] its successor ids and parent[p] the (state, symbol) it was
+    first reached from. With stop_at_accepting the search ends at the first
+    accepting pair, state len(rows), before it is expanded.
+    """
+    width = len(b.rows)
+    ids = {}
+    pairs = []
+    parent = []
+    dead = [None]
+
+    def state_id(i, j, source):
+        key = i * width + j
+        p = ids.get(key)
+        if p is not None:
+            return p
+        if not any(accept(x, y) for x in a.outcomes[i] for y in b.outcomes[j]):
+            if dead[0] is None:
+                dead[0] = len(pairs)
+                pairs.append(None)
+                parent.append(source)
+            p = ids[key] = dead[0]
+            return p
+        p = ids[key] = len(pairs)
+        pairs.append(key)
+        parent.append(source)
+        return p
+
+    state_id(a.start, b.start, None)
+    rows = []
+    for p, key in enumerate(pairs):
+        if key is None:
+            rows.append([p] * len(alphabet))
+            continue
+        i, j = divmod(key, width)
+        if stop_at_accepting and accept(a.final[i], b.final[j]):
+            break
+        row_a, row_b = a.rows[i], b.rows[j]
+        rows.append([state_id(row_a[k], row_b[k], (p, sym)) for k, sym in enumerate(alphabet)])
+    return pairs, rows, parent
+
+
+def product(dfa_a, dfa_b, operation, minimize=False, stats=None):
+    """
+    DFA for L(A) op L(B). `operation` is a key of OPERATIONS or any
+    accept(in_a, in_b) function. States are labelled "(a,b)"; the
+    result is complete, with ∅ as the dead state when one is reachable.
+    """
+    accept = _operation(operation)
+    alphabet = _alphabet(dfa_a, dfa_b)
+    a, b = _Indexed(dfa_a, alphabet), _Indexed(dfa_b, alphabet)
+    width = len(b.rows)
+    pairs, rows, _ = _search(a, b, accept, alphabet)
+    labels = []
+    finals = set()
+    for key in pairs:
+        if key is None:
+            labels.append(DEAD)
+            continue
+        i, j = divmod(key, width)
+        labels.append(f"({a.label(i)},{b.label(j)})")
+        if accept(a.final[i], b.final[j]):
+            finals.add(labels[-1])
+    transitions = {}
+    for p, row in enumerate(rows):
+        for sym, q in zip(alphabet, row):
+            transitions[(labels[p], sym)] = labels[q]
+    if stats is not None:
+        stats.update(product_states=len(pairs), dead_merged=None in pairs)
+    if minimize:
+        return minimize_dfa(labels, alphabet, transitions, labels[0], finals, stats=stats)
+    return labels, alphabet, transitions, labels[0], finals
+
+
+def union(dfa_a, dfa_b, minimize=False, stats=None):
+    return product(dfa_a, dfa_b, "union", minimize, stats)
+
+
+def intersection(dfa_a, dfa_b, minimize=False, stats=None):
+    return product(dfa_a, dfa_b, "intersection", minimize, stats)
+
+
+def difference(dfa_a, dfa_b, minimize=False, stats=None):
+    return product(dfa_a, dfa_b, "difference", minimize, stats)
+
+
+def symmetric_difference(dfa_a, dfa_b, minimize=False, stats=None):
+    return product(dfa_a, dfa_b, "symmetric_difference", minimize, stats)
+
+
+def complement(dfa, alphabet=None, minimize=False, stats=None):
+    """
+    DFA for Σ* \\ L(A), where Σ is `alphabet` (default: the DFA's own).
+    The DFA is completed with ∅ first, so its missing moves are accepted.
+    """
+    alphabet = _alphabet(dfa) if alphabet is None else [a for a in alphabet if a != "ε"]
+    a = _Indexed(dfa, alphabet)
+    seen = bytearray(len(a.rows))
+    seen[a.start] = 1
+    order = [a.start]
+    for i in order:
+        for j in a.rows[i]:
+            if not seen[j]:
+                seen[j] = 1
+                order.append(j)
+    transitions = {}
+    for i in order:
+        for sym, j in zip(alphabet, a.rows[i]):
+            transitions[(a.label(i), sym)] = a.label(j)
+    states = [a.label(i) for i in order]
+    finals = {a.label(i) for i in order if not a.final[i]}
+    if stats is not None:
+        stats.update(product_states=len(states))
+    if minimize:
+        return minimize_dfa(states, alphabet, transitions, states[0], finals, stats=stats)
+    return states, alphabet, transitions, states[0], finals
+
+
+def is_empty(dfa_a, dfa_b, operation="intersection", stats=None):
+    """
+    Whether L(A) op L(B) is empty, without building the product: the search
+    stops at the first accepting pair, and pairs that cannot lead to one
+    are not expanded. Otherwise `witness` is a shortest word in it.
+    """
+    accept = _operation(operation)
+    alphabet = _alphabet(dfa_a, dfa_b)
+    a, b = _Indexed(dfa_a, alphabet), _Indexed(dfa_b, alphabet)
+    pairs, rows, parent = _search(a, b, accept, alphabet, stop_at_accepting=True)
+    result = Emptiness(True, None, len(pairs))
+    if len(rows) < len(pairs):
+        # The search stopped at state len(rows), the first accepting pair
+        word = []
+        p = len(rows)
+        while parent[p] is not None:
+            p, sym = parent[p]
+            word.append(sym)
+        result = Emptiness(False, word[::-1], len(pairs))
+    if stats is not None:
+        stats.update(pairs=result.explored)
+    return result
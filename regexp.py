@@ -0,0 +1,431 @@
+# regexp.py
+"""
+Regular expressions to ε-NFAs (Thompson's construction) and a DFA matcher.
+
+Syntax (a subset of Python's `re`): literals, `.`, classes `[a-z0-9_]` /
+`[^...]`, `\\d \\w \\s` (and `\\D \\W \\S`), grouping `( )`, alternation
+`|`, and the quantifiers `* + ?` and `{m}`, `{m,}`, `{,n}`, `{m,n}`. Escapes
+are read as `re` reads them: `\\n \\t \\r \\f \\v \\a`, octal `\\0`, `\\xhh`,
+`\\uhhhh`, `\\Uhhhhhhhh`, `\\N{name}`, `[\\b]` for backspace, and `\\` before
+punctuation for the character itself. `\\d \\w \\s` are ASCII-only, as with
+re.ASCII: `\\w` does not match "é", nor `\\d` "٣", nor `\\s` "\\xa0".
+
+A lazy quantifier (`*?`, `{m,n}?`, ...) accepts the same strings as the
+greedy one, so it is read as that. Anchors (`^ $ \\A \\Z \\b \\B`),
+backreferences, possessive quantifiers (`*+`) and stacked quantifiers
+(`a**`, which `re` rejects too) raise ValueError: fullmatch() and search()
+decide where a match may start and end.
+
+Characters the pattern never names are all alike to it, so they share one
+stand-in symbol, OTHER; `.` and negated classes have an OTHER edge. A
+Regex is compiled once (ε-NFA → DFA → minimized DFA → transition table)
+and then runs in time linear in the input, without backtracking.
+"""
+import re
+import string
+import sys
+import unicodedata
+
+from core import remove_epsilon, nfa_to_dfa, minimize_dfa
+
+# Stands for every character not mentioned in the pattern
+OTHER = "\uffff"
+
+CLASS_ESCAPES = {
+    "d": set("0123456789"),
+    "w": set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"),
+    "s": set(" \t\n\r\f\v"),
+}
+# Escapes for single characters; \x, \u and \U take this many hex digits
+CHAR_ESCAPES = {"a": "\a", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+OCTAL = "01234567"
+# Zero-width assertions, rejected like ^ and $
+ZERO_WIDTH = "AZbB"
+# {m}, {m,}, {,n}, {m,n}; re reads anything else after { as literal text
+_COUNT = re.compile(r"\{(\d+|(?=,))(,(\d*))?\}")
+
+
+# ---------- Thompson construction ----------
+class _Builder:
+    def __init__(self):
+        self.transitions = {}
+        self.count = 0
+        # (src, dst, excluded chars): edges on every symbol but `excluded`,
+        # expanded once the whole pattern (and so its alphabet) is known
+        self.any_edges = []
+
+    def state(self):
+        name = f"t{self.count}"
+        self.count += 1
+        return name
+
+    def edge(self, src, symbol, dst):
+        self.transitions.setdefault((src, symbol), set()).add(dst)
+
+    def chars(self, src, chars, dst, negated=False):
+        if negated:
+            self.any_edges.append((src, dst, frozenset(chars)))
+        else:
+            for c in chars:
+                self.edge(src, c, dst)
+
+
+def _parse(regex, builder):
+    """
+    Recursive descent over: alternation `|`, concatenation, postfix
+    quantifiers, parentheses, classes and single-character literals.
+    Returns the (start, accept) fragment of the whole expression.
+    """
+    pos = 0
+
+    def peek():
+        return regex[pos] if pos < len(regex) else None
+
+    def alternation():
+        nonlocal pos
+        frags = [concatenation()]
+        while peek() == "|":
+            pos += 1
+            frags.append(concatenation())
+        if len(frags) == 1:
+            return frags[0]
+        start, accept = builder.state(), builder.state()
+        for s, f in frags:
+            builder.edge(start, "ε", s)
+            builder.edge(f, "ε", accept)
+        return start, accept
+
+    def concatenation():
+        frags = []
+        while peek() not in (None, "|", ")"):
+            frags.append(repetition())
+        return concat(frags)
+
+    def concat(frags):
+        if not frags:
+            s = builder.state()
+            return s, s
+        for (_, f), (s, _) in zip(frags, frags[1:]):
+            builder.edge(f, "ε", s)
+        return frags[0][0], frags[-1][1]
+
+    def quantify(s, f, op):
+        start, accept = builder.state(), builder.state()
+        builder.edge(start, "ε", s)
+        builder.edge(f, "ε", accept)
+        if op in ("*", "?"):
+            builder.edge(start, "ε", accept)
+        if op in ("*", "+"):
+            builder.edge(f, "ε", s)
+        return start, accept
+
+    def count_at(i):
+        return _COUNT.match(regex, i) if i < len(regex) and regex[i] == "{" else None
+
+    def repetition():
+        nonlocal pos
+        atom_start = pos
+        s, f = atom()
+        atom_text = regex[atom_start:pos]
+        c = peek()
+        count = count_at(pos)
+        if c in ("*", "+", "?"):
+            pos += 1
+            s, f = quantify(s, f, c)
+        elif count is not None:
+            pos = count.end()
+            low = int(count.group(1) or 0)
+            high = low if count.group(2) is None else (int(count.group(3)) if count.group(3) else None)
+            if high is not None and high < low:
+                raise ValueError(f"Bad repetition {count.group(0)} in {regex!r}")
+            # Every further copy of the atom is parsed again into fresh states
+            copies = [(s, f)] + [_parse(atom_text, builder) for _ in range(max(low, high or low + 1) - 1)]
+            frags = copies[:low]
+            if high is None:
+                frags.append(quantify(*copies[low], "*"))
+            else:
+                frags.extend(quantify(*copy, "?") for copy in copies[low:high])
+            s, f = concat(frags)
+        else:
+            return s, f
+        if peek() == "?":
+            # Lazy: a different match position for re, but the same strings
+            pos += 1
+        elif peek() == "+":
+            raise ValueError(f"Possessive quantifiers are not supported ({pos} in {regex!r})")
+        if peek() in ("*", "+", "?") or count_at(pos) is not None:
+            raise ValueError(f"Multiple repeat at {pos} in {regex!r}")
+        return s, f
+
+    def escape(in_class=False):
+        """
+        The character set of the escape at pos (just after the backslash),
+        and whether it is negated. Outside a class `\\b` is a word boundary,
+        inside one it is backspace.
+        """
+        nonlocal pos
+        c = peek()
+        if c is None:
+            raise ValueError(f"Dangling escape in {regex!r}")
+        pos += 1
+        if c.lower() in CLASS_ESCAPES:
+            return CLASS_ESCAPES[c.lower()], c.isupper()
+        if c in CHAR_ESCAPES or (c == "b" and in_class):
+            return {CHAR_ESCAPES.get(c, "\b")}, False
+        if c in HEX_ESCAPES:
+            digits = regex[pos:pos + HEX_ESCAPES[c]]
+            if len(digits) < HEX_ESCAPES[c] or not all(d in string.hexdigits for d in digits):
+                raise ValueError(f"Incomplete escape \\{c}{digits} in {regex!r}")
+            pos += len(digits)
+            if int(digits, 16) > sys.maxunicode:
+                raise ValueError(f"Bad escape \\{c}{digits} in {regex!r}")
+            return {chr(int(digits, 16))}, False
+        if c == "N":
+            name = re.match(r"\{([^}]*)\}", regex[pos:])
+            if name is None:
+                raise ValueError(f"Missing {{ after \\N in {regex!r}")
+            pos += name.end()
+            try:
+                return {unicodedata.lookup(name.group(1))}, False
+            except KeyError:
+                raise ValueError(f"Undefined character name {name.group(1)!r} in {regex!r}") from None
+        # As in re: \0 and any digit in a class start an octal escape, and
+        # outside a class so do three octal digits; \1 to \99 are backreferences
+        following = regex[pos:pos + 2]
+        if c in OCTAL and (c == "0" or in_class or (len(following) == 2 and all(d in OCTAL for d in following))):
+            end = pos
+            while end < len(regex) and end < pos + 2 and regex[end] in OCTAL:
+                end += 1
+            code = int(regex[pos - 1:end], 8)
+            if code > 0o377:
+                raise ValueError(f"Octal escape \\{regex[pos - 1:end]} out of range in {regex!r}")
+            pos = end
+            return {chr(code)}, False
+        if c in string.digits and not in_class:
+            raise ValueError(f"Backreferences are not supported (\\{c} in {regex!r})")
+        if c in ZERO_WIDTH and not in_class:
+            raise ValueError(f"Anchors are not supported (\\{c} at {pos - 2} in {regex!r}); use fullmatch or search")
+        if c in string.ascii_letters or c in string.digits:
+            raise ValueError(f"Bad escape \\{c} in {regex!r}")
+        return {c}, False
+
+    def class_member():
+        """The characters of the class member at pos and whether it was an escape like \\d."""
+        nonlocal pos
+        c = peek()
+        pos += 1
+        if c != "\\":
+            return {c}, False
+        letter = peek()
+        members, inverted = escape(in_class=True)
+        if inverted:
+            raise ValueError(f"Negated escape inside a class in {regex!r}")
+        return members, letter.lower() in CLASS_ESCAPES
+
+    def char_class():
+        nonlocal pos
+        negated = peek() == "^"
+        if negated:
+            pos += 1
+        chars = set()
+        first = True
+        while True:
+            c = peek()
+            if c is None:
+                raise ValueError(f"Unterminated character class in {regex!r}")
+            if c == "]" and not first:
+                pos += 1
+                return chars, negated
+            first = False
+            members, is_set = class_member()
+            if peek() == "-" and pos + 1 < len(regex) and regex[pos + 1] != "]":
+                pos += 1
+                high, high_is_set = class_member()
+                if is_set or high_is_set:
+                    raise ValueError(f"Bad range in {regex!r}")
+                low, high = min(members), min(high)
+                if high < low:
+                    raise ValueError(f"Bad range {low}-{high} in {regex!r}")
+                chars.update(chr(o) for o in range(ord(low), ord(high) + 1))
+            else:
+                chars |= members
+
+    def atom():
+        nonlocal pos
+        c = peek()
+        if c == "(":
+            pos += 1
+            frag = alternation()
+            if peek() != ")":
+                raise ValueError(f"Unbalanced parenthesis in {regex!r}")
+            pos += 1
+            return frag
+        if c is None or c in "*+?)" or count_at(pos) is not None:
+            raise ValueError(f"Unexpected {c!r} at {pos} in {regex!r}")
+        if c in "^$":
+            raise ValueError(f"Anchors are not supported ({c!r} at {pos} in {regex!r}); use fullmatch or search")
+        pos += 1
+        s, f = builder.state(), builder.state()
+        if c == ".":
+            # As in `re` without DOTALL
+            builder.chars(s, "\n", f, negated=True)
+        elif c == "[":
+            chars, negated = char_class()
+            builder.chars(s, chars, f, negated)
+        elif c == "\\":
+            chars, negated = escape()
+            builder.chars(s, chars, f, negated)
+        else:
+            builder.edge(s, c, f)
+        return s, f
+
+    frag = alternation()
+    if pos != len(regex):
+        raise ValueError(f"Unexpected {regex[pos]!r} at {pos} in {regex!r}")
+    return frag
+
+
+def thompson_nfa(regex):
+    """ε-NFA for `regex` by Thompson's construction."""
+    builder = _Builder()
+    start, accept = _parse(regex, builder)
+    symbols = {a for (_, a) in builder.transitions if a != "ε"}
+    if builder.any_edges:
+        # Excluded characters must not be read as OTHER
+        for _, _, excluded in builder.any_edges:
+            symbols |= excluded
+        symbols.add(OTHER)
+        for src, dst, excluded in builder.any_edges:
+            for a in symbols - excluded:
+                builder.edge(src, a, dst)
+    states = [f"t{i}" for i in range(builder.count)]
+    return states, sorted(symbols), builder.transitions, start, [accept]
+
+
+def search_nfa(nfa):
+    """ε-NFA for Σ* L Σ*: the inputs that contain a word of L (Σ includes OTHER)."""
+    states, alphabet, transitions, start, finals = nfa
+    sigma = list(alphabet) if OTHER in alphabet else list(alphabet) + [OTHER]
+    transitions = {key: set(dsts) for key, dsts in transitions.items()}
+    before, after = "t_before", "t_after"
+    for a in sigma:
+        transitions[(before, a)] = {before}
+        transitions[(after, a)] = {after}
+    transitions[(before, "ε")] = {start}
+    for f in finals:
+        transitions.setdefault((f, "ε"), set()).add(after)
+    return [before] + list(states) + [after], sigma, transitions, before, [after]
+
+
+# ---------- Matching ----------
+def minimal_dfa(nfa):
+    """The minimized DFA tuple of an ε-NFA."""
+    states, alphabet, transitions, start, finals = nfa
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, transitions, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    return minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+
+
+def compile_matcher(dfa):
+    """CompiledDFA for a DFA tuple, with unknown characters read as OTHER."""
+    # NumPy is only needed for matching, not for thompson_nfa
+    from compiled import compile_dfa
+    compiled = compile_dfa(*dfa)
+    if OTHER in compiled.columns:
+        compiled.table[:, compiled.unknown] = compiled.table[:, compiled.columns[OTHER]]
+    return compiled
+
+
+class Regex:
+    """
+    A pattern compiled to minimized DFAs: one for whole-string matches and,
+    built on first use, one for Σ*RΣ* that answers "contains a match".
+    """
+    # Texts at least this long are scanned in blocks with NumPy (see _end_state)
+    BLOCK = 1024
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.nfa = thompson_nfa(pattern)
+        self.dfa = minimal_dfa(self.nfa)
+        self._full = compile_matcher(self.dfa)
+        self._full_rows = _python_rows(self._full)
+        self._search = None
+        self._search_rows = None
+
+    def __repr__(self):
+        return f"Regex({self.pattern!r}, dfa_states={len(self.dfa[0])})"
+
+    @property
+    def searcher(self):
+        if self._search is None:
+            self._search = compile_matcher(minimal_dfa(search_nfa(self.nfa)))
+            self._search_rows = _python_rows(self._search)
+        return self._search
+
+    def fullmatch(self, text):
+        """True if the whole of `text` matches, like bool(re.fullmatch(pattern, text))."""
+        rows, other, accept, sink = self._full_rows
+        state = self._full.start
+        for c in text:
+            state = rows[state].get(c, other[state])
+            if state == sink:
+                return False
+        return accept[state]
+
+    def search(self, text):
+        """True if some substring of `text` matches, like bool(re.search(pattern, text))."""
+        compiled = self.searcher
+        if len(text) >= 4 * self.BLOCK:
+            return bool(compiled.accept[_end_state(compiled, compiled.encode([text])[0], self.BLOCK)])
+        rows, other, accept, _ = self._search_rows
+        state = compiled.start
+        for c in text:
+            state = rows[state].get(c, other[state])
+            # Accepting states of Σ*RΣ* are absorbing
+            if accept[state]:
+                return True
+        return accept[state]
+
+    def fullmatch_many(self, strings):
+        """Boolean array: fullmatch of every string, run in lockstep."""
+        return self._full.accepts_batch(strings)
+
+    def search_many(self, strings):
+        """Boolean array: search in every string (e.g. the lines of a file), run in lockstep."""
+        return self.searcher.accepts_batch(strings)
+
+
+def _python_rows(compiled):
+    """Per-state {char: next} dicts, the OTHER target per state, accept flags and the sink."""
+    table = compiled.table.tolist()
+    rows = [{a: row[k] for a, k in compiled.columns.items()} for row in table]
+    other = [row[compiled.unknown] for row in table]
+    return rows, other, compiled.accept.tolist(), compiled.sink
+
+
+def _end_state(compiled, codes, block):
+    """
+    State after reading `codes`. The input is cut into blocks and every
+    block is run from every state at once, giving one state→state map per
+    block; the maps are then applied in order.
+    """
+    import numpy as np
+    n = compiled.table.shape[0]
+    size = -(-len(codes) // block) * block
+    padded = np.full(size, compiled.pad, dtype=np.int32)
+    padded[:len(codes)] = codes
+    blocks = padded.reshape(-1, block)
+    current = np.tile(np.arange(n, dtype=np.int32), (blocks.shape[0], 1))
+    table = compiled.table
+    for j in range(block):
+        current = table[current, blocks[:, j:j + 1]]
+    state = compiled.start
+    for row in current.tolist():
+        state = row[state]
+    return state
+
+
+def compile_regex(pattern):
+    return Regex(pattern)
@@ -0,0 +1,218 @@
+# serialize.py
+"""
+Compact binary format for NFA / DFA / minimized-DFA results.
+
+Layout (little-endian, every section padded to 4 bytes):
+    header      magic, version, flags and section sizes
+    strings     uint32 offsets + UTF-8 blob (state names, labels, symbols)
+    symbols     int32 string id per symbol
+    members     CSR (offsets, string ids) giving the name(s) of each state
+    targets     CSR over (state, symbol) cells giving target state ids
+    accept      bitmap, one bit per state
+
+A loaded file is a PackedAutomaton whose arrays are memoryviews over the
+file (mmap), so nothing is copied until to_core() rebuilds the dicts.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"NFADFA\x00"
+VERSION = 1
+# magic, version, flags, n_states, n_symbols, n_alphabet, n_strings, start, n_members, n_targets
+HEADER = struct.Struct("<7sBIiiiiiii")
+
+FLAG_FROZENSET = 1       # states are frozensets of NFA state names (nfa_to_dfa output)
+FLAG_DETERMINISTIC = 2   # every cell has at most one target
+
+
+def _pad(n):
+    return -n % 4
+
+
+def _int_array(values):
+    arr = array("i", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def dumps(states, alphabet, transitions, start_state, final_states):
+    states = list(states)
+    ids = {s: i for i, s in enumerate(states)}
+    frozen = any(isinstance(s, frozenset) for s in states)
+    symbols = list(alphabet)
+    for (_, a) in transitions:
+        if a not in symbols:
+            symbols.append(a)
+    sym_ids = {a: k for k, a in enumerate(symbols)}
+
+    strings = {}
+    def intern(text):
+        return strings.setdefault(str(text), len(strings))
+
+    member_offsets = [0]
+    members = []
+    for s in states:
+        names = sorted(s, key=str) if frozen else [s]
+        members.extend(intern(x) for x in names)
+        member_offsets.append(len(members))
+    symbol_ids = [intern(a) for a in symbols]
+
+    deterministic = True
+    cells = [[] for _ in range(len(states) * len(symbols))]
+    for (src, a), dst in transitions.items():
+        if src not in ids:
+            raise ValueError(f"Transition from unknown state {src!r}")
+        if isinstance(dst, set) or (isinstance(dst, frozenset) and dst not in ids):
+            targets = dst
+            deterministic = False
+        else:
+            targets = [dst]
+        cell = cells[ids[src] * len(symbols) + sym_ids[a]]
+        for t in targets:
+            if t not in ids:
+                raise ValueError(f"Transition target {t!r} is not a state")
+            cell.append(ids[t])
+    target_offsets = [0]
+    targets = []
+    for cell in cells:
+        targets.extend(sorted(cell))
+        target_offsets.append(len(targets))
+
+    accept = bytearray((len(states) + 7) // 8)
+    for f in final_states:
+        if f in ids:
+            accept[ids[f] >> 3] |= 1 << (ids[f] & 7)
+
+    flags = (FLAG_FROZENSET if frozen else 0) | (FLAG_DETERMINISTIC if deterministic else 0)
+    blob_parts = []
+    string_offsets = [0]
+    for text in strings:
+        blob_parts.append(text.encode("utf-8"))
+        string_offsets.append(string_offsets[-1] + len(blob_parts[-1]))
+    blob = b"".join(blob_parts)
+    start = ids.get(start_state, -1)
+    out = [HEADER.pack(MAGIC, VERSION, flags, len(states), len(symbols), len(alphabet),
+                       len(strings), start, len(members), len(targets))]
+    out.append(b"\0" * _pad(HEADER.size))
+    out.append(_int_array(string_offsets))
+    out.append(blob + b"\0" * _pad(len(blob)))
+    for section in (symbol_ids, member_offsets, members, target_offsets, targets):
+        out.append(_int_array(section))
+    out.append(bytes(accept))
+    return b"".join(out)
+
+
+def save_automaton(path, states, alphabet, transitions, start_state, final_states):
+    data = dumps(states, alphabet, transitions, start_state, final_states)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+class PackedAutomaton:
+    """Read-only view of a serialized automaton; arrays are zero-copy when possible."""
+    def __init__(self, buffer, owner=None):
+        self._owner = owner
+        self._view = view = memoryview(buffer)
+        magic, version, flags, n_states, n_symbols, n_alphabet, n_strings, start, n_members, n_targets = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not a serialized NFA/DFA file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported format version {version}")
+        self.flags = flags
+        self.num_states = n_states
+        self.start = start
+        pos = HEADER.size + _pad(HEADER.size)
+        def ints(count):
+            nonlocal pos
+            chunk = view[pos:pos + 4 * count]
+            pos += 4 * count
+            if sys.byteorder == "big":
+                arr = array("i", chunk.tobytes())
+                arr.byteswap()
+                return memoryview(arr)
+            return chunk.cast("i")
+        self._string_offsets = ints(n_strings + 1)
+        blob_len = self._string_offsets[n_strings] if n_strings else 0
+        self._blob = view[pos:pos + blob_len]
+        pos += blob_len + _pad(blob_len)
+        self._strings = [None] * n_strings
+        symbol_ids = ints(n_symbols)
+        self.symbols = [self.string(i) for i in symbol_ids]
+        self.alphabet = self.symbols[:n_alphabet]
+        self._sym_ids = {a: k for k, a in enumerate(self.symbols)}
+        self._member_offsets = ints(n_states + 1)
+        self._members = ints(n_members)
+        self._target_offsets = ints(n_states * n_symbols + 1)
+        self._targets = ints(n_targets)
+        self._accept = view[pos:pos + (n_states + 7) // 8]
+
+    @property
+    def deterministic(self):
+        return bool(self.flags & FLAG_DETERMINISTIC)
+
+    def string(self, i):
+        text = self._strings[i]
+        if text is None:
+            text = self._strings[i] = bytes(self._blob[self._string_offsets[i]:self._string_offsets[i + 1]]).decode("utf-8")
+        return text
+
+    def state(self, i):
+        names = [self.string(j) for j in self._members[self._member_offsets[i]:self._member_offsets[i + 1]]]
+        if self.flags & FLAG_FROZENSET:
+            return frozenset(names)
+        return names[0]
+
+    def is_final(self, i):
+        return bool(self._accept[i >> 3] >> (i & 7) & 1)
+
+    def successors(self, i, symbol):
+        k = self._sym_ids.get(symbol)
+        if k is None:
+            return ()
+        cell = i * len(self.symbols) + k
+        return tuple(self._targets[self._target_offsets[cell]:self._target_offsets[cell + 1]])
+
+    def to_core(self):
+        """Rebuild the (states, alphabet, transitions, start, finals) tuple the core functions use."""
+        states = [self.state(i) for i in range(self.num_states)]
+        transitions = {}
+        width = len(self.symbols)
+        offsets = self._target_offsets
+        for i, s in enumerate(states):
+            for k, a in enumerate(self.symbols):
+                lo, hi = offsets[i * width + k], offsets[i * width + k + 1]
+                if lo == hi:
+                    continue
+                if self.deterministic:
+                    transitions[(s, a)] = states[self._targets[lo]]
+                else:
+                    transitions[(s, a)] = {states[t] for t in self._targets[lo:hi]}
+        finals = {states[i] for i in range(self.num_states) if self.is_final(i)}
+        start = states[self.start] if self.start >= 0 else None
+        return states, list(self.alphabet), transitions, start, finals
+
+    def release(self):
+        """Drop the views and close the underlying mmap, if any."""
+        for name in ("_string_offsets", "_blob", "_member_offsets", "_members", "_target_offsets", "_targets", "_accept", "_view"):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+
+def loads(data):
+    return PackedAutomaton(data)
+
+
+def load_automaton(path, use_mmap=True):
+    with open(path, "rb") as f:
+        if not use_mmap:
+            return PackedAutomaton(f.read())
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return PackedAutomaton(mapped, owner=mapped)
@@ -0,0 +1,59 @@
+# test_artifacts.py
+import io
+import json
+import threading
+
+import pytest
+
+from artifacts import ArtifactManager, progress
+from cache import PipelineCache
+
+
+@pytest.fixture
+def manager():
+    manager = ArtifactManager(PipelineCache(), max_workers=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_concurrent_requests_share_one_build(manager):
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return b"<svg/>"
+
+    first = manager.request("key", "svg", build)
+    second = manager.request("key", "svg", build)
+    assert first is second
+    assert manager.peek("key", "svg") is first
+    assert progress([first]) == (0, 1)
+    release.set()
+    assert first.result(5) == b"<svg/>"
+    assert builds == [1]
+    # Now served from the cache as a finished future
+    assert manager.request("key", "svg", build).result() == b"<svg/>"
+    assert builds == [1]
+
+
+def test_failed_build_is_retried(manager):
+    def fail():
+        raise RuntimeError("dot not found")
+
+    with pytest.raises(RuntimeError):
+        manager.request("key", "svg", fail).result(5)
+    assert manager.peek("key", "svg") is None
+    assert manager.stats_for("key")[0]["error"] == "RuntimeError: dot not found"
+    assert manager.request("key", "svg", lambda: "ok").result(5) == "ok"
+
+
+def test_build_records_and_log(manager):
+    log = io.StringIO()
+    manager.stats_log = log
+    manager.request("key", "latex", lambda: "\\begin{table}").result(5)
+    (record,) = manager.stats_for("key")
+    assert record["stage"] == "latex" and record["bytes"] == len("\\begin{table}")
+    assert json.loads(log.getvalue().splitlines()[0])["stage"] == "latex"
+    assert manager.stats_for("other") == []
@@ -0,0 +1,58 @@
+# test_automaton.py
+import pickle
+
+from automaton import Automaton
+from core import determinize, epsilon_free_automaton, minimize, minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import random_nfa
+
+
+def pipeline(seed):
+    nfa = random_nfa(8, density=0.25, epsilon_density=0.1, seed=seed)
+    states, alphabet, trans, start, finals = nfa
+    closures, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return nfa, (states, alphabet, nfa_no_e, start, nfa_finals), dfa, minimize_dfa(*dfa)
+
+
+def test_round_trip_through_core_tuples():
+    for seed in range(10):
+        nfa, _, dfa, minimized = pipeline(seed)
+        for automaton in (nfa, dfa, minimized):
+            states, alphabet, trans, start, finals = automaton
+            aut = Automaton.from_core(*automaton)
+            assert aut.deterministic == (automaton is not nfa)
+            back = aut.to_core()
+            assert back[0] == list(states)
+            assert back[1] == [a for a in alphabet if a != "ε"]
+            assert back[2] == {key: dst for key, dst in trans.items() if dst}
+            assert (back[3], back[4]) == (start, set(finals))
+            assert pickle.loads(pickle.dumps(aut)).to_core() == back
+
+
+def test_automaton_pipeline_matches_tuple_pipeline():
+    for seed in range(10):
+        nfa, epsilon_free, dfa, minimized = pipeline(seed)
+        aut = Automaton.from_core(*nfa, deterministic=False)
+        free = epsilon_free_automaton(aut).to_core()
+        assert free[2] == epsilon_free[2] and free[4] == set(epsilon_free[4])
+        determinized = determinize(aut)
+        states, _, trans, start, finals = determinized.to_core()
+        assert set(states) == set(dfa[0]) and trans == dfa[2] and start == dfa[3] and finals == set(dfa[4])
+        min_states, _, min_trans, min_start, min_finals = minimize(determinized).to_core()
+        assert set(min_states) == set(minimized[0])
+        assert (min_trans, min_start, min_finals) == (minimized[2], minimized[3], set(minimized[4]))
+
+
+def test_subset_states_and_labels():
+    dfa = ([frozenset({"q1", "q0"}), frozenset({"q_D"})], ["a"],
+           {(frozenset({"q0", "q1"}), "a"): frozenset({"q_D"}), (frozenset({"q_D"}), "a"): frozenset({"q_D"})},
+           frozenset({"q0", "q1"}), [frozenset({"q0", "q1"})])
+    aut = Automaton.from_core(*dfa)
+    assert aut.members is not None and aut.names is None
+    assert aut.label(0) == "q0, q1" and aut.label(0, "") == "q0q1"
+    assert aut.is_dead(1) and not aut.is_dead(0)
+    assert aut.target(0, 0) == 1 and aut.successors(1, 0) == (1,)
+    assert list(aut.edges()) == [(0, 0, 1), (1, 0, 1)]
+    assert aut.num_transitions == 2 and aut.nbytes == 2 + 4 * 2
+    assert aut.finals() == [0] and aut.symbol_id("b") == -1
@@ -0,0 +1,58 @@
+# test_bench.py
+import json
+import re
+
+import pytest
+
+import bench
+from generators import FAMILIES, random_nfa, random_regex
+
+
+@pytest.mark.parametrize("family", sorted(FAMILIES))
+def test_generators_are_deterministic_and_consistent(family):
+    nfa = FAMILIES[family](12, seed=3)
+    assert nfa == FAMILIES[family](12, seed=3)
+    states, alphabet, trans, start, finals = nfa
+    assert start in states and set(finals) <= set(states)
+    assert all(src in states and a in alphabet + ["ε"] and dsts <= set(states) for (src, a), dsts in trans.items())
+
+
+def test_random_nfa_density():
+    states, alphabet, trans, start, finals = random_nfa(200, density=0.05, epsilon_density=0, seed=1)
+    edges = sum(len(d) for (_, a), d in trans.items() if a != "ε")
+    assert 0.8 * 200 * 200 * 2 * 0.05 < edges < 1.2 * 200 * 200 * 2 * 0.05
+    assert not any(a == "ε" for _, a in trans)
+
+
+def test_random_regex_is_valid_re():
+    for seed in range(20):
+        re.compile(random_regex(15, seed=seed))
+
+
+def test_run_case_reports_every_stage():
+    result = bench.run_case("nth_from_end", 5, repeat=1)
+    assert (result["dfa_states"], result["min_states"]) == (32, 32)
+    assert {name for name, _ in bench.pipeline_stages(FAMILIES["nth_from_end"](5))[0]} == set(result["stages"])
+    assert all(s["seconds"] >= 0 and s["peak_bytes"] >= 0 for s in result["stages"].values())
+
+
+def test_compare_flags_regressions():
+    def report(seconds):
+        return {"results": [{"family": "random", "size": 50, "seed": 0,
+                             "stages": {"nfa_to_dfa": {"seconds": seconds}, "minimize": {"seconds": 1e-5}}}]}
+    (family, size, stage, before, after, ratio, regressed), minimize = bench.compare(report(0.5), report(0.1))
+    assert (family, size, stage, before, after, regressed) == ("random", 50, "nfa_to_dfa", 0.1, 0.5, True)
+    assert ratio == pytest.approx(5.0)
+    # Sub-millisecond stages never count as regressions
+    assert minimize[-1] is False
+    assert not any(row[-1] for row in bench.compare(report(0.11), report(0.1)))
+
+
+def test_main_writes_and_compares(tmp_path, capsys):
+    out = tmp_path / "results.json"
+    assert bench.main(["--family", "epsilon_chain", "--sizes", "10,20", "--repeat", "1", "-o", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert [r["size"] for r in report["results"]] == [10, 20]
+    assert bench.main(["--family", "epsilon_chain", "--sizes", "10", "--repeat", "1", "--baseline", str(out),
+                       "--threshold", "1000"]) == 0
+    assert "compared with" in capsys.readouterr().out
@@ -0,0 +1,92 @@
+# test_budget.py
+import pickle
+
+import pytest
+
+from automaton import Automaton
+from cache import PipelineCache
+from core import (Budget, BudgetExceeded, IncrementalDFA, PartialDFA, determinize, minimize, minimize_dfa,
+                  nfa_to_dfa)
+from generators import nth_from_end_nfa
+
+
+def explode(n=8):
+    states, alphabet, trans, start, finals = nth_from_end_nfa(n)
+    return states, alphabet, trans, start, finals
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 40, 100])
+def test_max_states_is_not_overshot(limit):
+    states, alphabet, trans, start, finals = explode()
+    dfa = nfa_to_dfa(states, alphabet, trans, start, finals, budget=Budget(max_states=limit))
+    assert isinstance(dfa, PartialDFA) and dfa.reason == "max_states"
+    # Only expanding the start state may go past the cap
+    assert len(dfa[0]) <= max(limit, 1 + len(alphabet))
+
+
+def test_partial_rows_agree_with_full_dfa():
+    states, alphabet, trans, start, finals = explode()
+    full_states, full_trans, _, full_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    dfa = nfa_to_dfa(states, alphabet, trans, start, finals, budget=Budget(max_states=40))
+    part_states, part_trans, part_start, part_finals = dfa
+    assert set(part_states) <= set(full_states)
+    assert set(dfa.unexplored) <= set(part_states)
+    for s in part_states:
+        if s in dfa.unexplored:
+            assert all((s, a) not in part_trans for a in alphabet)
+        else:
+            assert all(part_trans[(s, a)] == full_trans[(s, a)] for a in alphabet)
+    assert set(part_finals) == set(full_finals) & set(part_states)
+
+
+def test_budget_not_hit_gives_full_dfa():
+    states, alphabet, trans, start, finals = explode(4)
+    dfa = nfa_to_dfa(states, alphabet, trans, start, finals, budget=Budget(max_states=16))
+    assert not isinstance(dfa, PartialDFA)
+    assert len(dfa[0]) == 16
+
+
+def test_minimize_rejects_partial_dfa():
+    states, alphabet, trans, start, finals = explode()
+    dfa = nfa_to_dfa(states, alphabet, trans, start, finals, budget=Budget(max_states=10))
+    dfa_states, dfa_trans, dfa_start, dfa_finals = dfa
+    with pytest.raises(ValueError, match="partial DFA"):
+        minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    # Also once it has been through pickle, as the pipeline cache stores it
+    dfa_states = pickle.loads(pickle.dumps(dfa))[0]
+    with pytest.raises(ValueError, match="partial DFA"):
+        minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+
+
+def test_determinize_budget_and_minimize():
+    nfa = Automaton.from_core(*explode())
+    dfa = determinize(nfa, budget=Budget(max_states=30))
+    assert dfa.truncated == "max_states"
+    assert dfa.unexplored
+    with pytest.raises(ValueError):
+        minimize(dfa)
+    assert not determinize(nfa, budget=Budget(max_states=1000)).truncated
+
+
+def test_incremental_dfa_raises_on_budget():
+    states, alphabet, trans, start, finals = explode()
+    with pytest.raises(BudgetExceeded):
+        IncrementalDFA(states, alphabet, trans, start, finals, budget=Budget(max_states=10))
+
+
+def test_deadline_cut_result_is_not_cached():
+    cache = PipelineCache(directory=None)
+    calls = []
+
+    def compute():
+        calls.append(True)
+        return PartialDFA(([], {}, None, set()), [], "deadline")
+
+    def keep(dfa):
+        return dfa.reason != "deadline"
+
+    first = cache.get_or_compute("nfa", "determinize", compute, keep)
+    assert first.reason == "deadline"
+    assert cache.get("nfa", "determinize") is None
+    cache.get_or_compute("nfa", "determinize", compute, keep)
+    assert len(calls) == 2
@@ -0,0 +1,131 @@
+# test_cache.py
+import threading
+import time
+
+import pytest
+
+from artifacts import ArtifactManager, progress
+from cache import PipelineCache, fingerprint, layout_fingerprint
+
+
+def test_fingerprint_ignores_ordering():
+    a = fingerprint(["q0", "q1"], ["a", "b"], {("q0", "a"): {"q0", "q1"}, ("q1", "b"): set()}, "q0", ["q1"])
+    b = fingerprint(["q1", "q0"], ["b", "a"], {("q0", "a"): {"q1", "q0"}}, "q0", {"q1"})
+    assert a == b
+    assert a != fingerprint(["q0", "q1"], ["a", "b"], {("q0", "a"): {"q0"}}, "q0", ["q1"])
+
+
+def test_layout_fingerprint_follows_order():
+    assert layout_fingerprint(["q0", "q1"], ["a"]) == layout_fingerprint(["q0", "q1"], ["a"])
+    assert layout_fingerprint(["q0", "q1"], ["a"]) != layout_fingerprint(["q1", "q0"], ["a"])
+
+
+def test_lru_eviction_by_size():
+    cache = PipelineCache(max_bytes=2000)
+    for i in range(10):
+        cache.put("k", f"s{i}", "x" * 500)
+    assert cache.nbytes <= 2000
+    assert cache.get("k", "s9") is not None
+    assert cache.get("k", "s0") is None
+    assert cache.metrics()["evictions"] > 0
+
+
+def test_disk_persistence(tmp_path):
+    PipelineCache(directory=str(tmp_path)).put("k", "dfa@hopcroft", {"rows": [1, 2]})
+    cache = PipelineCache(directory=str(tmp_path))
+    assert cache.get("k", "dfa@hopcroft") == {"rows": [1, 2]}
+    assert cache.metrics()["disk_hits"] == 1
+
+
+def test_recently_used_entries_survive_eviction():
+    cache = PipelineCache(max_bytes=2000)
+    cache.put("k", "old", "x" * 500)
+    for i in range(6):
+        cache.get("k", "old")
+        cache.put("k", f"s{i}", "x" * 500)
+    assert cache.get("k", "old") is not None
+    assert cache.get("k", "s0") is None
+
+
+def test_values_larger_than_the_cache_are_not_kept():
+    cache = PipelineCache(max_bytes=100)
+    assert cache.put("k", "big", "x" * 1000) == "x" * 1000
+    assert cache.get("k", "big") is None and len(cache) == 0
+
+
+def test_disk_is_trimmed_and_bad_files_ignored(tmp_path):
+    cache = PipelineCache(directory=str(tmp_path), max_disk_bytes=3000)
+    for i in range(10):
+        cache.put("k", f"svg:{i}", "x" * 500)
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 3000
+    (tmp_path / "k-broken.pkl").write_bytes(b"not a pickle")
+    assert PipelineCache(directory=str(tmp_path)).get("k", "broken", "default") == "default"
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_get_or_compute_counts_each_lookup_once():
+    cache = PipelineCache()
+    calls = []
+    assert cache.get_or_compute("k", "s", lambda: calls.append(1) or "v") == "v"
+    assert cache.get_or_compute("k", "s", lambda: calls.append(1) or "w") == "v"
+    metrics = cache.metrics()
+    assert len(calls) == 1
+    assert (metrics["misses"], metrics["hits"], metrics["shared"], metrics["computed"]) == (1, 1, 0, 1)
+    assert metrics["hit_rate"] == 0.5
+
+
+def test_single_flight_follower_is_shared_not_missed():
+    cache = PipelineCache()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "v"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", "s", compute)))
+               for _ in range(2)]
+    for t in threads:
+        t.start()
+    deadline = time.perf_counter() + 5
+    while cache.metrics()["misses"] < 2 and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+    metrics = cache.metrics()
+    assert results == ["v", "v"] and len(calls) == 1
+    assert (metrics["misses"], metrics["shared"], metrics["computed"]) == (1, 1, 1)
+    assert metrics["hit_rate"] == 0.5
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = PipelineCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", "s", fail)
+    assert cache.get_or_compute("k", "s", lambda: "ok") == "ok"
+
+
+def test_artifacts_built_once_and_stats_bounded():
+    cache = PipelineCache()
+    manager = ArtifactManager(cache, max_workers=1, max_stats=3)
+    builds = []
+    try:
+        futures = [manager.request(f"key{i}", "svg", lambda i=i: builds.append(i) or f"<svg{i}>") for i in range(5)]
+        assert [f.result(5) for f in futures] == [f"<svg{i}>" for i in range(5)]
+        assert progress(futures) == (5, 5)
+        assert manager.request("key0", "svg", lambda: builds.append("again")).result(5) == "<svg0>"
+        assert sorted(builds) == list(range(5))
+        assert len(manager.stats) == 3
+        assert manager.stats_for("key4") and not manager.stats_for("key0")
+        assert manager.peek("key1", "svg").result() == "<svg1>"
+        assert manager.peek("key1", "tex") is None
+    finally:
+        manager.shutdown()
@@ -0,0 +1,57 @@
+# test_cli.py
+import json
+
+from openpyxl import Workbook, load_workbook
+
+from cli import convert_file, main
+
+
+def write_sheet(path, header, rows):
+    wb = Workbook()
+    wb.active.append(header)
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path)
+    return path
+
+
+def write_json(path):
+    path.write_text(json.dumps({
+        "states": ["q0", "q1", "q2"], "start": "q0", "finals": ["q2"],
+        "transitions": {"q0": {"a": ["q0", "q1"], "ε": ["q1"]}, "q1": {"b": ["q2"]}},
+    }), encoding="utf-8")
+    return path
+
+
+def test_epsilon_column_is_not_duplicated(tmp_path):
+    path = write_sheet(tmp_path / "eps.xlsx", ["State", "a", "b", "ε"],
+                       [["→q0", "q0,q1", None, "q1"], ["q1", None, "q2", None], ["*q2", None, None, None]])
+    result = convert_file(str(path), str(tmp_path / "out"), svg=False)
+    assert result["ok"], result
+    tex = (tmp_path / "out" / "tables.tex").read_text(encoding="utf-8")
+    nfa_table = tex.split("Original DFA")[0]
+    assert nfa_table.count("$\\epsilon$") == 1
+    header = next(load_workbook(tmp_path / "out" / "nfa_table.xlsx").active.iter_rows(values_only=True))
+    assert list(header) == ["State", "a", "b", "ε"]
+
+
+def test_sheet_without_epsilon_gets_one(tmp_path):
+    path = write_sheet(tmp_path / "plain.xlsx", ["State", "a", "b"],
+                       [["→q0", "q0,q1", "q0"], ["*q1", None, None]])
+    result = convert_file(str(path), str(tmp_path / "out"), svg=False)
+    assert result["ok"], result
+    tex = (tmp_path / "out" / "tables.tex").read_text(encoding="utf-8")
+    assert tex.split("Original DFA")[0].count("$\\epsilon$") == 1
+    header = next(load_workbook(tmp_path / "out" / "nfa_table.xlsx").active.iter_rows(values_only=True))
+    assert list(header) == ["State", "a", "b", "ε"]
+    assert result["dfa_states"] == 2
+
+
+def test_main_converts_json_and_reports_failures(tmp_path, capsys):
+    good = write_json(tmp_path / "good.json")
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"states": ["q0"], "start": "q9", "transitions": {}}), encoding="utf-8")
+    status = main([str(good), str(bad), "-o", str(tmp_path / "out"), "-j", "1", "--no-svg"])
+    assert status == 1
+    assert len(list((tmp_path / "out").rglob("tables.tex"))) == 1
+    assert "bad.json" in capsys.readouterr().err
@@ -0,0 +1,42 @@
+# test_compiled.py
+import random
+
+import reference
+from compiled import compile_dfa
+from core import minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import random_nfa
+
+
+def dfas(seed):
+    states, alphabet, trans, start, finals = random_nfa(8, density=0.25, epsilon_density=0.1, seed=seed)
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return dfa, minimize_dfa(*dfa)
+
+
+def test_batch_matches_dict_simulation():
+    rng = random.Random(0)
+    strings = ["", "a", "b"] + ["".join(rng.choice("ab") for _ in range(rng.randint(0, 12))) for _ in range(300)]
+    for seed in range(10):
+        for dfa in dfas(seed):
+            compiled = compile_dfa(*dfa)
+            expected = [reference.dfa_accepts(dfa, w) for w in strings]
+            assert compiled.accepts_batch(strings).tolist() == expected
+            assert compiled.accepts_batch(strings, batch_size=7).tolist() == expected
+            assert [compiled.accepts(w) for w in strings[:20]] == expected[:20]
+
+
+def test_unknown_symbols_and_nul():
+    dfa = (["p", "q"], ["a", "\0"], {("p", "a"): "q", ("q", "\0"): "p"}, "p", {"p"})
+    compiled = compile_dfa(*dfa)
+    assert compiled.accepts_batch(["", "a\0", "a\0a\0", "a", "ax\0", "x"]).tolist() == \
+        [True, True, True, False, False, False]
+
+
+def test_multi_character_symbols():
+    dfa = (["p", "q"], ["if", "then"], {("p", "if"): "q", ("q", "then"): "p"}, "p", {"p"})
+    compiled = compile_dfa(*dfa)
+    batch = [[], ["if", "then"], ["if"], ["then"], ["if", "then", "if", "then"], ["if", "else"]]
+    assert compiled.accepts_batch(batch).tolist() == [True, True, False, False, True, False]
+    assert compiled.run_batch([["if"]]).tolist() == [compiled.states.index("q")]
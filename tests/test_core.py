@@ -0,0 +1,178 @@
+# test_core.py
+import pytest
+
+import reference
+from automaton import Automaton
+from core import (epsilon_closure_of, minimize, minimize_dfa, nfa_to_dfa, remove_epsilon, trim_automaton,
+                  trim_dfa, trim_nfa)
+from generators import epsilon_chain_nfa, nth_from_end_nfa, random_nfa
+
+
+def random_nfas(count=40, n=8):
+    for seed in range(count):
+        yield random_nfa(n, density=0.25, epsilon_density=0.1, seed=seed)
+
+
+def determinized(nfa):
+    states, alphabet, nfa_no_e, start, finals = epsilon_free(nfa)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, finals)
+    return dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals
+
+
+def epsilon_free(nfa):
+    states, alphabet, trans, start, finals = nfa
+    _, nfa_no_e, nfa_finals = reference.remove_epsilon(states, alphabet, trans, start, finals)
+    return states, alphabet, nfa_no_e, start, nfa_finals
+
+
+# ---------- ε-removal ----------
+def test_remove_epsilon_matches_reference():
+    for nfa in random_nfas():
+        closures, nfa_no_e, nfa_finals = remove_epsilon(*nfa)
+        ref_closures, ref_no_e, ref_finals = reference.remove_epsilon(*nfa)
+        assert closures == ref_closures
+        assert nfa_no_e == ref_no_e
+        assert set(nfa_finals) == set(ref_finals)
+
+
+def test_epsilon_cycle_shares_one_closure():
+    trans = {("q0", "ε"): {"q1"}, ("q1", "ε"): {"q2"}, ("q2", "ε"): {"q0", "q3"},
+             ("q3", "a"): {"q4"}, ("q4", "ε"): {"q4"}}
+    states = ["q0", "q1", "q2", "q3", "q4"]
+    stats = {}
+    closures, nfa_no_e, nfa_finals = remove_epsilon(states, ["a"], trans, "q0", ["q3"], stats=stats)
+    for s in states:
+        assert closures[s] == epsilon_closure_of(s, trans)
+    assert closures["q0"] == closures["q1"] == closures["q2"] == {"q0", "q1", "q2", "q3"}
+    assert stats["epsilon_components"] == 3
+    assert nfa_no_e == {(s, "a"): {"q4"} for s in ["q0", "q1", "q2", "q3"]}
+    assert nfa_finals == {"q0", "q1", "q2", "q3"}
+
+
+def test_epsilon_chain_closures():
+    states, alphabet, trans, start, finals = epsilon_chain_nfa(30)
+    closures, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    assert closures["q0"] == set(states)
+    assert closures["q30"] == {"q30"}
+    assert nfa_no_e[("q10", "a")] == set(states[10:])
+    assert nfa_finals == set(states)
+
+
+# ---------- Subset construction ----------
+def test_nfa_to_dfa_matches_reference():
+    for nfa in random_nfas():
+        states, alphabet, nfa_no_e, start, finals = epsilon_free(nfa)
+        dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, finals)
+        ref_states, ref_trans, ref_start, ref_finals = reference.nfa_to_dfa(states, alphabet, nfa_no_e, start, finals)
+        assert len(dfa_states) == len(set(dfa_states))
+        assert set(dfa_states) == set(ref_states)
+        assert dfa_trans == ref_trans
+        assert dfa_start == ref_start
+        assert set(dfa_finals) == set(ref_finals)
+
+
+def test_nfa_to_dfa_dead_state_and_epsilon_column():
+    trans = {("q0", "a"): {"q1"}}
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(["q0", "q1"], ["a", "b", "ε"], trans, "q0", {"q1"})
+    dead = frozenset(["q_D"])
+    assert dfa_start == frozenset(["q0"])
+    assert dead in dfa_states
+    assert dfa_trans[(dfa_start, "b")] == dead
+    assert dfa_trans[(dead, "a")] == dfa_trans[(dead, "b")] == dead
+    assert all(a != "ε" for _, a in dfa_trans)
+    assert dfa_finals == {frozenset(["q1"])}
+
+
+@pytest.mark.parametrize("n", [1, 4, 8])
+def test_nfa_to_dfa_exponential_family(n):
+    states, alphabet, trans, start, finals = nth_from_end_nfa(n)
+    dfa_states, _, _, _ = nfa_to_dfa(states, alphabet, trans, start, finals)
+    assert len(dfa_states) == 2 ** n
+
+
+# ---------- Minimization ----------
+@pytest.mark.parametrize("algorithm", ["hopcroft", "moore"])
+def test_minimize_dfa_matches_reference(algorithm):
+    for nfa in random_nfas():
+        dfa = determinized(nfa)
+        states, alphabet, trans, start, finals = minimize_dfa(*dfa, algorithm=algorithm)
+        ref_states, _, ref_trans, ref_start, ref_finals = reference.minimize_dfa(*dfa)
+        assert set(states) == set(ref_states)
+        assert trans == ref_trans
+        assert (start, set(finals)) == (ref_start, set(ref_finals))
+
+
+def test_hopcroft_and_moore_agree_and_keep_the_language():
+    for nfa in random_nfas(20):
+        dfa = determinized(nfa)
+        hopcroft = minimize_dfa(*dfa, algorithm="hopcroft")
+        moore = minimize_dfa(*dfa, algorithm="moore")
+        assert set(hopcroft[0]) == set(moore[0]) and hopcroft[2] == moore[2]
+        for word in reference.words(["a", "b"], 6):
+            assert reference.dfa_accepts(hopcroft, word) == reference.nfa_accepts(nfa, word)
+
+
+def test_minimize_merges_equivalent_states():
+    trans = {("p", "a"): "q", ("q", "a"): "r", ("r", "a"): "q", ("p", "b"): "p", ("q", "b"): "p", ("r", "b"): "p"}
+    states, alphabet, min_trans, start, finals = minimize_dfa(["p", "q", "r"], ["a", "b", "ε"], trans, "p", {"q", "r"})
+    assert alphabet == ["a", "b"]
+    assert states == {"p", "{q,r}"}
+    assert min_trans == {("p", "a"): "{q,r}", ("p", "b"): "p", ("{q,r}", "a"): "{q,r}", ("{q,r}", "b"): "p"}
+    assert (start, finals) == ("p", {"{q,r}"})
+
+
+def test_minimize_nth_from_end_is_already_minimal():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(6)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    stats = {}
+    assert len(minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, stats=stats)[0]) == 64
+    assert stats["blocks"] == 64
+
+
+def test_minimize_unknown_algorithm():
+    with pytest.raises(ValueError):
+        minimize_dfa(["p"], ["a"], {("p", "a"): "p"}, "p", set(), algorithm="brzozowski")
+
+
+# ---------- Trimming ----------
+def test_trim_nfa_drops_useless_states_only():
+    trans = {("s", "a"): {"t", "dead"}, ("t", "b"): {"f"}, ("dead", "a"): {"dead"},
+             ("island", "a"): {"f"}, ("f", "ε"): {"s"}}
+    states = ["s", "t", "f", "dead", "island"]
+    stats = {}
+    kept, kept_trans, finals = trim_nfa(states, trans, "s", ["f", "island"], stats)
+    assert kept == ["s", "t", "f"]
+    assert kept_trans == {("s", "a"): {"t"}, ("t", "b"): {"f"}, ("f", "ε"): {"s"}}
+    assert finals == {"f"}
+    assert stats == {"trimmed_states": 2, "trimmed_transitions": 3}
+
+
+def test_trimmed_pipeline_keeps_the_language():
+    for nfa in random_nfas(20):
+        states, alphabet, nfa_no_e, start, finals = epsilon_free(nfa)
+        dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, finals, trim=True)
+        trimmed = minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, trim=True)
+        minimized = minimize_dfa(*determinized(nfa))
+        assert len(trimmed[0]) == len(minimized[0])
+        for word in reference.words(["a", "b"], 5):
+            assert reference.dfa_accepts(trimmed, word) == reference.nfa_accepts(nfa, word)
+
+
+def test_trim_dfa_keeps_states_that_cannot_accept():
+    trans = {("p", "a"): "q", ("q", "a"): "q", ("r", "a"): "p"}
+    kept, kept_trans, finals = trim_dfa(["p", "q", "r"], ["a"], trans, "p", {"r"})
+    assert kept == ["p", "q"]
+    assert kept_trans == {("p", "a"): "q", ("q", "a"): "q"}
+    assert finals == set()
+
+
+def test_trim_automaton_matches_tuple_trimming():
+    for nfa in random_nfas(10):
+        states, alphabet, trans, start, finals = nfa
+        kept, kept_trans, kept_finals = trim_nfa(states, trans, start, finals)
+        aut = trim_automaton(Automaton.from_core(*nfa, deterministic=False)).to_core()
+        assert aut[0] == kept and aut[2] == kept_trans and aut[4] == kept_finals
+        dfa = determinized(nfa)
+        trimmed = trim_automaton(Automaton.from_core(*dfa))
+        assert trimmed.to_core()[0] == trim_dfa(*dfa)[0]
+        assert len(minimize(trimmed)) == len(minimize_dfa(*dfa)[0])
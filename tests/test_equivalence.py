@@ -0,0 +1,89 @@
+# test_equivalence.py
+import pytest
+
+import reference
+from core import Budget, minimize_dfa, nfa_to_dfa, remove_epsilon
+from equivalence import are_equivalent, is_included
+from generators import nth_from_end_nfa, random_nfa
+
+
+def small(seed):
+    return random_nfa(5, density=0.3, epsilon_density=0.1, seed=seed)
+
+
+def as_nfa(dfa):
+    """A DFA tuple with set-valued transitions, as the NFA functions take it."""
+    states, alphabet, trans, start, finals = dfa
+    return list(states), alphabet, {key: {dst} for key, dst in trans.items()}, start, finals
+
+
+def minimal_dfa(nfa):
+    states, alphabet, trans, start, finals = nfa
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    return minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+
+
+def differences(nfa_a, nfa_b, max_len=6):
+    return [w for w in reference.words(["a", "b"], max_len)
+            if reference.nfa_accepts(nfa_a, w) != reference.nfa_accepts(nfa_b, w)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_equivalent_to_own_minimal_dfa(seed):
+    nfa = small(seed)
+    assert are_equivalent(nfa, as_nfa(minimal_dfa(nfa))).holds
+    assert is_included(nfa, as_nfa(minimal_dfa(nfa))).holds
+
+
+def test_random_pairs_against_brute_force():
+    for seed in range(30):
+        nfa_a, nfa_b = small(seed), small(seed + 100)
+        diff = differences(nfa_a, nfa_b)
+        result = are_equivalent(nfa_a, nfa_b)
+        if diff:
+            assert not result.holds
+            word = tuple(result.counterexample)
+            assert len(word) == len(diff[0])
+            assert reference.nfa_accepts(nfa_a, word) == (result.accepted_by == "first")
+            assert reference.nfa_accepts(nfa_b, word) == (result.accepted_by == "second")
+        elif not result.holds:
+            assert len(result.counterexample) > 6
+        only_a = [w for w in diff if reference.nfa_accepts(nfa_a, w)]
+        included = is_included(nfa_a, nfa_b)
+        if only_a:
+            assert not included.holds and len(included.counterexample) == len(only_a[0])
+            assert reference.nfa_accepts(nfa_a, included.counterexample)
+            assert not reference.nfa_accepts(nfa_b, included.counterexample)
+
+
+def test_inclusion_is_one_way():
+    # a*b ⊆ (a|b)*b, but not the other way round
+    a_star_b = (["p", "q"], ["a", "b"], {("p", "a"): {"p"}, ("p", "b"): {"q"}}, "p", ["q"])
+    ends_in_b = (["r", "s"], ["a", "b"], {("r", "a"): {"r"}, ("r", "b"): {"r", "s"}}, "r", ["s"])
+    assert is_included(a_star_b, ends_in_b).holds
+    result = is_included(ends_in_b, a_star_b)
+    assert not result.holds and result.counterexample == ["b", "b"]
+    assert are_equivalent(a_star_b, ends_in_b).accepted_by == "second"
+
+
+def test_exponential_pair_is_decided():
+    stats = {}
+    result = are_equivalent(nth_from_end_nfa(10), as_nfa(minimal_dfa(nth_from_end_nfa(10))), stats=stats)
+    assert result.holds and stats["pairs"] >= 2 ** 10
+    assert not are_equivalent(nth_from_end_nfa(10), nth_from_end_nfa(9)).holds
+
+
+def test_budget_leaves_the_answer_undecided():
+    nfa, dfa = nth_from_end_nfa(10), as_nfa(minimal_dfa(nth_from_end_nfa(10)))
+    for check in (are_equivalent, is_included):
+        stats = {}
+        result = check(nfa, dfa, stats=stats, budget=Budget(max_states=50))
+        assert result.holds is None and result.counterexample is None
+        assert result.truncated == stats["truncated"] == "max_states" and result.explored > 50
+        assert check(nfa, dfa, budget=Budget(seconds=0)).truncated == "deadline"
+        roomy = check(nfa, dfa, budget=Budget(max_states=10**6, max_bytes=2**30, seconds=60))
+        assert roomy.holds and roomy.truncated is None
+    # A difference found before the limit is still reported
+    result = are_equivalent(nth_from_end_nfa(3), nth_from_end_nfa(2), budget=Budget(max_states=50))
+    assert result.holds is False and result.truncated is None
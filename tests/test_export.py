@@ -0,0 +1,80 @@
+# test_export.py
+import io
+
+from openpyxl import load_workbook
+
+from automaton import Automaton
+from core import minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import nth_from_end_nfa, random_nfa
+from latex import (automaton_to_latex, df_to_latex_matrix_phi, dfa_to_latex, iter_automaton_latex, iter_dfa_latex,
+                   iter_nfa_latex, write_latex)
+from utils import automaton_rows, dfa_table_rows, min_dfa_table_rows, nfa_columns, nfa_table_rows, rows_to_excel
+
+
+def pipeline(nfa):
+    states, alphabet, trans, start, finals = nfa
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return dfa, minimize_dfa(*dfa)
+
+
+def test_streamed_latex_equals_joined_string():
+    dfa, minimized = pipeline(random_nfa(8, density=0.25, epsilon_density=0.1, seed=2))
+    for longtable in (False, True):
+        assert "".join(iter_dfa_latex(*dfa, longtable=longtable)) == dfa_to_latex(*dfa, longtable=longtable)
+        out = io.StringIO()
+        write_latex(iter_dfa_latex(*minimized, longtable=longtable), out)
+        assert out.getvalue() == dfa_to_latex(*minimized, longtable=longtable)
+
+
+def test_table_layouts(tmp_path):
+    nfa = (["q0", "q1"], ["a", "ε"], {("q0", "a"): {"q0", "q1"}, ("q1", "ε"): {"q0"}}, "q0", ["q1"])
+    table = df_to_latex_matrix_phi(*nfa, caption="NFA")
+    assert table.startswith("\\begin{table}[H]") and table.endswith("\\end{table}")
+    assert "State & a & $\\epsilon$ \\\\ \\hline" in table
+    assert "→q0 & q0,q1 & $\\phi$ \\\\ \\hline" in table
+    assert "q1* & $\\phi$ & q0 \\\\ \\hline" in table
+    path = tmp_path / "nfa.tex"
+    write_latex(iter_nfa_latex(*nfa, caption="NFA", longtable=True), path)
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("\\begin{longtable}{|c|c|c|}") and text.endswith("\\end{longtable}")
+    assert text.count("State & a & $\\epsilon$") == 2  # first page head and running head
+
+
+def test_nfa_columns_list_epsilon_once():
+    alphabet = ["a", "b"]
+    assert nfa_columns(alphabet) == ["a", "b", "ε"] and alphabet == ["a", "b"]
+    assert nfa_columns(["a", "ε", "b"]) == ["a", "ε", "b"]
+    assert next(nfa_table_rows(["q0"], ["a", "ε"], {}, "q0", [])) == ["State", "a", "ε"]
+
+
+def test_automaton_exports_match_tuple_exports():
+    nfa = random_nfa(8, density=0.25, epsilon_density=0.1, seed=5)
+    dfa, minimized = pipeline(nfa)
+    pairs = [(nfa, nfa_table_rows, Automaton.from_core(*nfa, deterministic=False)),
+             (dfa, dfa_table_rows, Automaton.from_core(*dfa)),
+             (minimized, min_dfa_table_rows, Automaton.from_core(*minimized))]
+    for automaton, rows, aut in pairs:
+        assert list(automaton_rows(aut)) == list(rows(*automaton))
+    assert automaton_to_latex(Automaton.from_core(*dfa)) == "".join(iter_automaton_latex(Automaton.from_core(*dfa)))
+
+
+def test_rows_to_excel_streams_every_row(tmp_path):
+    states, alphabet, trans, start, finals = nth_from_end_nfa(8)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    rows = list(dfa_table_rows(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals))
+    path = tmp_path / "dfa.xlsx"
+    assert rows_to_excel(iter(rows), str(path)) is None
+    read = [list(r) for r in load_workbook(path).active.iter_rows(values_only=True)]
+    assert read == rows and len(read) == 2 ** 8 + 1
+    data = rows_to_excel(iter(rows))
+    assert [list(r) for r in load_workbook(io.BytesIO(data)).active.iter_rows(values_only=True)] == rows
+
+
+def test_latex_is_produced_lazily():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(12)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    chunks = iter_dfa_latex(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    assert next(chunks) == "\\begin{table}[H]\n"
+    assert sum(1 for chunk in chunks if chunk.endswith("\\\\ \\hline\n")) == 2 ** 12 + 1
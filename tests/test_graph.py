@@ -0,0 +1,55 @@
+# test_graph.py
+import re
+
+from automaton import Automaton
+from core import nfa_to_dfa
+from generators import nth_from_end_nfa
+from graph import draw_automaton, draw_dfa_graph, draw_nfa_graph, select_states
+
+CHAIN = {"s0": {"s1"}, "s1": {"s2"}, "s2": {"s3"}, "s3": {"s4"}}
+
+
+def edges(dot):
+    """(src, dst, label) of every edge in the DOT source, the start arrow left out."""
+    name = r'("[^"]*"|[^\s"]+)'
+    found = re.findall(rf'^\s*{name} -> {name} \[.*?label={name}', dot.source, re.M)
+    return sorted(tuple(part.strip('"') for part in edge) for edge in found)
+
+
+def test_select_states_bfs_prefix():
+    labels = ["s0", "s1", "s2", "s3", "s4"]
+    assert select_states(labels, CHAIN, "s0") == (labels, 0)
+    assert select_states(labels, CHAIN, "s0", max_states=3) == (["s0", "s1", "s2"], 2)
+
+
+def test_select_states_neighbourhood():
+    labels = ["s0", "s1", "s2", "s3", "s4"]
+    assert select_states(labels, CHAIN, "s0", focus="s2") == (["s2", "s3", "s1"], 2)
+    assert select_states(labels, CHAIN, "s0", focus="s2", radius=2) == (["s2", "s3", "s1", "s4", "s0"], 0)
+
+
+def test_merged_edges_and_large_layout():
+    nfa = (["p", "q"], ["a", "b"], {("p", "a"): {"q"}, ("p", "b"): {"q"}, ("q", "a"): {"p"}}, "p", ["q"])
+    assert edges(draw_nfa_graph(*nfa)) == [("p", "q", "a"), ("p", "q", "b"), ("q", "p", "a")]
+    assert edges(draw_nfa_graph(*nfa, merge_edges=True)) == [("p", "q", "a,b"), ("q", "p", "a")]
+    assert "rankdir=LR" in draw_nfa_graph(*nfa, layout_threshold=2).source
+    large = draw_nfa_graph(*nfa, layout_threshold=1)
+    assert large.engine == "sfdp"
+
+
+def test_size_cap_adds_summary_node():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(6)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    dot = draw_dfa_graph(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals, max_states=10)
+    assert "… 54 more states" in dot.source
+    assert dot.source.count("shape=doublecircle") + dot.source.count("shape=circle") == 10
+
+
+def test_draw_automaton_matches_tuple_drawing():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(3)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, trans, start, finals)
+    dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    expected = draw_dfa_graph(*dfa, merge_edges=True)
+    drawn = draw_automaton(Automaton.from_core(*dfa), merge_edges=True)
+    assert len(edges(drawn)) == len(edges(expected)) == 2 ** 3 * 2
+    assert drawn.source.count("doublecircle") == expected.source.count("doublecircle")
@@ -0,0 +1,23 @@
+# test_imports.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+import bench
+
+
+@pytest.mark.parametrize("module", bench.LIGHT_MODULES)
+def test_light_modules_do_not_load_heavy_packages(module):
+    result = bench.import_time(module, repeat=1)
+    assert result["heavy"] == []
+
+
+def test_exporters_load_their_packages_on_use():
+    code = ("import sys, utils, graph; utils.rows_to_excel([['State'], ['q0']]); "
+            "graph.draw_nfa_graph(['q0'], ['a'], {}, 'q0', []); "
+            "print(*sorted(p for p in ('xlsxwriter', 'graphviz', 'pandas') if p in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(bench.__file__)),
+                         capture_output=True, text=True, check=True).stdout.split()
+    assert out == ["graphviz", "xlsxwriter"]
@@ -0,0 +1,84 @@
+# test_incremental.py
+import random
+
+import pytest
+
+from core import IncrementalDFA, minimize_dfa, nfa_to_dfa, remove_epsilon, transition_diff
+from generators import random_nfa
+
+
+def full(states, alphabet, trans, start, finals):
+    closures, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = dfa
+    minimized = minimize_dfa(dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return (closures, nfa_no_e, nfa_finals), dfa, minimized
+
+
+def assert_matches_full(inc, trans, finals):
+    (closures, nfa_no_e, nfa_finals), dfa, minimized = full(inc.states, inc.alphabet, trans, inc.start_state, finals)
+    assert inc.epsilon_free() == (closures, nfa_no_e, set(nfa_finals))
+    dfa_states, dfa_trans, dfa_start, dfa_finals = inc.dfa()
+    assert set(dfa_states) == set(dfa[0]) and len(dfa_states) == len(dfa[0])
+    assert (dfa_trans, dfa_start, dfa_finals) == (dfa[1], dfa[2], set(dfa[3]))
+    min_states, alphabet, min_trans, min_start, min_finals = inc.minimize()
+    assert (min_states, min_trans, min_start, min_finals) == \
+        (set(minimized[0]), minimized[2], minimized[3], set(minimized[4]))
+
+
+def random_edit(rng, states, alphabet, trans):
+    """A copy of `trans` with one target added or removed."""
+    trans = {key: set(dsts) for key, dsts in trans.items()}
+    key = (rng.choice(states), rng.choice(alphabet + ["ε"]))
+    dst = rng.choice(states)
+    dsts = trans.setdefault(key, set())
+    if dst in dsts:
+        dsts.discard(dst)
+    else:
+        dsts.add(dst)
+    return {k: v for k, v in trans.items() if v}
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_edits_match_full_recompute(seed):
+    rng = random.Random(seed)
+    states, alphabet, trans, start, finals = random_nfa(8, density=0.2, epsilon_density=0.08, seed=seed)
+    finals = set(finals)
+    inc = IncrementalDFA(states, alphabet, trans, start, finals)
+    assert_matches_full(inc, trans, finals)
+    for _ in range(15):
+        new_trans = random_edit(rng, states, alphabet, trans)
+        new_finals = set(finals)
+        if rng.random() < 0.2:
+            new_finals ^= {rng.choice(states)}
+        added, removed = transition_diff(trans, new_trans)
+        inc.apply(added, removed, new_finals - finals, finals - new_finals)
+        trans, finals = new_trans, new_finals
+        assert_matches_full(inc, trans, finals)
+
+
+def test_small_edit_touches_few_subsets():
+    states = [f"q{i}" for i in range(12)]
+    trans = {(f"q{i}", "a"): {f"q{i + 1}"} for i in range(11)}
+    trans[("q0", "b")] = {"q0"}
+    inc = IncrementalDFA(states, ["a", "b"], trans, "q0", ["q11"])
+    inc.apply(added={("q10", "b"): {"q0"}})
+    assert not inc.last_update.get("rebuild")
+    assert inc.last_update["subsets"] < len(inc.dfa()[0])
+    trans[("q10", "b")] = {"q0"}
+    assert_matches_full(inc, trans, {"q11"})
+
+
+def test_unknown_state_rebuilds():
+    trans = {("q0", "a"): {"q1"}}
+    inc = IncrementalDFA(["q0", "q1"], ["a"], trans, "q0", ["q1"])
+    inc.apply(added={("q1", "a"): {"q2"}})
+    assert inc.last_update["rebuild"]
+
+
+def test_transition_diff():
+    old = {("q0", "a"): {"q0", "q1"}, ("q1", "b"): {"q1"}}
+    new = {("q0", "a"): {"q1", "q2"}, ("q2", "ε"): {"q0"}}
+    added, removed = transition_diff(old, new)
+    assert added == {("q0", "a"): {"q2"}, ("q2", "ε"): {"q0"}}
+    assert removed == {("q0", "a"): {"q0"}, ("q1", "b"): {"q1"}}
@@ -0,0 +1,56 @@
+# test_instrument.py
+import gc
+import io
+import json
+
+import pytest
+
+import instrument
+from core import minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import nth_from_end_nfa
+from instrument import PipelineStats, accepts_stats, output_bytes
+
+
+def test_core_stages_report_their_stats():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(5)
+    perf = PipelineStats(run_id="run", source="test")
+    closures, nfa_no_e, nfa_finals = perf.call("remove_epsilon", remove_epsilon, states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = perf.call("nfa_to_dfa", nfa_to_dfa, states, alphabet, nfa_no_e, start, nfa_finals)
+    perf.call("minimize_dfa", minimize_dfa, dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    perf.record("tables", cached=True)
+    assert [r["stage"] for r in perf.records] == ["remove_epsilon", "nfa_to_dfa", "minimize_dfa", "tables"]
+    assert perf.get("nfa_to_dfa")["dfa_states"] == 32
+    assert perf.get("minimize_dfa")["blocks"] == 32
+    assert perf.get("tables")["cached"] and "seconds" not in perf.get("tables")
+    assert perf.total_seconds == pytest.approx(sum(r.get("seconds", 0.0) for r in perf.records))
+    lines = [json.loads(line) for line in perf.to_json_lines().splitlines()]
+    assert all(line["run_id"] == "run" and line["source"] == "test" for line in lines)
+    assert perf.to_dict()["stages"][1]["dfa_states"] == 32
+
+
+def test_stage_records_errors_and_sizes():
+    perf = PipelineStats()
+    with pytest.raises(KeyError):
+        with perf.stage("load"):
+            raise KeyError("State")
+    assert perf.get("load")["error"] == "KeyError: 'State'"
+    perf.call("latex", lambda: "é")
+    perf.call("svg", lambda: (b"<svg/>", 0.1))
+    assert perf.get("latex")["bytes"] == 2 and perf.get("svg")["bytes"] == 6
+    assert output_bytes({"not": "bytes"}) is None
+    out = io.StringIO()
+    perf.emit(out)
+    assert len(out.getvalue().splitlines()) == 3
+
+
+def test_accepts_stats_does_not_keep_closures_alive():
+    def make():
+        big = list(range(1000))
+        return lambda stats=None: big
+    before = len(instrument._accepts_stats)
+    for _ in range(50):
+        assert accepts_stats(make())
+    gc.collect()
+    assert len(instrument._accepts_stats) <= before + 1
+    assert not accepts_stats(len)
+    assert accepts_stats(nfa_to_dfa)
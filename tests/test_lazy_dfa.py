@@ -0,0 +1,57 @@
+# test_lazy_dfa.py
+import io
+
+import pytest
+
+import reference
+from generators import nth_from_end_nfa, random_nfa
+from lazy_dfa import LazyDFA
+
+
+def test_accepts_matches_nfa_simulation():
+    for seed in range(20):
+        nfa = random_nfa(8, density=0.25, epsilon_density=0.1, seed=seed)
+        lazy = LazyDFA(*nfa)
+        for word in reference.words(["a", "b"], 6):
+            assert lazy.accepts(word) == reference.nfa_accepts(nfa, word), (seed, word)
+
+
+def test_offsets_are_accepted_prefixes():
+    nfa = random_nfa(10, density=0.2, epsilon_density=0.05, seed=3)
+    lazy = LazyDFA(*nfa)
+    text = "abbabaabbbaabab" * 3
+    expected = [n for n in range(len(text) + 1) if reference.nfa_accepts(nfa, text[:n])]
+    result = lazy.run(text, chunk_size=4)
+    assert result.offsets == expected
+    assert result.length == len(text)
+    assert result.accepted == (len(text) in expected)
+    assert list(lazy.iter_matches(io.StringIO(text), chunk_size=5)) == expected
+
+
+def test_feed_is_incremental():
+    lazy = LazyDFA(*nth_from_end_nfa(3))
+    whole = lazy.run("abaabba").offsets
+    lazy.reset()
+    pieces = lazy.feed("aba") + lazy.feed("") + lazy.feed("abba")
+    assert pieces == whole
+    assert lazy.offset == 7
+
+
+def test_multi_character_symbols_and_dead_input():
+    trans = {("s", "if"): {"t"}, ("t", "then"): {"s", "f"}}
+    lazy = LazyDFA(["s", "t", "f"], ["if", "then"], trans, "s", ["f"])
+    assert lazy.accepts(["if", "then"])
+    assert not lazy.accepts(["if"])
+    result = lazy.run(["then", "if", "then"])
+    assert result == (False, [], 3)
+
+
+def test_cache_is_bounded():
+    lazy = LazyDFA(*nth_from_end_nfa(8), cache_size=16)
+    lazy.run("ab" * 200 + "aabbabab" * 50)
+    stats = lazy.stats()
+    assert stats["cached_states"] <= 16
+    assert stats["evictions"] > 0
+    assert stats["hits"] + stats["misses"] == 800
+    with pytest.raises(ValueError):
+        LazyDFA(*nth_from_end_nfa(2), cache_size=0)
@@ -0,0 +1,107 @@
+# test_loader.py
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from loader import NFAFormatError, load_nfa, load_nfa_excel, load_nfa_json
+
+HEADER = ["State", "a", "b", "ε"]
+ROWS = [
+    ["→q0", "q0,q1", "q0", None],
+    ["q1", None, "q0", "φ"],
+    ["*q2", "q2", "q2", None],
+    # q1 again: its a-cell now has a value, its b-cell replaces the earlier one
+    ["q1", "q0", "q1, q2", None],
+    ["q0", None, None, "q2"],
+]
+
+
+def workbook(rows, header=HEADER):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    data = io.BytesIO()
+    wb.save(data)
+    data.seek(0)
+    return data
+
+
+def row_by_row(header, rows):
+    """The original dashboard loop: the last non-empty cell per (state, symbol) wins."""
+    transitions = {}
+    for row in rows:
+        state = str(row[0]).replace("→", "").replace("*", "")
+        for a, value in zip(header[1:], row[1:]):
+            cell = str(value).strip()
+            if cell and cell != "φ" and cell.lower() not in ("nan", "none"):
+                transitions[(state, a)] = {s.strip() for s in cell.split(",") if s.strip()}
+    return transitions
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_duplicate_rows_last_row_wins(streaming):
+    states, alphabet, transitions, start, finals = load_nfa_excel(workbook(ROWS), streaming=streaming)
+    assert transitions == row_by_row(HEADER, ROWS)
+    assert transitions[("q1", "a")] == {"q0"}
+    assert transitions[("q1", "b")] == {"q1", "q2"}
+    assert transitions[("q0", "a")] == {"q0", "q1"}
+    assert alphabet == ["a", "b", "ε"]
+    assert start == "q0" and finals == ["q2"]
+
+
+def test_streaming_and_dataframe_paths_agree():
+    import random
+    rng = random.Random(7)
+    names = [f"q{i}" for i in range(12)]
+    rows = []
+    for _ in range(40):
+        state = rng.choice(names)
+        row = [("*" if rng.random() < 0.2 else "") + state]
+        for _ in HEADER[1:]:
+            r = rng.random()
+            row.append(None if r < 0.4 else "φ" if r < 0.5 else ",".join(rng.sample(names, rng.randint(1, 3))))
+        rows.append(row)
+    rows[3][0] = "→" + rows[3][0].lstrip("*")
+    loaded = [load_nfa_excel(workbook(rows), streaming=streaming) for streaming in (False, True)]
+    assert loaded[0] == loaded[1]
+    assert loaded[0][2] == row_by_row(HEADER, rows)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_validate_reports_unknown_targets(streaming):
+    rows = [["→q0", "q9", None, None]]
+    assert load_nfa_excel(workbook(rows), streaming=streaming)[2] == {("q0", "a"): {"q9"}}
+    with pytest.raises(NFAFormatError):
+        load_nfa_excel(workbook(rows), validate=True, streaming=streaming)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_missing_state_column(streaming):
+    with pytest.raises(NFAFormatError):
+        load_nfa_excel(workbook([["q0", "q0"]], header=["Name", "a"]), streaming=streaming)
+
+
+def test_json_round_trip(tmp_path):
+    path = tmp_path / "nfa.json"
+    path.write_text(json.dumps({
+        "states": ["q0", "q1"], "start": "q0", "finals": ["q1"],
+        "transitions": {"q0": {"a": ["q0", "q1"], "ε": "q1"}, "q1": {"b": []}},
+    }), encoding="utf-8")
+    states, alphabet, transitions, start, finals = load_nfa(path, validate=True)
+    assert states == ["q0", "q1"] and alphabet == ["a"]
+    assert transitions == {("q0", "a"): {"q0", "q1"}, ("q0", "ε"): {"q1"}}
+    assert (start, finals) == ("q0", ["q1"])
+    with open(path, encoding="utf-8") as f:
+        assert load_nfa_json(f) == (states, alphabet, transitions, start, finals)
+
+
+@pytest.mark.parametrize("payload", [b"{not json", b"\xff\xfe\x00", b"[1, 2]", b'{"start": "q0"}', b'{"states": 3}',
+                                     b'{"states": ["q0"], "transitions": ["q0"]}',
+                                     b'{"states": ["q0"], "transitions": {"q0": {"a": 1}}}'])
+def test_malformed_json_is_a_format_error(payload):
+    with pytest.raises(NFAFormatError):
+        load_nfa_json(io.BytesIO(payload))
@@ -0,0 +1,27 @@
+# test_parallel.py
+from core import intern_states, nfa_to_dfa, remove_epsilon, subset_construction, successor_masks
+from generators import nth_from_end_nfa, random_nfa
+from parallel import explore_parallel, number_subsets, parallel_nfa_to_dfa
+
+
+def test_same_dfa_as_serial_engine():
+    for nfa in [nth_from_end_nfa(7)] + [random_nfa(10, density=0.2, epsilon_density=0.05, seed=s) for s in range(5)]:
+        states, alphabet, trans, start, finals = nfa
+        _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+        serial = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+        parallel = parallel_nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals, workers=2)
+        # Same states in the same order, not just the same automaton
+        assert parallel[0] == serial[0]
+        assert parallel[1:] == serial[1:]
+        assert nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals, workers=2)[0] == serial[0]
+
+
+def test_sharded_frontiers_replay_serial_numbering():
+    states, alphabet, trans, start, finals = nth_from_end_nfa(9)
+    index = intern_states(states, trans)
+    succ = successor_masks(index, alphabet, trans)
+    start_mask = 1 << index[start]
+    # min_shard=1 sends every frontier through the pool
+    successors = explore_parallel(succ, alphabet, start_mask, workers=2, min_shard=1)
+    assert len(successors) == 2 ** 9
+    assert number_subsets(successors, start_mask) == subset_construction(succ, alphabet, start_mask)
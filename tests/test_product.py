@@ -0,0 +1,71 @@
+# test_product.py
+import pytest
+
+import reference
+from core import minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import random_nfa
+from product import OPERATIONS, complement, difference, intersection, is_empty, product, union
+
+WORDS = list(reference.words(["a", "b"], 6))
+
+
+def dfa(seed, minimize=True):
+    states, alphabet, trans, start, finals = random_nfa(6, density=0.3, epsilon_density=0.1, seed=seed)
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    result = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return minimize_dfa(*result) if minimize else result
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+def test_operations_match_brute_force(operation):
+    accept = OPERATIONS[operation]
+    for seed in range(10):
+        a, b = dfa(seed), dfa(seed + 50, minimize=seed % 2 == 0)
+        result = product(a, b, operation)
+        minimized = product(a, b, operation, minimize=True)
+        for w in WORDS:
+            expected = accept(reference.dfa_accepts(a, w), reference.dfa_accepts(b, w))
+            assert reference.dfa_accepts(result, w) == expected, (operation, seed, w)
+            assert reference.dfa_accepts(minimized, w) == expected
+        assert len(minimized[0]) <= len(result[0])
+
+
+def test_named_wrappers_and_callable_operation():
+    a, b = dfa(1), dfa(2)
+    assert union(a, b) == product(a, b, "union")
+    assert intersection(a, b) == product(a, b, lambda x, y: x and y)
+    assert difference(a, b, minimize=True) == product(a, b, "difference", minimize=True)
+    with pytest.raises(ValueError):
+        product(a, b, "concatenation")
+
+
+def test_complement_and_partial_operands():
+    # Accepts exactly "a"; the missing moves make it partial
+    only_a = (["p", "q"], ["a", "b"], {("p", "a"): "q"}, "p", {"q"})
+    comp = complement(only_a)
+    for w in WORDS:
+        assert reference.dfa_accepts(comp, w) == (w != ("a",))
+    assert all((s, a) in comp[2] for s in comp[0] for a in ["a", "b"])
+    wider = complement(only_a, alphabet=["a", "b", "c"])
+    assert reference.dfa_accepts(wider, ("c",))
+
+
+def test_is_empty_finds_a_shortest_witness():
+    for seed in range(10):
+        a, b = dfa(seed), dfa(seed + 50)
+        for operation in ("intersection", "difference", "symmetric_difference"):
+            accept = OPERATIONS[operation]
+            words = [w for w in WORDS if accept(reference.dfa_accepts(a, w), reference.dfa_accepts(b, w))]
+            stats = {}
+            result = is_empty(a, b, operation, stats=stats)
+            assert stats["pairs"] == result.explored
+            if words:
+                assert not result.empty
+                assert len(result.witness) == len(words[0])
+                assert accept(reference.dfa_accepts(a, result.witness), reference.dfa_accepts(b, result.witness))
+            elif not result.empty:
+                assert len(result.witness) > 6
+    a = dfa(3)
+    assert is_empty(a, a, "symmetric_difference").empty
+    assert is_empty(a, complement(a)).empty
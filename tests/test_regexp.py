@@ -0,0 +1,126 @@
+# test_regexp.py
+import random
+import re
+
+import pytest
+
+from regexp import OTHER, Regex, thompson_nfa
+
+WORDS = ["", "a", "b", "aa", "ab", "ba", "abb", "aab", "abab", "aaaa", "x", "a1", "1", "12", "a_b",
+         "a b", "a\nb", "{", "a{", "a{,2}", "a{}", "a{x}", "a{1", "-", "]", "a-z"]
+
+
+def parity(pattern, words=WORDS, flags=0):
+    """Assert Regex agrees with re on fullmatch and search, or that both reject the pattern."""
+    try:
+        expected = re.compile(pattern, flags)
+    except re.error:
+        with pytest.raises(ValueError):
+            Regex(pattern)
+        return
+    compiled = Regex(pattern)
+    for w in words:
+        assert compiled.fullmatch(w) == bool(expected.fullmatch(w)), (pattern, w)
+        assert compiled.search(w) == bool(expected.search(w)), (pattern, w)
+    assert list(compiled.fullmatch_many(words)) == [bool(expected.fullmatch(w)) for w in words]
+    assert list(compiled.search_many(words)) == [bool(expected.search(w)) for w in words]
+
+
+@pytest.mark.parametrize("pattern", [
+    "a", "ab", "a|b", "(a|b)*abb", "a*", "a+", "a?", "", "()", "(a|)b",
+    ".", ".*b", "[ab]", "[^a]", "[a-c]+", "[-a]", "[]a]", "[a\\]]", "\\d+", "\\w\\s\\w", "\\D", "\\W", "\\S",
+    "a\\.b", "\\{", "a{2}", "a{2,}", "a{1,3}", "a{,2}", "a{,}", "a{0}", "(ab){2}b", "[ab]{2,3}",
+    "a{}", "a{x}", "a{1", "a{ 2}", "a{2}{",
+])
+def test_supported_syntax_matches_re(pattern):
+    parity(pattern)
+
+
+@pytest.mark.parametrize("pattern", ["a*?", "a+?", "a??", "a{2}?", "a{1,3}?", "a{,2}?", "(a|ab)*?b", "(a+?)b"])
+def test_lazy_quantifiers_match_like_re(pattern):
+    parity(pattern)
+
+
+@pytest.mark.parametrize("pattern", ["a**", "a*+?", "a+??", "a?*", "a{1,2}{2}", "a*{2}", "a{2}*", "*a", "{2}", "a|{,3}",
+                                     "a{2,1}", "(a", "a)", "[a", "\\"])
+def test_invalid_patterns_are_rejected_like_re(pattern):
+    parity(pattern)
+
+
+ESCAPE_WORDS = ["", "a", "A", "ABC", "n", "\n", "\t", "a\tb", "\r\n", "\f", "\v", "\x07", "\x00", "\x00a", "\x08",
+                 "b", "é", "e", "\U0001F600", "S", "\\", "x41", "-", " "]
+
+
+@pytest.mark.parametrize("pattern", [
+    "\\n", "a\\tb", "\\r\\n", "[\\t ]+", "\\f|\\v", "\\a", "\\0", "\\0a", "\\00", "\\101BC", "[\\101-\\103]+", "[\\1]",
+    "\\x41", "\\x41+", "[\\x41-\\x43]+", "\\u00e9", "[\\u00e9e]", "\\U0001F600", "\\N{LATIN SMALL LETTER E WITH ACUTE}",
+    "[\\b]", "[\\ba]+", "\\\\", "\\-", "[\\--\\-]",
+])
+def test_escapes_match_re(pattern):
+    parity(pattern, ESCAPE_WORDS)
+
+
+@pytest.mark.parametrize("pattern", ["\\x4", "\\x4g", "\\u12", "\\U0011FFFF", "\\q", "\\1", "\\12", "\\8", "[\\8]", "\\400",
+                                     "[\\A]", "[\\d-z]", "[a-\\w]", "\\N", "\\N{no such name}"])
+def test_bad_escapes_are_rejected_like_re(pattern):
+    parity(pattern, ESCAPE_WORDS)
+
+
+def test_class_escapes_are_ascii_only():
+    cases = [("\\w", "é"), ("\\d", "\u0663"), ("\\s", "\xa0"), ("\\W", "é"), ("[\\w]", "é")]
+    for pattern, word in cases:
+        assert Regex(pattern).fullmatch(word) == bool(re.fullmatch(pattern, word, re.ASCII))
+        assert Regex(pattern).fullmatch(word) != bool(re.fullmatch(pattern, word))
+    parity("\\w+\\s\\d", ["é1", "a \u0663", "ab\xa01", "ab 1", "\u00e9 1"], flags=re.ASCII)
+
+
+@pytest.mark.parametrize("pattern", ["a*+", "a++", "a?+", "a{2}+", "^a", "a$", "\\Aa", "a\\Z", "\\ba", "a\\B"])
+def test_unsupported_syntax_raises(pattern):
+    with pytest.raises(ValueError):
+        Regex(pattern)
+
+
+def random_pattern(rng, depth):
+    atoms = ["a", "b", "c", ".", "[ab]", "[^a]", "\\d", "[a-c]", "x"]
+    if depth == 0 or rng.random() < 0.3:
+        expr = rng.choice(atoms)
+    elif rng.random() < 0.4:
+        expr = f"({random_pattern(rng, depth - 1)}|{random_pattern(rng, depth - 1)})"
+    else:
+        expr = random_pattern(rng, depth - 1) + random_pattern(rng, depth - 1)
+    quantifier = rng.choice(["", "", "", "*", "+", "?", "{2}", "{1,3}", "{,2}", "{2,}", "*?", "+?"])
+    return f"({expr}){quantifier}" if quantifier else expr
+
+
+def test_random_patterns_match_like_re():
+    rng = random.Random(7)
+    chars = "abcx1-Z_ \n"
+    for _ in range(200):
+        pattern = random_pattern(rng, 2)
+        words = ["".join(rng.choice(chars) for _ in range(rng.randint(0, 7))) for _ in range(30)]
+        parity(pattern, words)
+
+
+def test_long_text_search_uses_blocks():
+    compiled = Regex("ab{3}c")
+    assert compiled.search("a" * 9000 + "abbbc")
+    assert compiled.search("abbbc" + "z" * 9000)
+    assert not compiled.search("a" * 9000)
+
+
+def test_block_search_agrees_with_the_python_loop():
+    rng = random.Random(3)
+    compiled = Regex("(a|bc)+[^a]x")
+    for _ in range(20):
+        text = "".join(rng.choice("abcx") for _ in range(rng.randint(0, 200)))
+        compiled.BLOCK = 8
+        blocked = compiled.search(text)
+        compiled.BLOCK = 10**9
+        assert blocked == compiled.search(text) == bool(re.search("(a|bc)+[^a]x", text))
+
+
+def test_thompson_nfa_shares_one_symbol_for_unmentioned_characters():
+    states, alphabet, transitions, start, finals = thompson_nfa("a.")
+    assert OTHER in alphabet
+    assert "ε" not in alphabet
+    assert len(finals) == 1 and start in states
@@ -0,0 +1,64 @@
+# test_serialize.py
+import pytest
+
+from core import minimize_dfa, nfa_to_dfa, remove_epsilon
+from generators import random_nfa
+from serialize import dumps, load_automaton, loads, save_automaton
+
+
+def pipeline(seed):
+    nfa = random_nfa(8, density=0.25, epsilon_density=0.1, seed=seed)
+    states, alphabet, trans, start, finals = nfa
+    _, nfa_no_e, nfa_finals = remove_epsilon(states, alphabet, trans, start, finals)
+    dfa_states, dfa_trans, dfa_start, dfa_finals = nfa_to_dfa(states, alphabet, nfa_no_e, start, nfa_finals)
+    dfa = (dfa_states, alphabet, dfa_trans, dfa_start, dfa_finals)
+    return nfa, dfa, minimize_dfa(*dfa)
+
+
+def same(loaded, original):
+    states, alphabet, trans, start, finals = original
+    assert loaded[0] == list(states)
+    assert loaded[1] == list(alphabet)
+    assert loaded[2] == {key: (set(dst) if isinstance(dst, set) else dst) for key, dst in trans.items() if dst}
+    assert loaded[3] == start
+    assert loaded[4] == set(finals)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_in_memory(seed):
+    for automaton in pipeline(seed):
+        same(loads(dumps(*automaton)).to_core(), automaton)
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_round_trip_through_file(tmp_path, use_mmap):
+    _, dfa, _ = pipeline(1)
+    path = tmp_path / "dfa.nfadfa"
+    assert save_automaton(path, *dfa) == path.stat().st_size
+    packed = load_automaton(path, use_mmap=use_mmap)
+    try:
+        assert packed.deterministic
+        assert packed.num_states == len(dfa[0])
+        same(packed.to_core(), dfa)
+        start = packed.start
+        assert packed.state(start) == dfa[3]
+        for a in dfa[1]:
+            (target,) = packed.successors(start, a)
+            assert packed.state(target) == dfa[2][(dfa[3], a)]
+        assert packed.successors(start, "z") == ()
+    finally:
+        packed.release()
+
+
+def test_nfa_keeps_epsilon_and_unicode_names():
+    nfa = (["début", "fin"], ["é"], {("début", "é"): {"début", "fin"}, ("fin", "ε"): {"début"}}, "début", ["fin"])
+    packed = loads(dumps(*nfa))
+    assert not packed.deterministic
+    states, alphabet, trans, start, finals = packed.to_core()
+    assert trans == {("début", "é"): {"début", "fin"}, ("fin", "ε"): {"début"}}
+    assert (start, finals) == ("début", {"fin"})
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        loads(b"PK\x03\x04" + bytes(64))
@@ -1,15 +1,141 @@
 # utils.py
 """
 Utility functions for NFA/DFA project.
+pandas and xlsxwriter are only imported when a table or workbook is built.
 """
-import pandas as pd
 from io import BytesIO
 
 def parse_list(raw: str):
     return [x.strip() for x in raw.split(",") if x.strip()]
 
 def df_to_excel_bytes(df):
+    import pandas as pd
     output = BytesIO()
     with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
         df.to_excel(writer, index=False)
     return output.getvalue()
+
+def rows_to_excel(rows, target=None):
+    """
+    Write table rows (header first) to an .xlsx without building a DataFrame.
+    In constant_memory mode xlsxwriter flushes every row as it is written.
+    `target` is a path or binary buffer; without one the bytes are returned.
+    """
+    import xlsxwriter
+    output = BytesIO() if target is None else target
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    worksheet = workbook.add_worksheet()
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for r, row in enumerate(rows):
+        worksheet.write_row(r, 0, row, header_format if r == 0 else None)
+    workbook.close()
+    return output.getvalue() if target is None else None
+
+def rows_to_frame(rows):
+    """DataFrame from table rows (header first)."""
+    import pandas as pd
+    rows = iter(rows)
+    columns = next(rows)
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+# ---------- Transition tables ----------
+# The *_rows generators yield the header and then one list per state; the
+# *_table functions are the same rows as a DataFrame.
+def nfa_columns(alphabet):
+    """The symbols of an NFA table: the alphabet and then ε, which a sheet may already list."""
+    return list(alphabet) if "ε" in alphabet else list(alphabet) + ["ε"]
+
+def nfa_table_rows(states, alphabet, transitions, start_state, final_states):
+    columns = nfa_columns(alphabet)
+    yield ["State"] + columns
+    for s in states:
+        row_label = s
+        if s == start_state:
+            row_label = "→" + row_label
+        if s in final_states:
+            row_label += "*"
+        row = [row_label]
+        for a in columns:
+            nxt = transitions.get((s,a), set())
+            row.append(",".join(sorted(nxt)) if nxt else "φ")
+        yield row
+
+def nfa_table(states, alphabet, transitions, start_state, final_states):
+    return rows_to_frame(nfa_table_rows(states, alphabet, transitions, start_state, final_states))
+
+def dfa_table_rows(states, alphabet, transitions, start_state, final_states):
+    columns = [a for a in alphabet if a != "ε"]
+    yield ["State"] + columns
+    labels = {}
+    def label(S):
+        # Every subset is sorted once, however many rows point at it
+        lbl = labels.get(S)
+        if lbl is None:
+            lbl = labels[S] = "".join(sorted(S))
+        return lbl
+    for S in states:
+        S_lbl = label(S)
+        if S == start_state:
+            S_lbl = "→" + S_lbl
+        if S in final_states:
+            S_lbl += "*"
+        row = [S_lbl]
+        for a in columns:
+            nxt = transitions.get((S,a))
+            row.append(label(nxt) if nxt else "φ")
+        yield row
+
+def dfa_table(states, alphabet, transitions, start_state, final_states):
+    return rows_to_frame(dfa_table_rows(states, alphabet, transitions, start_state, final_states))
+
+def min_dfa_table_rows(states, alphabet, transitions, start_state, final_states):
+    yield ["State"] + list(alphabet)
+    for S in states:
+        S_lbl = str(S)
+        if S == start_state:
+            S_lbl = "→" + S_lbl
+        if S in final_states:
+            S_lbl += "*"
+        row = [S_lbl]
+        for a in alphabet:
+            nxt = transitions.get((S,a))
+            if nxt:
+                # nxt is a label string (or a set with one label string)
+                row.append(nxt if isinstance(nxt, str) else next(iter(nxt)))
+            else:
+                row.append("φ")
+        yield row
+
+def min_dfa_table(states, alphabet, transitions, start_state, final_states):
+    return rows_to_frame(min_dfa_table_rows(states, alphabet, transitions, start_state, final_states))
+
+def automaton_rows(aut):
+    """nfa_table_rows / dfa_table_rows / min_dfa_table_rows for an Automaton."""
+    # DFA subsets are written without separators in the tables
+    sep = "" if aut.deterministic else ", "
+    columns = aut.alphabet if aut.deterministic else nfa_columns(aut.alphabet)
+    symbol_ids = [aut.symbol_id(a) for a in columns]
+    yield ["State"] + columns
+    for i in range(len(aut)):
+        row_label = aut.label(i, sep)
+        if i == aut.start:
+            row_label = "→" + row_label
+        if aut.is_final(i):
+            row_label += "*"
+        row = [row_label]
+        for k in symbol_ids:
+            dsts = aut.successors(i, k) if k >= 0 else ()
+            if aut.is_unexplored(i):
+                row.append("?")
+            elif len(dsts) == 1:
+                row.append(aut.label(dsts[0], sep))
+            else:
+                row.append(",".join(sorted(aut.label(j, sep) for j in dsts)) if dsts else "φ")
+        yield row
+
+def automaton_table(aut):
+    return rows_to_frame(automaton_rows(aut))
+
+def automaton_to_excel(aut, target=None):
+    return rows_to_excel(automaton_rows(aut), target)